@@ -187,6 +187,18 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    # JSON is rendered and parsed with orjson when it is installed, see
+    # `core/products/renderers.py`. The browsable API is only served in
+    # development.
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.products.renderers.ORJSONRenderer",
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.products.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 
@@ -199,6 +211,16 @@ EMAIL_PORT = config("EMAIL_PORT")
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 
+# Catalog responses are cached until the models they are read from change,
+# see `core/products/caching.py`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("CACHE_URL", "redis://localhost:6379/1"),
+    }
+}
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=3600, cast=int)
+
 CELERY_BROKER_URL = config(
     "CELERY_BROKER_URL",
     "redis://localhost:6379/0",
@@ -207,6 +229,36 @@ CELERY_RESULT_BACKEND = "django-db"
 CELERY_RESULT_EXTENDED = True
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# Seconds to buffer low stock alerts into one digest email per manager.
+# Alerts are emailed one by one as they are raised when set to 0.
+LOW_STOCK_ALERT_DIGEST_WINDOW = config(
+    "LOW_STOCK_ALERT_DIGEST_WINDOW",
+    default=0,
+    cast=int,
+)
+
+# Default lifetime, in seconds, of a stock reservation.
+STOCK_RESERVATION_TTL = config("STOCK_RESERVATION_TTL", default=900, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    "compact-stock-ledger": {
+        "task": "compact_stock_ledger",
+        "schedule": timedelta(minutes=15),
+    },
+    "sweep-low-stock-alerts": {
+        "task": "sweep_low_stock_alerts",
+        "schedule": timedelta(minutes=1),
+    },
+    "expire-stock-reservations": {
+        "task": "expire_stock_reservations",
+        "schedule": timedelta(minutes=1),
+    },
+    "send-low-stock-digests": {
+        "task": "send_low_stock_digests",
+        "schedule": timedelta(seconds=LOW_STOCK_ALERT_DIGEST_WINDOW or 300),
+    },
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
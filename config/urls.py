@@ -28,6 +28,8 @@ router.register(r"stock-transfers", warehouse_views.StockTransferViewSet)
 router.register(r"stock-adjustments", warehouse_views.StockAdjustmentViewSet)
 router.register(r"stock-audits", warehouse_views.StockAuditViewSet)
 router.register(r"stock-alert", warehouse_views.StockAlertViewSet)
+router.register(r"stock-movements", warehouse_views.StockMovementViewSet)
+router.register(r"stock-reservations", warehouse_views.StockReservationViewSet)
 
 router.register(r"suppliers", supplier_views.SupplierViewSet)
 router.register(r"supplier-products", supplier_views.SupplierProductViewSet)
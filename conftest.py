@@ -6,6 +6,7 @@ for tests by utilizing pytest-django's database fixture.
 """
 
 import pytest
+from django.core.cache import cache
 
 
 @pytest.fixture(autouse=True)
@@ -24,3 +25,14 @@ def aaa_db(db):
         database setup for the tests.
     """
     pass
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Fixture to start every test with an empty cache.
+
+    Cached responses are keyed by versions that are only bumped when a
+    transaction commits, which never happens inside a test case.
+    """
+    cache.clear()
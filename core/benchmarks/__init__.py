@@ -0,0 +1,3 @@
+"""
+Query and time budget benchmarks for the API endpoints.
+"""
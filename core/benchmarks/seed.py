@@ -0,0 +1,141 @@
+"""
+Seed realistic data volumes for the endpoint benchmarks.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.tests.factories import (
+    ProductCategoryFactory,
+    ProductFactory,
+    ProductUnitFactory,
+    ProductVariantFactory,
+)
+from core.suppliers.models import Supplier, SupplierProduct
+from core.warehouses import services as warehouse_services
+from core.warehouses.models import Stock, StockAdjustment, Warehouse, WarehouseUser
+
+
+def seed(scale=1):
+    """
+    Populate every model served by the router with related data.
+
+    Parameters
+    ----------
+    scale : int, optional
+        Multiplies the number of products, and with them every other volume.
+
+    Returns
+    -------
+    User
+        The user owning the seeded data.
+    """
+    author = UserFactory()
+    units = [ProductUnitFactory() for _ in range(3)]
+    categories = [ProductCategoryFactory(name=f"Category {n}") for n in range(3)]
+
+    variants = []
+
+    for n in range(20 * scale):
+        product = ProductFactory(
+            author=author,
+            name=f"Product {n}",
+            category=categories[n % len(categories)],
+            unit=units[n % len(units)],
+        )
+        product.tags.add("seeded", f"tag-{n % 5}")
+        variants.extend(
+            ProductVariantFactory(
+                author=author,
+                product=product,
+                flavor=f"flavor-{index}",
+            )
+            for index in range(3)
+        )
+
+    for variant in variants[::4]:
+        variant.price += Decimal("1.00")
+        variant.save()
+
+    warehouses = []
+
+    for n in range(3):
+        warehouse = Warehouse.objects.create(author=author, name=f"Warehouse {n}")
+        WarehouseUser.objects.create(
+            user=UserFactory(),
+            warehouse=warehouse,
+            role=WarehouseUser.RoleChoices.MANAGER,
+        )
+        warehouses.append(warehouse)
+
+    Stock.objects.bulk_create(
+        [
+            Stock(
+                warehouse=warehouse,
+                product_variant=variant,
+                quantity=(index * 7) % 50,
+                low_stock_threshold=10,
+            )
+            for warehouse in warehouses
+            for index, variant in enumerate(variants)
+        ]
+    )
+    warehouse_services.refresh_variant_availability([v.pk for v in variants])
+    warehouse_services.recompute_warehouse_valuations()
+
+    source, destination = warehouses[:2]
+    stocked = Stock.objects.filter(warehouse=source, quantity__gte=10)
+    warehouse_services.bulk_transfer_stock(
+        author,
+        source,
+        destination,
+        [
+            {"product_variant": product_variant_id, "quantity": 2}
+            for product_variant_id in stocked.values_list(
+                "product_variant_id", flat=True
+            )
+        ],
+    )
+
+    for stock in Stock.objects.filter(warehouse=destination, quantity__gte=5)[
+        : 10 * scale
+    ]:
+        StockAdjustment.objects.create(
+            warehouse=destination,
+            product_variant_id=stock.product_variant_id,
+            adjustment_quantity=-1,
+            reason="DAMAGE",
+            created_by=author,
+        )
+        warehouse_services.reserve_stock(
+            author=author,
+            warehouse=destination,
+            product_variant=stock.product_variant,
+            quantity=1,
+            expires_at=timezone.now() + timedelta(minutes=15),
+        )
+
+    warehouse_services.import_stock_audit(
+        author,
+        warehouses[2],
+        [(variant.pk, 5) for variant in variants],
+    )
+    warehouse_services.sweep_low_stock_alerts()
+
+    for n in range(10 * scale):
+        supplier = Supplier.objects.create(author=author, business_name=f"Supplier {n}")
+        SupplierProduct.objects.bulk_create(
+            [
+                SupplierProduct(
+                    supplier=supplier,
+                    product_variant=variant,
+                    price=Decimal("1.00"),
+                )
+                for variant in variants[n :: 10 * scale]
+            ]
+        )
+
+    return author
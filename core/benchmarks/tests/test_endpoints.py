@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from config.urls import router
+from core.benchmarks.seed import seed
+
+PAGE_SIZES = [1, 10, 50]
+PAGINATION_MODES = ["offset", "keyset"]
+
+# The most queries a single request to an endpoint may run. Authentication,
+# pagination and the conditional GET validators are included.
+DEFAULT_QUERY_BUDGET = 5
+QUERY_BUDGETS = {}
+
+TIME_BUDGET = float(os.environ.get("BENCHMARK_TIME_BUDGET", "1.0"))
+SCALE = int(os.environ.get("BENCHMARK_SCALE", "1"))
+
+
+def write_report(path, results):
+    """
+    Write the benchmark results as JSON, sorted for diffing between releases.
+    """
+    with open(path, "w") as report:
+        json.dump(results, report, indent=2, sort_keys=True)
+        report.write("\n")
+
+
+class TestEndpointBudgets(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed(scale=SCALE)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        if os.environ.get("BENCHMARK_REPORT"):  # pragma: no cover
+            write_report(os.environ["BENCHMARK_REPORT"], cls.results)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def measure(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.get(url)
+            seconds = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200, url)
+        self.results[url] = {"queries": len(queries), "seconds": round(seconds, 4)}
+
+        self.assertLessEqual(seconds, TIME_BUDGET, url)
+
+        return response, len(queries)
+
+    def test_list_endpoints(self):
+        for prefix, _, _ in router.registry:
+            budget = QUERY_BUDGETS.get(prefix, DEFAULT_QUERY_BUDGET)
+
+            for mode in PAGINATION_MODES:
+                with self.subTest(endpoint=prefix, pagination=mode):
+                    counts = set()
+
+                    for page_size in PAGE_SIZES:
+                        response, count = self.measure(
+                            f"/api/v1/{prefix}/?limit={page_size}&pagination={mode}"
+                        )
+                        self.assertTrue(response.data["results"], prefix)
+                        self.assertLessEqual(
+                            len(response.data["results"]), page_size, prefix
+                        )
+                        counts.add(count)
+
+                    self.assertEqual(len(counts), 1, f"{prefix}: N+1 queries {counts}")
+                    self.assertLessEqual(counts.pop(), budget, prefix)
+
+    def test_detail_endpoints(self):
+        for prefix, viewset, _ in router.registry:
+            budget = QUERY_BUDGETS.get(prefix, DEFAULT_QUERY_BUDGET)
+            pk = viewset.queryset.values_list("pk", flat=True).first()
+
+            with self.subTest(endpoint=prefix):
+                _, count = self.measure(f"/api/v1/{prefix}/{pk}/")
+                self.assertLessEqual(count, budget, prefix)
+
+    def test_write_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            write_report(path, {"/api/v1/units/": {"queries": 2, "seconds": 0.01}})
+
+            with open(path) as report:
+                self.assertEqual(
+                    json.load(report)["/api/v1/units/"]["queries"],
+                    2,
+                )
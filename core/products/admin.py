@@ -35,7 +35,7 @@ class ProductAdmin(admin.ModelAdmin):
 
     def get_tags(self, obj):
         """
-        Return the tags of the product.
+        Return the tags of the product, read from the prefetched tags.
 
         Parameters
         ----------
@@ -47,7 +47,23 @@ class ProductAdmin(admin.ModelAdmin):
         str
             The tags of the product.
         """
-        return ", ".join(obj.tags.names())
+        return ", ".join(tag.name for tag in obj.tags.all())
+
+    def get_queryset(self, request):
+        """
+        Prefetch the tags shown in the changelist.
+
+        Parameters
+        ----------
+        request : HttpRequest
+            The request object.
+
+        Returns
+        -------
+        QuerySet
+            The products with their tags.
+        """
+        return super().get_queryset(request).prefetch_related("tags")
 
     raw_id_fields = ["author", "unit"]
     date_hierarchy = "created"
@@ -55,8 +71,9 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ("category", "unit")
     search_fields = ("name", "category__name")
     list_display = ("name", "category", "unit", "get_tags")
+    list_select_related = ("category", "unit")
 
-    show_facets = admin.ShowFacets.ALWAYS
+    show_facets = admin.ShowFacets.ALLOW
 
 
 @admin.register(ProductVariant)
@@ -66,10 +83,11 @@ class ProductVariantAdmin(admin.ModelAdmin):
     """
 
     raw_id_fields = ["product", "author"]
-    list_display = ("product", "price", "image")
+    list_display = ("display_name", "product", "price", "image")
+    list_select_related = ("product",)
     list_filter = ("product",)
-    search_fields = ("product__name",)
+    search_fields = ("display_name", "product__name")
     ordering = [
         "product",
     ]
-    show_facets = admin.ShowFacets.ALWAYS
+    show_facets = admin.ShowFacets.ALLOW
@@ -12,3 +12,13 @@ class ProductsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.products"
+
+    def ready(self):
+        """
+        Import signals and create the SQLite search tables after migrating.
+        """
+        from django.db.models.signals import post_migrate
+
+        from core.products.signals import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
@@ -0,0 +1,159 @@
+"""
+Autocomplete of product variants by SKU and name.
+
+On databases without a search backend that can autocomplete, matches are
+answered from an in-process prefix index. The index is rebuilt lazily
+when its own version changes, so every process sees a change written by
+any other process. The version is only bumped when the indexed text of
+the variants changes, not on every write to them, like a repricing.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+
+from .caching import get_versions, invalidate_models
+from .models import ProductVariant
+from .search import get_search_backend
+
+# The name the version of the prefix index is kept under.
+AUTOCOMPLETE_VERSION = "products.autocomplete"
+
+
+def normalize(text):
+    """
+    Return the form of a text that is indexed and looked up.
+
+    Parameters
+    ----------
+    text : str
+        The text to normalize.
+
+    Returns
+    -------
+    str
+        The text, case-folded.
+    """
+    return text.casefold()
+
+
+class PrefixIndex:
+    """
+    Sorted index of the SKUs and name words of the product variants.
+
+    Each SKU and each suffix of a display name starting at a word is a key,
+    so a prefix lookup is a binary search followed by a scan of the
+    matching keys only.
+
+    Parameters
+    ----------
+    variants : iterable of tuple
+        The `(id, sku, display_name)` of each variant.
+    """
+
+    def __init__(self, variants):
+        self.variants = {}
+        keys = []
+
+        for pk, sku, display_name in variants:
+            self.variants[pk] = {"id": pk, "sku": sku, "name": display_name}
+            keys.append((normalize(sku), pk))
+
+            for word in re.finditer(r"\w+", display_name):
+                keys.append((normalize(display_name[word.start() :]), pk))
+
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.pks = [pk for _, pk in keys]
+
+    def lookup(self, prefix, limit):
+        """
+        Return the variants with a key starting with the prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The typed prefix.
+        limit : int
+            The most variants to return.
+
+        Returns
+        -------
+        list[dict]
+            The `id`, `sku` and `name` of each match, in key order.
+        """
+        prefix = normalize(prefix)
+        matches = {}
+        position = bisect_left(self.keys, prefix)
+
+        while (
+            len(matches) < limit
+            and position < len(self.keys)
+            and self.keys[position].startswith(prefix)
+        ):
+            pk = self.pks[position]
+            matches.setdefault(pk, self.variants[pk])
+            position += 1
+
+        return list(matches.values())
+
+
+_index = {"version": None, "index": None}
+_lock = threading.Lock()
+
+
+def invalidate_prefix_index():
+    """
+    Rebuild the prefix index of every process on its next lookup, after
+    variants were added, removed or renamed.
+    """
+    invalidate_models(AUTOCOMPLETE_VERSION)
+
+
+def get_prefix_index():
+    """
+    Return the prefix index, rebuilding it when the indexed text changed.
+
+    Returns
+    -------
+    PrefixIndex
+        The current prefix index.
+    """
+    (version,) = get_versions([AUTOCOMPLETE_VERSION])
+
+    if _index["version"] != version:
+        with _lock:
+            if _index["version"] != version:
+                _index["index"] = PrefixIndex(
+                    ProductVariant.objects.filter(is_deleted=False).values_list(
+                        "pk", "sku", "display_name"
+                    )
+                )
+                _index["version"] = version
+
+    return _index["index"]
+
+
+def autocomplete_variants(prefix, limit=10):
+    """
+    Return the product variants whose SKU or name matches a typed prefix.
+
+    Parameters
+    ----------
+    prefix : str
+        The typed prefix of a SKU or of a word of the name.
+    limit : int, optional
+        The most variants to return.
+
+    Returns
+    -------
+    list[dict]
+        The `id`, `sku` and `name` of each match, best first.
+    """
+    backend = get_search_backend()
+    matches = backend.autocomplete(prefix, limit) if backend else None
+
+    if matches is None:
+        matches = get_prefix_index().lookup(prefix, limit)
+
+    return matches
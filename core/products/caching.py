@@ -0,0 +1,114 @@
+"""
+Versioned caching of the product catalog.
+
+Cached catalog data is keyed by the versions of the models it is read
+from, kept in the cache. Writes to a model bump its version once their
+transaction commits, which invalidates every entry read from the model in
+every process at once, without tracking or scanning the entries.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version_key(model):
+    """
+    Return the cache key of the version of a model.
+
+    Parameters
+    ----------
+    model : Model or str
+        The model, or the name of data versioned on its own, like the
+        autocomplete index.
+
+    Returns
+    -------
+    str
+        The cache key.
+    """
+    label = model if isinstance(model, str) else model._meta.label_lower
+
+    return f"products:version:{label}"
+
+
+def get_versions(models):
+    """
+    Return the current versions of the given models in one cache read.
+
+    Parameters
+    ----------
+    models : list[Model]
+        The models.
+
+    Returns
+    -------
+    list[int]
+        The version of each model.
+    """
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    return [versions.get(key, 0) for key in keys]
+
+
+def _bump_versions(models):
+    """
+    Increment the versions of the given models kept in the cache.
+
+    Parameters
+    ----------
+    models : tuple[Model]
+        The models.
+    """
+    for model in models:
+        key = get_version_key(model)
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate_models(*models):
+    """
+    Invalidate the cached data read from the given models.
+
+    The versions are bumped at once, so this process stops reading stale
+    entries, and again when the current transaction commits, so entries
+    cached by other processes from the data before the commit are dropped
+    too.
+
+    Parameters
+    ----------
+    *models : Model
+        The changed models.
+    """
+    _bump_versions(models)
+    transaction.on_commit(lambda: _bump_versions(models))
+
+
+def get_cache_key(prefix, models, *parts):
+    """
+    Return a cache key for data read from the given models, at their
+    current versions.
+
+    Parameters
+    ----------
+    prefix : str
+        The kind of the cached data.
+    models : list[Model]
+        The models the data is read from.
+    *parts : str
+        The other values the data depends on.
+
+    Returns
+    -------
+    str
+        The cache key.
+    """
+    versions = ".".join(str(version) for version in get_versions(models))
+    digest = hashlib.md5("\n".join(parts).encode(), usedforsecurity=False)
+
+    return f"products:{prefix}:{versions}:{digest.hexdigest()}"
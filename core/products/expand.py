@@ -0,0 +1,269 @@
+"""
+Expansion of the relations of serializers with `?expand=`.
+
+Relations are rendered as ids unless the client expands them, e.g. with
+`?expand=product.category,product.unit`. The related objects of every
+expanded relation are loaded with `select_related` or `prefetch_related`,
+so the number of queries does not grow with the number of rows.
+"""
+
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+
+
+class Expansion:
+    """
+    An expandable relation of a serializer.
+
+    Parameters
+    ----------
+    serializer : type or str
+        The serializer of the related objects, or its dotted path.
+    queryset : QuerySet, optional
+        The queryset the related objects are prefetched from, loading
+        everything the serializer reads. Forward relations without one
+        are loaded with `select_related`.
+    """
+
+    def __init__(self, serializer, queryset=None):
+        self.serializer = serializer
+        self.queryset = queryset
+
+    def get_serializer_class(self):
+        """
+        Return the serializer of the related objects.
+
+        Returns
+        -------
+        type
+            The serializer class.
+        """
+        if isinstance(self.serializer, str):
+            self.serializer = import_string(self.serializer)
+
+        return self.serializer
+
+
+class ExpandableFieldsMixin:
+    """
+    Render the relations in `expandable_fields` nested when they are
+    expanded, and as ids otherwise.
+
+    The expanded relations are given to the serializer as a tree, e.g.
+    `{"product": {"category": {}}}`, with the `expand` argument.
+
+    Parameters
+    ----------
+    *args : tuple
+        Positional arguments passed to the serializer.
+    expand : dict, optional
+        The tree of expanded relations.
+    **kwargs : dict
+        Keyword arguments passed to the serializer.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, expand=None, **kwargs):
+        self.expand = expand or {}
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        """
+        Replace the expanded relations with nested serializers.
+
+        Returns
+        -------
+        dict
+            The fields of the serializer.
+        """
+        fields = super().get_fields()
+        model = self.Meta.model
+
+        for name, expand in self.expand.items():
+            serializer_class = self.expandable_fields[name].get_serializer_class()
+            model_field = model._meta.get_field(name)
+            kwargs = {
+                "read_only": True,
+                "many": model_field.one_to_many or model_field.many_to_many,
+            }
+
+            if issubclass(serializer_class, ExpandableFieldsMixin):
+                kwargs["expand"] = expand
+
+            fields[name] = serializer_class(**kwargs)
+
+        return fields
+
+
+def parse_expand(value, serializer_class, param="expand"):
+    """
+    Return the tree of relations expanded by a `?expand=` value.
+
+    Parameters
+    ----------
+    value : str
+        The comma-separated paths of the relations, with nested relations
+        separated by dots.
+    serializer_class : type
+        The serializer the paths start from.
+    param : str, optional
+        The name of the query parameter, for the errors.
+
+    Returns
+    -------
+    dict
+        The tree of expanded relations.
+
+    Raises
+    ------
+    ValidationError
+        If a relation cannot be expanded.
+    """
+    tree = {}
+
+    for path in filter(None, (path.strip() for path in value.split(","))):
+        node = tree
+        current = serializer_class
+
+        for name in path.split("."):
+            expansions = getattr(current, "expandable_fields", {})
+
+            if name not in expansions:
+                raise ValidationError({param: f"Cannot expand `{path}`."})
+
+            node = node.setdefault(name, {})
+            current = expansions[name].get_serializer_class()
+
+    return tree
+
+
+def get_expand_lookups(serializer_class, expand, prefix=""):
+    """
+    Return the lookups loading the relations expanded on a serializer.
+
+    Forward relations are joined with `select_related`, unless their
+    expansion prefetches them from a queryset; the other relations are
+    prefetched, with the relations expanded below them loaded by the
+    prefetch queryset.
+
+    Parameters
+    ----------
+    serializer_class : type
+        The serializer the relations are expanded on.
+    expand : dict
+        The tree of expanded relations.
+    prefix : str, optional
+        The path of the serializer from the root model.
+
+    Returns
+    -------
+    tuple of list
+        The `select_related` and the `prefetch_related` lookups.
+    """
+    select_related = []
+    prefetch_related = []
+    model = serializer_class.Meta.model
+
+    for name, nested in expand.items():
+        expansion = serializer_class.expandable_fields[name]
+        nested_class = expansion.get_serializer_class()
+        model_field = model._meta.get_field(name)
+        path = f"{prefix}{name}"
+        is_forward = model_field.many_to_one or (
+            model_field.one_to_one and model_field.concrete
+        )
+
+        if is_forward and expansion.queryset is None:
+            select_related.append(path)
+            nested_select, nested_prefetch = get_expand_lookups(
+                nested_class, nested, f"{path}__"
+            )
+            select_related.extend(nested_select)
+            prefetch_related.extend(nested_prefetch)
+            continue
+
+        queryset = expansion.queryset
+
+        if queryset is None:
+            queryset = model_field.related_model._default_manager.all()
+
+        prefetch_related.append(
+            Prefetch(path, queryset=expand_queryset(queryset, nested_class, nested))
+        )
+
+    return select_related, prefetch_related
+
+
+def _get_select_related_paths(select_related, prefix=""):
+    """
+    Return the paths joined by the `select_related` of a query.
+
+    Parameters
+    ----------
+    select_related : dict
+        The nested `select_related` of the query.
+    prefix : str, optional
+        The path of the nested relations.
+
+    Returns
+    -------
+    list[str]
+        The deepest joined paths.
+    """
+    paths = []
+
+    for name, nested in select_related.items():
+        nested_paths = _get_select_related_paths(nested, f"{prefix}{name}__")
+        paths.extend(nested_paths or [f"{prefix}{name}"])
+
+    return paths
+
+
+def expand_queryset(queryset, serializer_class, expand):
+    """
+    Load the relations expanded on a serializer with a queryset.
+
+    Relations prefetched from a queryset are no longer joined, otherwise the
+    joined objects would be used instead of the prefetched ones.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        The queryset of the serialized objects.
+    serializer_class : type
+        The serializer the relations are expanded on.
+    expand : dict
+        The tree of expanded relations.
+
+    Returns
+    -------
+    QuerySet
+        The queryset loading the expanded relations.
+    """
+    select_related, prefetch_related = get_expand_lookups(serializer_class, expand)
+    prefetched = [lookup.prefetch_through for lookup in prefetch_related]
+    joined = queryset.query.select_related
+
+    if prefetched and isinstance(joined, dict):
+        paths = _get_select_related_paths(joined)
+        kept = [
+            path
+            for path in paths
+            if not any(
+                path == prefetch or path.startswith(f"{prefetch}__")
+                for prefetch in prefetched
+            )
+        ]
+
+        if kept != paths:
+            queryset = queryset.select_related(None)
+
+            if kept:
+                queryset = queryset.select_related(*kept)
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+
+    return queryset.prefetch_related(*prefetch_related)
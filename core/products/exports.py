@@ -0,0 +1,189 @@
+"""
+Streaming exports of querysets as CSV or newline-delimited JSON.
+"""
+
+import csv
+import io
+import json
+import zlib
+from decimal import Decimal
+from itertools import islice
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .renderers import orjson
+
+EXPORT_FORMATS = [
+    ("csv", "CSV"),
+    ("ndjson", "NDJSON"),
+]
+
+EXPORT_COMPRESSIONS = [
+    ("gzip", "gzip"),
+]
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+_encoder = JSONEncoder()
+
+
+def _default(value):
+    """
+    Encode the values JSON does not handle natively.
+
+    Decimals are kept as strings, like the serializers render them, and the
+    other values are spelled like the API responses.
+
+    Parameters
+    ----------
+    value : object
+        The value to encode.
+
+    Returns
+    -------
+    object
+        A value JSON can encode.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+
+    return _encoder.default(value)
+
+
+def _dumps(row):
+    """
+    Encode a row as one compact line of JSON.
+
+    Parameters
+    ----------
+    row : dict
+        The row to encode.
+
+    Returns
+    -------
+    bytes
+        The encoded row.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            row, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    return json.dumps(
+        row, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def _encode_ndjson(batches, fields):
+    """
+    Yield the batches of rows as newline-delimited JSON.
+
+    Parameters
+    ----------
+    batches : iterable of list[dict]
+        The batches of rows.
+    fields : list[str]
+        The fields of the rows.
+
+    Yields
+    ------
+    bytes
+        The lines of each batch.
+    """
+    for batch in batches:
+        yield b"".join(_dumps(row) + b"\n" for row in batch)
+
+
+def _encode_csv(batches, fields):
+    """
+    Yield the batches of rows as CSV, after a header row.
+
+    Parameters
+    ----------
+    batches : iterable of list[dict]
+        The batches of rows.
+    fields : list[str]
+        The fields of the rows, used as the header.
+
+    Yields
+    ------
+    bytes
+        The lines of each batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    for batch in batches:
+        writer.writerows(row.values() for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _gzip(chunks):
+    """
+    Encode a stream of bytes as a gzip file.
+
+    Parameters
+    ----------
+    chunks : iterable of bytes
+        The uncompressed stream.
+
+    Yields
+    ------
+    bytes
+        The compressed stream.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def stream_export(queryset, fields, file_format, compression=None, chunk_size=2000):
+    """
+    Stream the rows of a queryset as a CSV or newline-delimited JSON file.
+
+    The rows are read as `values()` through a server-side cursor where the
+    database supports it, and encoded one chunk at a time, so the memory
+    used does not grow with the number of rows.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        The queryset to export.
+    fields : list[str]
+        The fields and field paths of each row.
+    file_format : str
+        One of `EXPORT_FORMATS`.
+    compression : str, optional
+        One of `EXPORT_COMPRESSIONS`.
+    chunk_size : int, optional
+        The number of rows fetched and encoded at a time.
+
+    Yields
+    ------
+    bytes
+        The content of the file.
+    """
+    rows = queryset.values(*fields).iterator(chunk_size=chunk_size)
+    batches = iter(lambda: list(islice(rows, chunk_size)), [])
+    encode = _encode_csv if file_format == "csv" else _encode_ndjson
+    chunks = encode(batches, fields)
+
+    if compression == "gzip":
+        chunks = _gzip(chunks)
+
+    yield from chunks
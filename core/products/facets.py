@@ -0,0 +1,138 @@
+"""
+Facet counts of the product catalog.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, F, Value
+from django.db.models.functions import Cast
+
+from .caching import get_cache_key
+from .models import Product, ProductVariant
+
+# The facet dimensions of each model, mapped to the field path they count.
+FACETS = {
+    Product: {
+        "category": "category",
+        "unit": "unit",
+        "is_active": "is_active",
+        "tags": "tags__name",
+    },
+    ProductVariant: {
+        "brand": "brand",
+        "flavor": "flavor",
+        "size": "size",
+        "is_active": "is_active",
+    },
+}
+
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_field(model, path):
+    """
+    Return the model field at the end of a field path.
+
+    Parameters
+    ----------
+    model : Model
+        The model the path starts from.
+    path : str
+        The field path, with relations separated by `__`.
+
+    Returns
+    -------
+    Field
+        The field.
+    """
+    *relations, name = path.split("__")
+
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+
+    return model._meta.get_field(name)
+
+
+def get_facet_counts(queryset):
+    """
+    Count the rows of a queryset for every value of every facet dimension.
+
+    The dimensions are grouped separately and combined with `UNION ALL`,
+    so all the counts are read in a single query.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        The filtered queryset of a model in `FACETS`.
+
+    Returns
+    -------
+    dict
+        The `value` and `count` of each facet value, by dimension, most
+        frequent first.
+    """
+    model = queryset.model
+    facets = FACETS[model]
+    rows = model.objects.filter(pk__in=queryset.order_by().values("pk"))
+    fields = {name: get_field(model, path) for name, path in facets.items()}
+    columns = {name: f"{name}_value" for name in facets}
+
+    # Each dimension is read in its own column, typed like its field and
+    # cast NULL in the rows of the other dimensions, so the grouped queries
+    # can be combined without casting the values to text.
+    grouped = [
+        rows.annotate(
+            facet=Value(name),
+            **{
+                column: (
+                    F(path)
+                    if other == name
+                    else Cast(Value(None), output_field=fields[other])
+                )
+                for other, column in columns.items()
+            },
+        )
+        .values("facet", *columns.values())
+        .annotate(count=Count("pk", distinct=True))
+        .order_by()
+        for name, path in facets.items()
+    ]
+    counts = {name: [] for name in facets}
+
+    for row in grouped[0].union(*grouped[1:], all=True):
+        counts[row["facet"]].append(
+            {"value": row[columns[row["facet"]]], "count": row["count"]}
+        )
+
+    for values in counts.values():
+        values.sort(key=lambda facet: (-facet["count"], str(facet["value"])))
+
+    return counts
+
+
+def get_cached_facet_counts(queryset, signature, models):
+    """
+    Return the facet counts of a queryset, cached until the models it is
+    read from change.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        The filtered queryset of a model in `FACETS`.
+    signature : str
+        A text identifying the filters applied to the queryset.
+    models : list[Model]
+        The models the filtered queryset is read from.
+
+    Returns
+    -------
+    dict
+        The facet counts, as returned by `get_facet_counts`.
+    """
+    key = get_cache_key("facets", models, queryset.model._meta.label, signature)
+    counts = cache.get(key)
+
+    if counts is None:
+        counts = get_facet_counts(queryset)
+        cache.set(key, counts, FACETS_CACHE_TIMEOUT)
+
+    return counts
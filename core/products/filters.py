@@ -0,0 +1,99 @@
+"""
+Filter sets for the `products` app.
+"""
+
+from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import ProductVariant
+from .search import SEARCH_DOCUMENTS, SEARCH_RANK, get_search_backend, get_search_words
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Search filter answering `?search=` from the full-text search index.
+
+    The matches are ordered by rank unless the request asks for an ordering,
+    so the filter runs after `OrderingFilter`. Models without a search index,
+    or databases without a search backend, fall back to the `icontains`
+    lookups of `SearchFilter` over the `search_fields` of the view.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Return the rows matching the search terms, best matches first.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        queryset : QuerySet
+            The queryset to filter.
+        view : APIView
+            The view being filtered.
+
+        Returns
+        -------
+        QuerySet
+            The filtered queryset.
+        """
+        terms = self.get_search_terms(request)
+        backend = get_search_backend()
+
+        if not terms or not backend or queryset.model not in SEARCH_DOCUMENTS:
+            return super().filter_queryset(request, queryset, view)
+
+        words = get_search_words(terms)
+
+        if not words:
+            return queryset.none()
+
+        queryset = backend.search(queryset, words)
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+
+        return queryset.order_by(f"-{SEARCH_RANK}", *queryset.query.order_by)
+
+
+class ProductVariantFilter(filters.FilterSet):
+    """
+    Filter set for the ProductVariant model.
+
+    The availability filters read the `total_on_hand` annotation that
+    `ProductVariantViewSet` adds from the maintained availability table.
+    """
+
+    in_stock = filters.BooleanFilter(method="filter_in_stock")
+    min_on_hand = filters.NumberFilter(
+        field_name="total_on_hand",
+        lookup_expr="gte",
+    )
+
+    class Meta:
+        model = ProductVariant
+        fields = ["product", "brand", "flavor", "is_active"]
+
+    def filter_in_stock(self, queryset, name, value):
+        """
+        Keep the variants that are, or are not, stocked in any warehouse.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to filter.
+        name : str
+            The name of the filter.
+        value : bool
+            Whether to keep stocked or unstocked variants.
+
+        Returns
+        -------
+        QuerySet
+            The filtered queryset.
+        """
+        if value:
+            return queryset.filter(total_on_hand__gt=0)
+
+        return queryset.filter(total_on_hand=0)
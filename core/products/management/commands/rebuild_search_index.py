@@ -0,0 +1,36 @@
+"""
+Django management command to rebuild the product search index.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.products.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Create the product search indexes and write every product and product
+    variant to them, for example after switching databases.
+
+    Example:
+        manage.py rebuild_search_index
+    """
+
+    help = "Create the product search indexes and index every product and variant."
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        with transaction.atomic():
+            count = rebuild_search_index()
+
+        self.stdout.write(f"Indexed {count} products and variants")
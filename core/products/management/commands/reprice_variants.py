@@ -0,0 +1,71 @@
+"""
+Django management command to reprice product variants from a CSV file.
+"""
+
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.products.serializers import ProductVariantPriceSerializer
+from core.products.services import reprice_product_variants
+
+
+class Command(BaseCommand):
+    """
+    Reprice product variants from a CSV file with a header row holding an
+    `id` or a `sku` column and a `price` column.
+
+    Example:
+        manage.py reprice_variants prices.csv
+    """
+
+    help = "Reprice product variants from a CSV file of ids or SKUs and prices."
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The argument parser.
+        """
+        parser.add_argument("path", help="The CSV file holding the new prices.")
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+
+        Raises
+        ------
+        CommandError
+            If a row is invalid or names an unknown variant.
+        """
+        with open(options["path"], newline="", encoding="utf-8-sig") as file:
+            rows = [
+                {key: value for key, value in row.items() if value}
+                for row in csv.DictReader(file)
+            ]
+
+        serializer = ProductVariantPriceSerializer(data=rows, many=True)
+
+        if not serializer.is_valid():
+            raise CommandError(f"Invalid prices: {serializer.errors}")
+
+        try:
+            result = reprice_product_variants(serializer.validated_data)
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        self.stdout.write(
+            f"Repriced {result['repriced']} variants, "
+            f"{result['unchanged']} unchanged"
+        )
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:34
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_display_names(apps, schema_editor):
+    """
+    Store the display name of every existing product variant.
+    """
+    ProductVariant = apps.get_model("products", "ProductVariant")
+    variants = []
+
+    for variant in ProductVariant.objects.select_related("product__unit").iterator():
+        if variant.product is None:
+            continue
+
+        details = []
+
+        if variant.brand:
+            details.append(variant.brand)
+
+        if variant.size:
+            size = Decimal(str(variant.size)).normalize()
+            unit = variant.product.unit.symbol if variant.product.unit else ""
+            details.append(f"{size:f}{unit}")
+
+        if variant.flavor:
+            details.append(variant.flavor)
+
+        variant.display_name = f"{variant.product.name} ({', '.join(details)})"
+        variants.append(variant)
+
+    ProductVariant.objects.bulk_update(variants, ["display_name"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalproductvariant",
+            name="display_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="The human-readable name, kept in sync with the product and unit.",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="productvariant",
+            name="display_name",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="The human-readable name, kept in sync with the product and unit.",
+                max_length=255,
+            ),
+        ),
+        migrations.RunPython(
+            backfill_display_names,
+            migrations.RunPython.noop,
+        ),
+    ]
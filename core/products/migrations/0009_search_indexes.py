@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:12
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from core.products.operations import PostgresRunSQL
+
+
+# The columns and indexes of `PostgresSearchBackend`, which only exist on
+# PostgreSQL. The rows are indexed with `manage.py rebuild_search_index`.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0008_productvariant_display_name"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        PostgresRunSQL(
+            sql=[
+                "ALTER TABLE products_product ADD COLUMN search_vector tsvector",
+                "CREATE INDEX products_product_search_vector "
+                "ON products_product USING GIN (search_vector)",
+                "ALTER TABLE products_productvariant ADD COLUMN search_vector tsvector",
+                "CREATE INDEX products_productvariant_search_vector "
+                "ON products_productvariant USING GIN (search_vector)",
+                "CREATE INDEX products_productvariant_sku_trgm "
+                "ON products_productvariant USING GIN (UPPER(sku::text) gin_trgm_ops)",
+                "CREATE INDEX products_productvariant_display_name_trgm "
+                "ON products_productvariant "
+                "USING GIN (UPPER(display_name::text) gin_trgm_ops)",
+            ],
+            reverse_sql=[
+                "DROP INDEX products_productvariant_display_name_trgm",
+                "DROP INDEX products_productvariant_sku_trgm",
+                "DROP INDEX products_productvariant_search_vector",
+                "ALTER TABLE products_productvariant DROP COLUMN search_vector",
+                "DROP INDEX products_product_search_vector",
+                "ALTER TABLE products_product DROP COLUMN search_vector",
+            ],
+        ),
+    ]
@@ -0,0 +1,709 @@
+"""
+Mixins for the viewsets of the `products` app.
+"""
+
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .caching import get_cache_key, get_versions
+from .expand import ExpandableFieldsMixin, expand_queryset, parse_expand
+from .exports import EXPORT_CONTENT_TYPES, stream_export
+from .facets import get_cached_facet_counts
+from .serializers import ExportSerializer
+from .values import compile_values_reader
+
+# Query parameters that page or order the results without filtering them.
+UNFILTERED_PARAMS = {
+    "limit",
+    "offset",
+    "cursor",
+    "pagination",
+    "ordering",
+    "fields",
+    "omit",
+    "expand",
+}
+
+# The actions whose fields can be picked with `?fields=` and `?omit=`.
+SPARSE_ACTIONS = {"list", "retrieve"}
+
+
+class CacheModelsMixin:
+    """
+    List the models the responses of the view are read from, as
+    `app_label.ModelName` in `cache_models`.
+
+    The cached responses, the conditional GET validators and the cached
+    facet counts of the view are all invalidated from this list.
+    """
+
+    cache_models = []
+
+    def get_cache_models(self):
+        """
+        Return the models the responses of the view are read from.
+
+        Returns
+        -------
+        list[Model]
+            The models in `cache_models`.
+        """
+        return [apps.get_model(label) for label in self.cache_models]
+
+
+class ConditionalGetMixin(CacheModelsMixin):
+    """
+    Answer `list` and `retrieve` requests with weak ETags and Last-Modified
+    headers, and with `304 Not Modified` when the client is up to date.
+
+    The validators are computed with one aggregate query over the filtered
+    queryset, from the latest `last_modified_field` and the number of rows,
+    together with the versions of the models in `cache_models`. A request
+    whose validators match is answered before the queryset is serialized.
+    """
+
+    last_modified_field = "updated"
+
+    def get_validators(self, queryset):
+        """
+        Return the ETag and the last modification time of a queryset.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The filtered queryset.
+
+        Returns
+        -------
+        tuple
+            The weak ETag and the last modification time, which is `None`
+            for an empty queryset.
+        """
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count("pk"),
+        )
+        versions = get_versions(self.get_cache_models())
+        last_modified = state["last_modified"]
+        digest = hashlib.md5(
+            f"{last_modified and last_modified.isoformat()}:{state['count']}:"
+            f"{versions}".encode(),
+            usedforsecurity=False,
+        )
+
+        return f"W/{quote_etag(digest.hexdigest())}", last_modified
+
+    def get_conditional_response(self, handler, queryset, request, *args, **kwargs):
+        """
+        Return `304 Not Modified` when the client holds the current version
+        of the response, or handle the request and add the validators.
+
+        Parameters
+        ----------
+        handler : callable
+            The action handling the request when the client is out of date.
+        queryset : QuerySet
+            The filtered queryset the response is read from.
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the action.
+        **kwargs : dict
+            Keyword arguments passed to the action.
+
+        Returns
+        -------
+        HttpResponse
+            The response object.
+        """
+        etag, last_modified = self.get_validators(queryset)
+        timestamp = last_modified and int(last_modified.timestamp())
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the objects unless the client holds the current list.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        HttpResponse
+            The response object.
+        """
+        return self.get_conditional_response(
+            super().list,
+            self.filter_queryset(self.get_queryset()),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an object unless the client holds its current version.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        HttpResponse
+            The response object.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # An invalid lookup value is left to `get_object` to answer.
+            return super().retrieve(request, *args, **kwargs)
+
+        return self.get_conditional_response(
+            super().retrieve, queryset, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin(CacheModelsMixin):
+    """
+    Cache the responses of the `list` and `retrieve` actions until one of
+    the models they are read from changes.
+
+    The models are listed as `app_label.ModelName` in `cache_models`. Their
+    versions are part of the cache key, so a write to any of them makes
+    every cached response read from it unreachable.
+    """
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """
+        Return the cached response to a request, or handle the request and
+        cache its response when successful.
+
+        Parameters
+        ----------
+        handler : callable
+            The action handling the request on a cache miss.
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the action.
+        **kwargs : dict
+            Keyword arguments passed to the action.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        key = get_cache_key(
+            "response", self.get_cache_models(), request.build_absolute_uri()
+        )
+        data = cache.get(key)
+
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the objects, from the cache when possible.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an object, from the cache when possible.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class FacetsMixin(CacheModelsMixin):
+    """
+    Add a `facets` action counting the filtered results by the facet
+    dimensions of the model.
+
+    The counts are cached until a model in `cache_models` changes.
+    """
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        Custom action to count the filtered results by facet value.
+
+        Takes the same filters and search as the list endpoint.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        signature = "&".join(
+            f"{key}={value}"
+            for key, values in sorted(request.query_params.lists())
+            if key not in UNFILTERED_PARAMS
+            for value in sorted(values)
+        )
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return Response(
+            get_cached_facet_counts(queryset, signature, self.get_cache_models()),
+            status=status.HTTP_200_OK,
+        )
+
+
+class ExportMixin:
+    """
+    Add an `export` action streaming all the filtered results as a CSV or
+    newline-delimited JSON file, optionally gzipped.
+
+    Only the fields in `export_fields` are read, as `values()` through a
+    server-side cursor, so exports of any size use a flat amount of memory.
+    """
+
+    export_fields = []
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Custom action to stream the filtered results as a file.
+
+        Takes the same filters and search as the list endpoint, a
+        `file_format` of `csv` or `ndjson` and an optional `compression` of
+        `gzip`.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        StreamingHttpResponse
+            The response object.
+        """
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data["file_format"]
+        compression = serializer.validated_data.get("compression")
+
+        filename = f"{self.basename}.{file_format}"
+        content_type = EXPORT_CONTENT_TYPES[file_format]
+
+        if compression == "gzip":
+            filename = f"{filename}.gz"
+            content_type = "application/gzip"
+
+        response = StreamingHttpResponse(
+            stream_export(
+                self.filter_queryset(self.get_queryset()),
+                self.export_fields,
+                file_format,
+                compression=compression,
+                chunk_size=self.export_chunk_size,
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+        return response
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients pick the fields of `list` and `retrieve` responses with
+    `?fields=` and drop some with `?omit=`, both comma-separated.
+
+    The other fields are removed from the serializer, and the model columns
+    only they read are deferred on the queryset, so they are not fetched.
+    Columns of relations loaded with `select_related` are always fetched.
+    Method fields are assumed to read annotations and relations only.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def get_requested_fields(self, param):
+        """
+        Return the field names given in a query parameter.
+
+        Parameters
+        ----------
+        param : str
+            The name of the query parameter.
+
+        Returns
+        -------
+        set[str] or None
+            The field names, or `None` when the parameter is not given.
+        """
+        if param not in self.request.query_params:
+            return None
+
+        return {
+            name.strip()
+            for value in self.request.query_params.getlist(param)
+            for name in value.split(",")
+            if name.strip()
+        }
+
+    def is_sparse(self):
+        """
+        Return whether the fields of the response are picked by the client.
+
+        Returns
+        -------
+        bool
+            Whether `?fields=` or `?omit=` applies to the request.
+        """
+        return (
+            self.request is not None
+            and self.action in SPARSE_ACTIONS
+            and (
+                self.fields_query_param in self.request.query_params
+                or self.omit_query_param in self.request.query_params
+            )
+        )
+
+    def get_sparse_fieldset(self, names):
+        """
+        Return the fields to render out of the fields of the serializer.
+
+        Parameters
+        ----------
+        names : list[str]
+            The names of the fields of the serializer.
+
+        Returns
+        -------
+        list[str]
+            The names of the fields to render.
+
+        Raises
+        ------
+        ValidationError
+            If an unknown field is requested or omitted.
+        """
+        fields = self.get_requested_fields(self.fields_query_param)
+        omit = self.get_requested_fields(self.omit_query_param) or set()
+
+        for param, requested in (
+            (self.fields_query_param, fields),
+            (self.omit_query_param, omit),
+        ):
+            unknown = sorted(set(requested or ()) - set(names))
+
+            if unknown:
+                raise ValidationError({param: f"Unknown fields: {unknown}."})
+
+        return [
+            name
+            for name in names
+            if (fields is None or name in fields) and name not in omit
+        ]
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Return the serializer, without the fields the client left out.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to the serializer.
+        **kwargs : dict
+            Keyword arguments passed to the serializer.
+
+        Returns
+        -------
+        Serializer
+            The serializer instance.
+        """
+        serializer = super().get_serializer(*args, **kwargs)
+
+        if self.is_sparse():
+            fields = getattr(serializer, "child", serializer).fields
+            kept = set(self.get_sparse_fieldset(list(fields)))
+
+            for name in [name for name in fields if name not in kept]:
+                fields.pop(name)
+
+        return serializer
+
+    def get_deferred_fields(self, queryset):
+        """
+        Return the model fields no rendered serializer field reads.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The filtered queryset.
+
+        Returns
+        -------
+        list[str]
+            The names of the fields to defer.
+        """
+        needed = {
+            field.source.split(".")[0]
+            for field in self.get_serializer().fields.values()
+            if field.source != "*" and not field.write_only
+        }
+        select_related = queryset.query.select_related
+
+        return [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in needed
+            and field.attname not in needed
+            and not (
+                field.is_relation
+                and (
+                    select_related is True
+                    or (
+                        isinstance(select_related, dict)
+                        and field.name in select_related
+                    )
+                )
+            )
+        ]
+
+    def filter_queryset(self, queryset):
+        """
+        Filter the queryset, deferring the columns the response does not
+        read.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to filter.
+
+        Returns
+        -------
+        QuerySet
+            The filtered queryset.
+        """
+        queryset = super().filter_queryset(queryset)
+
+        if self.is_sparse():
+            deferred = self.get_deferred_fields(queryset)
+
+            if deferred:
+                queryset = queryset.defer(*deferred)
+
+        return queryset
+
+
+class ValuesListMixin:
+    """
+    Answer `list` requests from `values()` rows, without instantiating the
+    models or walking the serializer fields on each of them.
+
+    The fields of the serializer are compiled once per request into
+    `values()` paths and conversions, see `core/products/values.py`, so the
+    response is the same as the one of the serializer. The fields that are
+    neither model fields nor annotations, like properties, are computed by
+    the `values_expressions` of the same name. Lists whose serializer
+    cannot be read from `values()` are serialized as usual.
+    """
+
+    values_expressions = {}
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the objects from their `values()` rows when possible.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        reader = compile_values_reader(
+            self.get_serializer(), queryset, self.values_expressions
+        )
+
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = reader.values(queryset)
+        page = self.paginate_queryset(rows)
+
+        if page is not None:
+            return self.get_paginated_response([reader(row) for row in page])
+
+        return Response([reader(row) for row in rows], status=status.HTTP_200_OK)
+
+
+class ExpandMixin:
+    """
+    Let clients expand the relations of `list` and `retrieve` responses
+    with `?expand=`, e.g. `?expand=product.category,product.unit`.
+
+    The serializer must use `ExpandableFieldsMixin`. The expanded relations
+    are loaded with the `select_related` and `prefetch_related` lookups
+    computed from the serializer, so expanding does not add queries per
+    object.
+    """
+
+    expand_query_param = "expand"
+
+    def get_expand(self):
+        """
+        Return the tree of relations expanded by the client.
+
+        Returns
+        -------
+        dict
+            The tree of expanded relations, empty when nothing is expanded.
+        """
+        serializer_class = self.get_serializer_class()
+
+        if (
+            self.request is None
+            or self.action not in SPARSE_ACTIONS
+            or self.expand_query_param not in self.request.query_params
+            or not issubclass(serializer_class, ExpandableFieldsMixin)
+        ):
+            return {}
+
+        return parse_expand(
+            self.request.query_params[self.expand_query_param],
+            serializer_class,
+            self.expand_query_param,
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Return the serializer, with the expanded relations nested.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to the serializer.
+        **kwargs : dict
+            Keyword arguments passed to the serializer.
+
+        Returns
+        -------
+        Serializer
+            The serializer instance.
+        """
+        expand = self.get_expand()
+
+        if expand:
+            kwargs["expand"] = expand
+
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        """
+        Filter the queryset, loading the expanded relations.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to filter.
+
+        Returns
+        -------
+        QuerySet
+            The filtered queryset.
+        """
+        queryset = super().filter_queryset(queryset)
+        expand = self.get_expand()
+
+        if expand:
+            queryset = expand_queryset(queryset, self.get_serializer_class(), expand)
+
+        return queryset
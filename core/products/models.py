@@ -5,7 +5,7 @@ This file is used to define the models for the products app.
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from simple_history.models import HistoricalRecords
 from taggit.managers import TaggableManager
@@ -210,6 +210,9 @@ class ProductVariant(models.Model):
     Represents a variant of a product with specific attributes like size and flavor.
     """
 
+    # The fields the autocomplete prefix index is built from.
+    AUTOCOMPLETE_FIELDS = ["sku", "display_name", "is_deleted"]
+
     sku = models.CharField(
         max_length=30,
         unique=True,
@@ -279,6 +282,14 @@ class ProductVariant(models.Model):
         db_index=True,
     )
 
+    display_name = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="The human-readable name, kept in sync with the product and unit.",
+    )
+
     image = models.ImageField(
         upload_to="variants/",
         null=True,
@@ -334,13 +345,28 @@ class ProductVariant(models.Model):
         str
             The string representation of the product variant.
         """
+        return self.display_name or self.build_display_name()
+
+    def build_display_name(self):
+        """
+        Build the human-readable name from the product, unit and attributes.
+
+        Loads the product and its unit unless they are already cached.
+
+        Returns
+        -------
+        str
+            The display name of the product variant.
+        """
         details = []
 
         if self.brand:
             details.append(self.brand)
 
         if self.size:
-            details.append(f"{self.size}{self.product.unit.symbol}")
+            size = Decimal(str(self.size)).normalize()
+            unit = self.product.unit.symbol if self.product.unit else ""
+            details.append(f"{size:f}{unit}")
 
         if self.flavor:
             details.append(self.flavor)
@@ -363,6 +389,17 @@ class ProductVariant(models.Model):
 
         return f"{base_sku}-{brand_part}-{size_part}-{flavor_part}"
 
+    def generate_slug(self):
+        """
+        Generate a slug based on product attributes.
+
+        Returns
+        -------
+        str
+            The generated slug.
+        """
+        return slugify(f"{self.product.name}-{self.size or ''}-{self.flavor or ''}")
+
     def save(self, *args, **kwargs):
         """
         Save the product variant and generate an SKU if it does not exist.
@@ -387,16 +424,29 @@ class ProductVariant(models.Model):
                 counter += 1
 
         if not self.slug:
-            slug_base = f"{self.product.name}-{self.size or ''}-{self.flavor or ''}"
-            self.slug = slugify(slug_base)
-
-        # Check if the price has changed before saving
-        if self.pk:
-            previous = ProductVariant.objects.filter(pk=self.pk).first()
-            if previous and previous.price != self.price:
-                ProductPriceHistory.objects.create(
-                    product_variant=self,
-                    price=previous.price,
-                )
-
-        super().save(*args, **kwargs)
+            self.slug = self.generate_slug()
+
+        self.display_name = self.build_display_name()
+
+        # The price history, and what its receivers write, is rolled back
+        # with the variant when the save fails.
+        with transaction.atomic():
+            previous = None
+
+            # Check if the price has changed before saving
+            if self.pk:
+                previous = ProductVariant.objects.filter(pk=self.pk).first()
+                if previous and previous.price != self.price:
+                    ProductPriceHistory.objects.create(
+                        product_variant=self,
+                        price=previous.price,
+                    )
+
+            # Read by the signals to only rebuild the autocomplete index
+            # when the text it holds changed.
+            self._autocomplete_changed = previous is None or any(
+                getattr(previous, field) != getattr(self, field)
+                for field in self.AUTOCOMPLETE_FIELDS
+            )
+
+            super().save(*args, **kwargs)
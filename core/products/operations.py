@@ -0,0 +1,51 @@
+"""
+Migration operations of the products app.
+"""
+
+from django.db import migrations
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """
+    Run SQL on PostgreSQL only, for the schema other databases do not have,
+    like the `tsvector` columns and GIN indexes of the search backend.
+
+    The statements show in `sqlmigrate` and are reversed with `reverse_sql`
+    like those of `RunSQL`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        """
+        Run the SQL when migrating a PostgreSQL database forwards.
+
+        Parameters
+        ----------
+        app_label : str
+            The label of the migrated app.
+        schema_editor : BaseDatabaseSchemaEditor
+            The schema editor of the migrated database.
+        from_state : ProjectState
+            The project state before the operation.
+        to_state : ProjectState
+            The project state after the operation.
+        """
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        """
+        Run the reverse SQL when migrating a PostgreSQL database backwards.
+
+        Parameters
+        ----------
+        app_label : str
+            The label of the migrated app.
+        schema_editor : BaseDatabaseSchemaEditor
+            The schema editor of the migrated database.
+        from_state : ProjectState
+            The project state before the operation.
+        to_state : ProjectState
+            The project state after the operation.
+        """
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
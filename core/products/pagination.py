@@ -2,14 +2,437 @@
 Logic for paginating products.
 """
 
-from rest_framework.pagination import LimitOffsetPagination
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder of the cursor positions.
+
+    Unlike `DjangoJSONEncoder`, the microseconds of times are kept, so that a
+    cursor compares equal to the row it was taken from.
+    """
+
+    def default(self, o):
+        """
+        Encode times in full precision.
+
+        Parameters
+        ----------
+        o : object
+            The object to encode.
+
+        Returns
+        -------
+        object
+            The JSON serializable value.
+        """
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over the first ordering field of the queryset and the
+    primary key.
+
+    Pages are fetched with a `WHERE (field, id) > (value, id)` condition
+    instead of an offset and without counting the rows, so every page costs
+    the same however deep it is. NULL values are ordered last in both
+    directions. Only the first ordering field is honoured; ties are broken
+    by the primary key.
+    """
+
+    default_limit = 10
+    max_limit = 100
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    keyset_annotation = "keyset_value"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return a single page of results.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The ordered queryset to paginate.
+        request : Request
+            The request object.
+        view : APIView, optional
+            The view paginating the queryset.
+
+        Returns
+        -------
+        list
+            The objects of the requested page.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.field, self.descending = self.get_ordering(queryset)
+        value, pk, self.reverse = self.decode_cursor(request)
+        self.cursor_given = pk is not None
+        self.nullable = False
+
+        if self.field:
+            queryset = queryset.annotate(**{self.keyset_annotation: F(self.field)})
+            self.nullable = self.is_nullable(queryset, self.field)
+
+        if self.cursor_given:
+            queryset = queryset.filter(self.get_keyset_filter(value, pk))
+
+        results = list(queryset.order_by(*self.get_order_by())[: self.limit + 1])
+        self.has_more = len(results) > self.limit
+        results = results[: self.limit]
+
+        if self.reverse:
+            results.reverse()
+
+        self.page = results
+
+        return results
+
+    def get_limit(self, request):
+        """
+        Return the page size requested with `?limit=`, capped at `max_limit`.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        int
+            The page size.
+        """
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+
+        if limit <= 0:
+            return self.default_limit
+
+        return min(limit, self.max_limit)
+
+    def get_ordering(self, queryset):
+        """
+        Return the first ordering field of the queryset and its direction.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to paginate.
+
+        Returns
+        -------
+        tuple
+            The field path, or `None` when ordering by primary key only, and
+            whether the ordering is descending.
+        """
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+
+        if not ordering or not isinstance(ordering[0], str) or ordering[0] == "?":
+            return None, False
+
+        descending = ordering[0].startswith("-")
+        field = ordering[0].lstrip("-")
+
+        if field in ("pk", queryset.model._meta.pk.name):
+            return None, descending
+
+        return field, descending
+
+    def is_nullable(self, queryset, field):
+        """
+        Return whether the ordering field may hold NULL values.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to paginate.
+        field : str
+            The ordering field path.
+
+        Returns
+        -------
+        bool
+            `False` only for model fields known to be non-nullable.
+        """
+        try:
+            return queryset.model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return True
+
+    def get_order_by(self):
+        """
+        Return the ordering of the traversal, reversed for backward pages.
+
+        Returns
+        -------
+        list
+            The expressions to order the queryset by.
+        """
+        descending = self.descending != self.reverse
+        pk = F("pk").desc() if descending else F("pk").asc()
+
+        if not self.field:
+            return [pk]
+
+        # NULLs come last going forward, so first when walking backwards.
+        nulls = {"nulls_first": True} if self.reverse else {"nulls_last": True}
+        value = F(self.keyset_annotation)
+        value = value.desc(**nulls) if descending else value.asc(**nulls)
+
+        return [value, pk]
+
+    def get_keyset_filter(self, value, pk):
+        """
+        Return the condition selecting the rows beyond the cursor position.
+
+        Parameters
+        ----------
+        value : object
+            The ordering field value at the cursor position.
+        pk : object
+            The primary key at the cursor position.
+
+        Returns
+        -------
+        Q
+            The keyset condition.
+        """
+        lookup = "lt" if self.descending != self.reverse else "gt"
+        after_pk = Q(**{f"pk__{lookup}": pk})
+
+        if not self.field:
+            return after_pk
+
+        field = self.keyset_annotation
+        is_null = Q(**{f"{field}__isnull": True})
+
+        # NULLs sit at the end of the forward traversal.
+        if value is None:
+            if self.reverse:
+                return ~is_null | (is_null & after_pk)
+            return is_null & after_pk
+
+        condition = Q(**{f"{field}__{lookup}": value}) | (
+            Q(**{field: value}) & after_pk
+        )
+
+        if self.nullable and not self.reverse:
+            condition |= is_null
+
+        return condition
+
+    def encode_cursor(self, obj, reverse):
+        """
+        Return an opaque cursor pointing at the given object.
+
+        Parameters
+        ----------
+        obj : Model or dict
+            The object at the cursor position, or its `values()` row.
+        reverse : bool
+            Whether the cursor walks backwards.
+
+        Returns
+        -------
+        str
+            The encoded cursor.
+        """
+        if isinstance(obj, dict):
+            value, pk = obj.get(self.keyset_annotation), obj["pk"]
+        else:
+            value, pk = getattr(obj, self.keyset_annotation, None), obj.pk
+
+        position = {"v": value if self.field else None, "pk": pk, "r": reverse}
+        data = json.dumps(position, cls=CursorEncoder).encode()
+
+        return urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """
+        Return the position held by the `?cursor=` parameter.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        tuple
+            The ordering field value, the primary key and whether to walk
+            backwards. The primary key is `None` for the first page.
+
+        Raises
+        ------
+        NotFound
+            If the cursor cannot be decoded.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if not cursor:
+            return None, None, False
+
+        try:
+            data = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            position = json.loads(data)
+            return position["v"], position["pk"], bool(position["r"])
+        except (BinasciiError, TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_link(self, obj, reverse):
+        """
+        Return the URL of the page beyond the given object.
+
+        Parameters
+        ----------
+        obj : Model
+            The object at the edge of the current page.
+        reverse : bool
+            Whether the link walks backwards.
+
+        Returns
+        -------
+        str
+            The page URL.
+        """
+        url = remove_query_param(self.request.build_absolute_uri(), "offset")
+
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(obj, reverse)
+        )
+
+    def get_next_link(self):
+        """
+        Return the URL of the next page, if any.
+
+        Returns
+        -------
+        str or None
+            The next page URL.
+        """
+        has_next = self.cursor_given if self.reverse else self.has_more
+
+        if not self.page or not has_next:
+            return None
+
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        """
+        Return the URL of the previous page, if any.
+
+        Returns
+        -------
+        str or None
+            The previous page URL.
+        """
+        has_previous = self.has_more if self.reverse else self.cursor_given
+
+        if not self.page or not has_previous:
+            return None
+
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        """
+        Return the page with links to its neighbours and no count.
+
+        Parameters
+        ----------
+        data : list
+            The serialized page.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
 
 
 class StandardPagination(LimitOffsetPagination):
     """
     Standard pagination for the `products` app.
+
+    Requests opt into `KeysetPagination` with `?pagination=keyset`, and keep
+    using it while following its cursors.
     """
 
     default_limit = 10
     limit_query_param = "limit"
     offset_query_param = "offset"
+    mode_query_param = "pagination"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate with keyset pagination when requested, or by offset.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset to paginate.
+        request : Request
+            The request object.
+        view : APIView, optional
+            The view paginating the queryset.
+
+        Returns
+        -------
+        list
+            The objects of the requested page.
+        """
+        self.keyset = None
+
+        if (
+            request.query_params.get(self.mode_query_param) == "keyset"
+            or KeysetPagination.cursor_query_param in request.query_params
+        ):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        """
+        Return the page in the format of the pagination in use.
+
+        Parameters
+        ----------
+        data : list
+            The serialized page.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
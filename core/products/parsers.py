@@ -0,0 +1,57 @@
+"""
+Fast JSON parsing of API requests.
+"""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parser which parses JSON with `orjson` when it is installed.
+
+    Like `JSONParser` in strict mode, `NaN` and `Infinity` are rejected.
+    Bodies in an encoding other than UTF-8, non-strict parsing and the
+    parsing without `orjson` installed fall back to `JSONParser`.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parse the incoming bytestream as JSON.
+
+        Parameters
+        ----------
+        stream : file-like
+            The request body.
+        media_type : str, optional
+            The media type of the request body.
+        parser_context : dict, optional
+            The context of the request, with its `encoding`.
+
+        Returns
+        -------
+        object
+            The parsed data.
+
+        Raises
+        ------
+        ParseError
+            If the body is not valid JSON.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
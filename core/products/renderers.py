@@ -0,0 +1,69 @@
+"""
+Fast JSON rendering of API responses.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON with `orjson` when it is installed.
+
+    The output is byte-identical to the one of `JSONRenderer` for compact,
+    unindented responses: `Decimal`, `datetime`, UUID and the other types
+    `orjson` does not spell like DRF are encoded by DRF's own encoder, and
+    `\\u2028` and `\\u2029` are escaped the same way. Indented or
+    ASCII-only responses, like the ones of the browsable API, and the
+    rendering without `orjson` installed fall back to `JSONRenderer`.
+
+    Floats whose stdlib representation uses an exponent (below `1e-4` or
+    from `1e16`) and non-finite floats are spelled differently; the API does
+    not return float fields.
+    """
+
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON.
+
+        Parameters
+        ----------
+        data : object
+            The data to render.
+        accepted_media_type : str, optional
+            The media type accepted by the client, with its `indent`.
+        renderer_context : dict, optional
+            The context of the response, with its `indent`.
+
+        Returns
+        -------
+        bytes
+            The rendered JSON, empty when `data` is `None`.
+        """
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        if orjson is None or indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits, or data neither encoder handles.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like `JSONRenderer`, so the output is a javascript subset.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
@@ -0,0 +1,493 @@
+"""
+Full-text search backends for products and product variants.
+
+Each backend keeps a search index beside the product tables and answers
+ranked queries from it, so a search does not scan every row with
+`icontains` lookups. The backend is chosen from the database vendor, or
+from the `PRODUCT_SEARCH_BACKEND` setting when given.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .caching import invalidate_models
+from .models import Product, ProductVariant
+
+# The indexed columns of each model, as `(column, field path, weight)`.
+SEARCH_DOCUMENTS = {
+    Product: [
+        ("name", "name", "A"),
+        ("category", "category__name", "B"),
+        ("description", "description", "C"),
+    ],
+    ProductVariant: [
+        ("name", "display_name", "A"),
+        ("sku", "sku", "A"),
+        ("description", "description", "C"),
+    ],
+}
+
+SEARCH_RANK = "search_rank"
+
+
+def get_search_words(terms):
+    """
+    Split search terms into the words the search indexes hold.
+
+    Parameters
+    ----------
+    terms : list[str]
+        The search terms.
+
+    Returns
+    -------
+    list[str]
+        The words of the terms, without punctuation or query syntax.
+    """
+    return [word for term in terms for word in re.findall(r"\w+", term)]
+
+
+class SearchBackend(ABC):
+    """
+    Base class of the search backends.
+
+    The index of a model is written with `index` after its rows change and
+    cleared with `remove` after they are deleted. Subclasses implement
+    `search`.
+    """
+
+    def install(self):
+        """
+        Create the search indexes the migrations do not create, when they do
+        not exist yet.
+        """
+
+    def get_documents(self, model, pks):
+        """
+        Return the indexed values of the given rows.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the rows.
+
+        Returns
+        -------
+        list[tuple]
+            The primary key followed by the indexed values of each row.
+        """
+        paths = [path for _, path, _ in SEARCH_DOCUMENTS[model]]
+
+        return [
+            (pk, *[value or "" for value in values])
+            for pk, *values in model.objects.filter(pk__in=list(pks)).values_list(
+                "pk", *paths
+            )
+        ]
+
+    def index(self, model, pks):
+        """
+        Write the given rows to the search index.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the rows.
+        """
+
+    def remove(self, model, pks):
+        """
+        Remove the given rows from the search index.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the deleted rows.
+        """
+
+    @abstractmethod
+    def search(self, queryset, words):
+        """
+        Filter a queryset to the rows matching every word, annotated with a
+        `search_rank` where higher ranks match better.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset of an indexed model.
+        words : list[str]
+            The search words, as split by `get_search_words`.
+
+        Returns
+        -------
+        QuerySet
+            The matching rows.
+        """
+
+    def autocomplete(self, prefix, limit):
+        """
+        Return the product variants whose SKU or name matches a typed prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The typed prefix.
+        limit : int
+            The most variants to return.
+
+        Returns
+        -------
+        list[dict] or None
+            The `id`, `sku` and `name` of each match, best first, or `None`
+            when the backend leaves autocomplete to the in-process index.
+        """
+        return None
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Search backend storing a weighted `tsvector` column with a GIN index on
+    each indexed table.
+
+    The columns, their indexes and the trigram indexes of the variant SKUs
+    and names are created by the `products` migrations.
+    """
+
+    column = "search_vector"
+    config = "simple"
+
+    def index(self, model, pks):
+        """
+        Write the `tsvector` of the given rows.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the rows.
+        """
+        documents = self.get_documents(model, pks)
+
+        if not documents:
+            return
+
+        vector = " || ".join(
+            f"setweight(to_tsvector('{self.config}', %s), '{weight}')"
+            for _, _, weight in SEARCH_DOCUMENTS[model]
+        )
+        table = connection.ops.quote_name(model._meta.db_table)
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {table} SET {self.column} = {vector} WHERE id = %s",
+                [(*values, pk) for pk, *values in documents],
+            )
+
+    def search(self, queryset, words):
+        """
+        Filter a queryset with a prefix `tsquery` ranked by `ts_rank`.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset of an indexed model.
+        words : list[str]
+            The search words, as split by `get_search_words`.
+
+        Returns
+        -------
+        QuerySet
+            The matching rows.
+        """
+        query = " & ".join(f"{word}:*" for word in words)
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        tsquery = f"to_tsquery('{self.config}', %s)"
+
+        return queryset.filter(
+            RawSQL(
+                f"{table}.{self.column} @@ {tsquery}",
+                (query,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            **{
+                SEARCH_RANK: RawSQL(
+                    f"ts_rank({table}.{self.column}, {tsquery})",
+                    (query,),
+                    output_field=FloatField(),
+                )
+            }
+        )
+
+    def autocomplete(self, prefix, limit):
+        """
+        Return the product variants whose SKU or name contains the typed
+        prefix, or is similar to it, ranked by trigram similarity.
+
+        Parameters
+        ----------
+        prefix : str
+            The typed prefix.
+        limit : int
+            The most variants to return.
+
+        Returns
+        -------
+        list[dict]
+            The `id`, `sku` and `name` of each match, best first.
+        """
+        table = connection.ops.quote_name(ProductVariant._meta.db_table)
+        # `%%` is the trigram similarity operator, escaped for the driver.
+        # The expressions match the trigram indexes and Django's `UPPER`
+        # lookups so the indexes are used.
+        similar = RawSQL(
+            f"UPPER({table}.display_name::text) %% UPPER(%s)",
+            (prefix,),
+            output_field=BooleanField(),
+        )
+        similarity = RawSQL(
+            f"GREATEST(similarity(UPPER({table}.sku::text), UPPER(%s)), "
+            f"similarity(UPPER({table}.display_name::text), UPPER(%s)))",
+            (prefix, prefix),
+            output_field=FloatField(),
+        )
+
+        return [
+            {"id": pk, "sku": sku, "name": name}
+            for pk, sku, name in ProductVariant.objects.filter(is_deleted=False)
+            .filter(
+                Q(sku__istartswith=prefix) | Q(display_name__icontains=prefix) | similar
+            )
+            .annotate(similarity=similarity)
+            .order_by("-similarity", "pk")
+            .values_list("pk", "sku", "display_name")[:limit]
+        ]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Search backend storing an FTS5 shadow table beside each indexed table,
+    keyed by the primary key of the indexed rows.
+    """
+
+    def get_table(self, model):
+        """
+        Return the name of the FTS5 table of a model.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+
+        Returns
+        -------
+        str
+            The quoted table name.
+        """
+        return connection.ops.quote_name(f"{model._meta.db_table}_fts")
+
+    def install(self):
+        """
+        Create the FTS5 tables.
+        """
+        with connection.cursor() as cursor:
+            for model, columns in SEARCH_DOCUMENTS.items():
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.get_table(model)} "
+                    f"USING fts5({', '.join(column for column, _, _ in columns)}, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+
+    def index(self, model, pks):
+        """
+        Replace the FTS5 rows of the given rows.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the rows.
+        """
+        documents = self.get_documents(model, pks)
+        columns = [column for column, _, _ in SEARCH_DOCUMENTS[model]]
+        table = self.get_table(model)
+
+        self.remove(model, [pk for pk, *_ in documents])
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * (len(columns) + 1))})",
+                documents,
+            )
+
+    def remove(self, model, pks):
+        """
+        Delete the FTS5 rows of the given rows.
+
+        Parameters
+        ----------
+        model : Model
+            The indexed model.
+        pks : iterable of int
+            The primary keys of the deleted rows.
+        """
+        pks = list(pks)
+
+        if not pks:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.get_table(model)} "
+                f"WHERE rowid IN ({', '.join(['%s'] * len(pks))})",
+                pks,
+            )
+
+    def search(self, queryset, words):
+        """
+        Filter a queryset with a prefix FTS5 query ranked by `bm25`.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The queryset of an indexed model.
+        words : list[str]
+            The search words, as split by `get_search_words`.
+
+        Returns
+        -------
+        QuerySet
+            The matching rows.
+        """
+        query = " ".join(f'"{word}"*' for word in words)
+        table = self.get_table(queryset.model)
+        pk = (
+            f"{connection.ops.quote_name(queryset.model._meta.db_table)}."
+            f"{connection.ops.quote_name(queryset.model._meta.pk.column)}"
+        )
+
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", (query,))
+        ).annotate(
+            **{
+                # bm25 scores better matches lower.
+                SEARCH_RANK: RawSQL(
+                    f"SELECT -bm25({table}) FROM {table} "
+                    f"WHERE {table} MATCH %s AND rowid = {pk}",
+                    (query,),
+                    output_field=FloatField(),
+                )
+            }
+        )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+@lru_cache
+def get_search_backend():
+    """
+    Return the search backend of the default database.
+
+    Returns
+    -------
+    SearchBackend or None
+        The backend, or `None` when the database has no search backend.
+    """
+    path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+
+    if path:
+        return import_string(path)()
+
+    backend = SEARCH_BACKENDS.get(connection.vendor)
+
+    return backend() if backend else None
+
+
+def rebuild_search_index(batch_size=1000):
+    """
+    Create the search indexes and write every indexed row to them.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        The number of rows written at a time.
+
+    Returns
+    -------
+    int
+        The number of rows indexed.
+    """
+    backend = get_search_backend()
+
+    if not backend:
+        return 0
+
+    backend.install()
+    count = 0
+
+    for model in SEARCH_DOCUMENTS:
+        pks = list(model.objects.order_by("pk").values_list("pk", flat=True))
+
+        for start in range(0, len(pks), batch_size):
+            backend.index(model, pks[start : start + batch_size])
+
+        count += len(pks)
+
+    # Drop the responses cached from the index before the rebuild.
+    invalidate_models(*SEARCH_DOCUMENTS)
+
+    return count
+
+
+def index_search_documents(model, pks):
+    """
+    Write the given rows of an indexed model to the search index.
+
+    Parameters
+    ----------
+    model : Model
+        The indexed model.
+    pks : iterable of int
+        The primary keys of the rows.
+    """
+    backend = get_search_backend()
+
+    if backend:
+        backend.index(model, pks)
+
+
+def remove_search_documents(model, pks):
+    """
+    Remove the given rows of an indexed model from the search index.
+
+    Parameters
+    ----------
+    model : Model
+        The indexed model.
+    pks : iterable of int
+        The primary keys of the deleted rows.
+    """
+    backend = get_search_backend()
+
+    if backend:
+        backend.remove(model, pks)
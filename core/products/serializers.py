@@ -2,11 +2,17 @@
 Serializers for the products app.
 """
 
+from decimal import Decimal
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from taggit.serializers import TaggitSerializer, TagListSerializerField
 
 from core.custom_user.models import User
 
+from .expand import ExpandableFieldsMixin, Expansion
+from .exports import EXPORT_COMPRESSIONS, EXPORT_FORMATS
 from .models import (
     Product,
     ProductCategory,
@@ -16,11 +22,74 @@ from .models import (
 )
 
 
-class ProductSerializer(TaggitSerializer, serializers.ModelSerializer):
+def get_product_queryset():
+    """
+    Return the products with everything `ProductSerializer` reads loaded.
+
+    Returns
+    -------
+    QuerySet
+        The products with their category, unit, tags and variant count.
+    """
+    return (
+        Product.objects.select_related("category", "unit")
+        .prefetch_related("tags")
+        .annotate(variant_count=Count("variants"))
+    )
+
+
+def get_product_variant_queryset():
+    """
+    Return the product variants with everything `ProductVariantSerializer`
+    reads loaded.
+
+    Returns
+    -------
+    QuerySet
+        The variants with their product details and maintained
+        cross-warehouse availability.
+    """
+    return ProductVariant.objects.select_related(
+        "product__category", "product__unit"
+    ).annotate(
+        total_on_hand=Coalesce(F("availability__total_on_hand"), Value(0)),
+        warehouses_stocked=Coalesce(F("availability__warehouses_stocked"), Value(0)),
+        last_movement_at=F("availability__last_movement_at"),
+    )
+
+
+class ProductCategoryNestedSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a ProductCategory expanded within another object.
+    """
+
+    class Meta:
+        model = ProductCategory
+        fields = "__all__"
+
+
+class ProductUnitNestedSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a ProductUnit expanded within another object.
+    """
+
+    class Meta:
+        model = ProductUnit
+        fields = "__all__"
+
+
+class ProductSerializer(
+    ExpandableFieldsMixin, TaggitSerializer, serializers.ModelSerializer
+):
     """
     Serializer for the Product model.
     """
 
+    expandable_fields = {
+        "category": Expansion(ProductCategoryNestedSerializer),
+        "unit": Expansion(ProductUnitNestedSerializer),
+    }
+
     author = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),
         required=False,
@@ -45,7 +114,8 @@ class ProductSerializer(TaggitSerializer, serializers.ModelSerializer):
 
     def to_representation(self, instance):
         """
-        Add the number of variants associated with the product.
+        Add the number of variants associated with the product, unless it
+        was annotated on the queryset.
 
         Parameters
         ----------
@@ -57,7 +127,8 @@ class ProductSerializer(TaggitSerializer, serializers.ModelSerializer):
         dict
             The serialized product instance.
         """
-        instance.variant_count = instance.variants.count()
+        if not hasattr(instance, "variant_count"):
+            instance.variant_count = instance.variants.count()
 
         return super().to_representation(instance)
 
@@ -93,6 +164,9 @@ class ProductUnitSerializer(serializers.ModelSerializer):
         int
             The number of products associated with this unit.
         """
+        if hasattr(obj, "product_count"):
+            return obj.product_count
+
         return obj.products.count()
 
     class Meta:
@@ -127,6 +201,9 @@ class ProductCategoryDetailSerializer(serializers.ModelSerializer):
         int
             The number of products associated with this category.
         """
+        if hasattr(obj, "product_count"):
+            return obj.product_count
+
         return obj.products.count()
 
     class Meta:
@@ -159,6 +236,9 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         int
             The number of products associated with this category.
         """
+        if hasattr(obj, "product_count"):
+            return obj.product_count
+
         return obj.products.count()
 
     class Meta:
@@ -180,12 +260,16 @@ class ProductPriceHistorySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class ProductVariantSerializer(serializers.ModelSerializer):
+class ProductVariantSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the ProductVariant model.
     Merges necessary details from the Product model.
     """
 
+    expandable_fields = {
+        "product": Expansion(ProductSerializer, get_product_queryset()),
+    }
+
     name = serializers.CharField(
         source="product.name",
         read_only=True,
@@ -204,6 +288,10 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         required=True,
     )
 
+    total_on_hand = serializers.IntegerField(read_only=True)
+    warehouses_stocked = serializers.IntegerField(read_only=True)
+    last_movement_at = serializers.DateTimeField(read_only=True)
+
     class Meta:
         model = ProductVariant
         fields = "__all__"
@@ -214,15 +302,99 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         }
 
 
-class ProductVariantDetailSerializer(serializers.ModelSerializer):
+class ProductVariantDetailSerializer(
+    ExpandableFieldsMixin, serializers.ModelSerializer
+):
     """
     Serializer for the ProductVariant model.
+
+    The product is given by id, unless expanded with `?expand=product`,
+    `?expand=product.category` and so on.
     """
 
-    product = ProductSerializer(read_only=True)
+    expandable_fields = ProductVariantSerializer.expandable_fields
 
     class Meta:
         model = ProductVariant
         fields = "__all__"
 
-        depth = 2
+
+class ProductVariantPriceSerializer(serializers.Serializer):
+    """
+    Serializer for the new price of a product variant given by id or SKU.
+    """
+
+    id = serializers.IntegerField(required=False)
+    sku = serializers.CharField(required=False, max_length=30)
+    price = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal("0"),
+    )
+
+    def validate(self, attrs):
+        """
+        Ensure exactly one of `id` and `sku` identifies the variant.
+
+        Parameters
+        ----------
+        attrs : dict
+            The validated data.
+
+        Returns
+        -------
+        dict
+            The validated data.
+
+        Raises
+        ------
+        serializers.ValidationError
+            If neither or both of `id` and `sku` are given.
+        """
+        if ("id" in attrs) == ("sku" in attrs):
+            raise serializers.ValidationError(
+                "Please provide either the `id` or the `sku` of the variant."
+            )
+
+        return attrs
+
+
+class ProductVariantRepriceSerializer(serializers.Serializer):
+    """
+    Serializer for repricing many product variants at once.
+    """
+
+    prices = ProductVariantPriceSerializer(many=True, allow_empty=False)
+
+
+class ProductVariantBulkCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for creating many product variants at once.
+
+    The product is taken by id and the uniqueness checks are left to the
+    service, so validating a row does not query the database.
+    """
+
+    product = serializers.IntegerField()
+
+    class Meta:
+        model = ProductVariant
+        fields = [
+            "product",
+            "brand",
+            "description",
+            "size",
+            "flavor",
+            "price",
+            "is_active",
+        ]
+        validators = []
+
+
+class ExportSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a streaming export.
+    """
+
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default="ndjson")
+    compression = serializers.ChoiceField(choices=EXPORT_COMPRESSIONS, required=False)
@@ -0,0 +1,244 @@
+"""
+Services operating on products and their variants.
+"""
+
+from collections import Counter
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from .autocomplete import invalidate_prefix_index
+from .caching import invalidate_models
+from .models import Product, ProductPriceHistory, ProductVariant
+from .search import index_search_documents
+from .signals import product_variants_repriced
+
+
+def reprice_product_variants(rows, author=None):
+    """
+    Change the prices of many product variants in one transaction.
+
+    The variants are looked up by id or SKU in a single query and only the
+    ones whose price actually changes are written. The prices, the price
+    history and the historical records are each written with batched
+    statements, so the cost does not grow with one query per variant.
+    When a variant is given more than once, by id or by SKU, the last price
+    wins.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        Rows holding either an `id` or a `sku`, and the new `price`.
+    author : User, optional
+        The user recorded on the historical records.
+
+    Returns
+    -------
+    dict
+        The number of variants repriced and left unchanged.
+
+    Raises
+    ------
+    ValidationError
+        If a variant does not exist.
+    """
+    rows = [(row.get("id"), row.get("sku"), Decimal(str(row["price"]))) for row in rows]
+    ids = {int(pk) for pk, _, _ in rows if pk is not None}
+    skus = {sku for pk, sku, _ in rows if pk is None}
+
+    with transaction.atomic():
+        variants = list(
+            ProductVariant.objects.select_for_update()
+            .filter(Q(pk__in=ids) | Q(sku__in=skus))
+            .order_by("pk")
+        )
+
+        found_ids = {variant.pk for variant in variants}
+        pks_by_sku = {variant.sku: variant.pk for variant in variants}
+        missing = [str(pk) for pk in sorted(ids - found_ids)] + sorted(
+            skus - set(pks_by_sku)
+        )
+
+        if missing:
+            raise ValidationError(
+                {"product_variant": f"Unknown product variants: {missing}."}
+            )
+
+        # Rows naming the same variant by id and by SKU are resolved to its
+        # id first, so the last of them wins.
+        prices = {
+            int(pk) if pk is not None else pks_by_sku[sku]: price
+            for pk, sku, price in rows
+        }
+
+        now = timezone.now()
+        history = []
+        price_deltas = {}
+
+        for variant in variants:
+            price = prices[variant.pk]
+
+            if price == variant.price:
+                continue
+
+            history.append(
+                ProductPriceHistory(product_variant=variant, price=variant.price)
+            )
+            price_deltas[variant.pk] = price - variant.price
+            variant.price = price
+            variant.updated = now
+
+        changed = [variant for variant in variants if variant.pk in price_deltas]
+
+        if changed:
+            bulk_update_with_history(
+                changed,
+                ProductVariant,
+                ["price", "updated"],
+                batch_size=1000,
+                default_user=author,
+                default_date=now,
+            )
+            ProductPriceHistory.objects.bulk_create(history, batch_size=1000)
+            invalidate_models(ProductVariant, ProductPriceHistory)
+            product_variants_repriced.send(
+                sender=ProductVariant, price_deltas=price_deltas
+            )
+
+    return {"repriced": len(changed), "unchanged": len(variants) - len(changed)}
+
+
+def _allocate_skus(variants):
+    """
+    Give each variant a free SKU, suffixing the generated SKU like
+    `ProductVariant.save` does when it is taken.
+
+    Parameters
+    ----------
+    variants : list[ProductVariant]
+        The variants holding their generated SKU.
+
+    Returns
+    -------
+    list[ProductVariant]
+        The variants with their allocated SKU.
+    """
+    generated = Counter(variant.sku for variant in variants)
+    existing = set(
+        ProductVariant.objects.filter(sku__in=generated).values_list("sku", flat=True)
+    )
+    colliding = [sku for sku, count in generated.items() if count > 1] + sorted(
+        existing
+    )
+
+    # Suffixed SKUs are only looked up for the generated SKUs that collide.
+    if colliding:
+        existing.update(
+            ProductVariant.objects.filter(
+                reduce(or_, [Q(sku__startswith=f"{sku}-") for sku in colliding])
+            ).values_list("sku", flat=True)
+        )
+
+    for variant in variants:
+        sku = variant.sku
+        counter = 1
+
+        while variant.sku in existing:
+            variant.sku = f"{sku}-{counter}"
+            counter += 1
+
+        existing.add(variant.sku)
+
+    return variants
+
+
+def create_product_variants(rows, author=None):
+    """
+    Create many product variants in one transaction.
+
+    The SKUs, slugs and display names are computed in memory and checked
+    against the existing variants with batched queries, then the variants
+    and their historical records are written with `bulk_create`, so the
+    number of queries does not grow with the number of variants.
+
+    Parameters
+    ----------
+    rows : iterable of dict
+        The fields of each variant, with the `product` given by id.
+    author : User, optional
+        The author of the variants.
+
+    Returns
+    -------
+    list[ProductVariant]
+        The created variants.
+
+    Raises
+    ------
+    ValidationError
+        If a product does not exist, or a variant or its slug already exists.
+    """
+    rows = list(rows)
+    products = Product.objects.select_related("unit").in_bulk(
+        {row["product"] for row in rows}
+    )
+    missing = sorted({row["product"] for row in rows} - set(products))
+
+    if missing:
+        raise ValidationError({"product": f"Unknown products: {missing}."})
+
+    variants = []
+
+    for row in rows:
+        variant = ProductVariant(
+            **{**row, "product": products[row["product"]]}, author=author
+        )
+        variant.sku = variant.generate_sku()
+        variant.slug = variant.generate_slug()
+        variant.display_name = variant.build_display_name()
+        variants.append(variant)
+
+    slugs = Counter(variant.slug for variant in variants)
+    duplicates = {slug for slug, count in slugs.items() if count > 1}
+    duplicates.update(
+        ProductVariant.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+    )
+
+    if duplicates:
+        raise ValidationError(
+            {
+                "slug": (
+                    "Product variants with these slugs already exist: "
+                    f"{sorted(duplicates)}."
+                )
+            }
+        )
+
+    try:
+        with transaction.atomic():
+            variants = bulk_create_with_history(
+                _allocate_skus(variants),
+                ProductVariant,
+                batch_size=1000,
+                default_user=author,
+            )
+            index_search_documents(ProductVariant, [variant.pk for variant in variants])
+            invalidate_models(ProductVariant)
+            invalidate_prefix_index()
+    except IntegrityError:
+        raise ValidationError(
+            {
+                "non_field_errors": (
+                    "A product variant with the same product, brand, size and "
+                    "flavor already exists."
+                )
+            }
+        )
+
+    return variants
@@ -0,0 +1,217 @@
+"""
+Signals for the products app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from taggit.models import TaggedItem
+
+from .autocomplete import invalidate_prefix_index
+from .caching import invalidate_models
+from .models import (
+    Product,
+    ProductCategory,
+    ProductPriceHistory,
+    ProductUnit,
+    ProductVariant,
+)
+from .search import get_search_backend, index_search_documents, remove_search_documents
+
+# Sent after variants are repriced in bulk, which bypasses `post_save`.
+# Receivers get `price_deltas`, mapping variant ids to new minus old price.
+product_variants_repriced = Signal()
+
+
+def refresh_display_names(variants):
+    """
+    Recompute the stored display names of the given variants, writing only
+    the names that changed.
+
+    Parameters
+    ----------
+    variants : QuerySet
+        The product variants to refresh.
+    """
+    changed = []
+
+    for variant in variants.select_related("product__unit").iterator():
+        display_name = variant.build_display_name()
+
+        if variant.display_name != display_name:
+            variant.display_name = display_name
+            changed.append(variant)
+
+    ProductVariant.objects.bulk_update(changed, ["display_name"], batch_size=1000)
+    index_search_documents(ProductVariant, [variant.pk for variant in changed])
+
+    if changed:
+        invalidate_models(ProductVariant)
+        invalidate_prefix_index()
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_variant_names(sender, instance, created, **kwargs):
+    """
+    Rename the variants of a product when the product changes.
+
+    Parameters
+    ----------
+    sender : Product
+        The Product model.
+    instance : Product
+        The Product instance.
+    created : bool
+        Whether the instance was created or updated.
+    **kwargs
+        Additional keyword arguments.
+    """
+    if not created:
+        refresh_display_names(ProductVariant.objects.filter(product=instance))
+
+
+@receiver(post_save, sender=ProductUnit)
+def refresh_unit_variant_names(sender, instance, created, **kwargs):
+    """
+    Rename the variants measured in a unit when the unit changes.
+
+    Parameters
+    ----------
+    sender : ProductUnit
+        The ProductUnit model.
+    instance : ProductUnit
+        The ProductUnit instance.
+    created : bool
+        Whether the instance was created or updated.
+    **kwargs
+        Additional keyword arguments.
+    """
+    if not created:
+        refresh_display_names(ProductVariant.objects.filter(product__unit=instance))
+
+
+def install_search_index(sender, **kwargs):
+    """
+    Create the search indexes of the database after migrating.
+
+    Only the SQLite FTS5 tables are created here, as they are virtual tables
+    outside the models; the PostgreSQL columns and indexes are migrations.
+
+    Parameters
+    ----------
+    sender : AppConfig
+        The `products` app config.
+    **kwargs
+        Additional keyword arguments.
+    """
+    backend = get_search_backend()
+
+    if backend:
+        backend.install()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductVariant)
+def index_search_document(sender, instance, **kwargs):
+    """
+    Write a saved product or product variant to the search index.
+
+    Parameters
+    ----------
+    sender : Product or ProductVariant
+        The saved model.
+    instance : Product or ProductVariant
+        The saved instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    index_search_documents(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductVariant)
+def remove_search_document(sender, instance, **kwargs):
+    """
+    Remove a deleted product or product variant from the search index.
+
+    Parameters
+    ----------
+    sender : Product or ProductVariant
+        The deleted model.
+    instance : Product or ProductVariant
+        The deleted instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    remove_search_documents(sender, [instance.pk])
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def invalidate_autocomplete(sender, instance, **kwargs):
+    """
+    Rebuild the autocomplete index when a variant is added, removed, or
+    its SKU, display name or deletion flag changes.
+
+    Parameters
+    ----------
+    sender : ProductVariant
+        The ProductVariant model.
+    instance : ProductVariant
+        The ProductVariant instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    if getattr(instance, "_autocomplete_changed", True):
+        invalidate_prefix_index()
+
+
+@receiver(post_save, sender=ProductCategory)
+def index_category_products(sender, instance, created, **kwargs):
+    """
+    Reindex the products of a category when the category changes, as the
+    category name is part of their search document.
+
+    Parameters
+    ----------
+    sender : ProductCategory
+        The ProductCategory model.
+    instance : ProductCategory
+        The ProductCategory instance.
+    created : bool
+        Whether the instance was created or updated.
+    **kwargs
+        Additional keyword arguments.
+    """
+    if not created:
+        index_search_documents(
+            Product,
+            Product.objects.filter(category=instance).values_list("pk", flat=True),
+        )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=ProductUnit)
+@receiver(post_delete, sender=ProductUnit)
+@receiver(post_save, sender=ProductPriceHistory)
+@receiver(post_delete, sender=ProductPriceHistory)
+@receiver(post_save, sender=TaggedItem)
+@receiver(post_delete, sender=TaggedItem)
+def invalidate_cached_catalog(sender, instance, **kwargs):
+    """
+    Invalidate the cached data read from a catalog model when it changes.
+
+    Parameters
+    ----------
+    sender : Model
+        The changed model.
+    instance : Model
+        The changed instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    invalidate_models(sender)
@@ -0,0 +1,154 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.autocomplete import PrefixIndex, autocomplete_variants
+from core.products.models import Product, ProductUnit, ProductVariant
+from core.products.search import PostgresSearchBackend
+from core.products.services import reprice_product_variants
+
+
+class TestPrefixIndex(TestCase):
+    def test_matches_skus_and_name_words(self):
+        index = PrefixIndex(
+            [
+                (1, "ORANGE-Acme-1-MAN", "Orange Juice (Acme, 1l, mango)"),
+                (2, "LEMON-NA-2-NA", "Lemon Soda (2l)"),
+                (3, "ORANGE-Best-1-NA", "Orange Juice (Best, 1l)"),
+            ]
+        )
+
+        self.assertEqual([match["id"] for match in index.lookup("ora", 10)], [1, 3])
+        self.assertEqual([match["id"] for match in index.lookup("ora", 1)], [1])
+        self.assertEqual([match["id"] for match in index.lookup("SODA", 10)], [2])
+        self.assertEqual([match["id"] for match in index.lookup("juice (b", 10)], [3])
+        self.assertEqual(index.lookup("apple", 10), [])
+        self.assertEqual(
+            index.lookup("mango", 10),
+            [
+                {
+                    "id": 1,
+                    "sku": "ORANGE-Acme-1-MAN",
+                    "name": "Orange Juice (Acme, 1l, mango)",
+                }
+            ],
+        )
+
+
+class TestAutocomplete(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = UserFactory()
+        unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.product = Product.objects.create(
+            author=self.author, name="Orange Juice", unit=unit
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant = self.add_variant("mango")
+
+    def add_variant(self, flavor):
+        return ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            brand="Acme",
+            flavor=flavor,
+            size=Decimal("1"),
+            price=Decimal("2.00"),
+        )
+
+    def suggest(self, query, **params):
+        response = APIClient().get(
+            "/api/v1/variants/autocomplete/", {"q": query, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        return [match["id"] for match in response.data]
+
+    def test_suggests_by_sku_and_name(self):
+        self.assertEqual(self.suggest("orange-acme"), [self.variant.pk])
+        self.assertEqual(self.suggest("JUICE"), [self.variant.pk])
+        self.assertEqual(self.suggest("apple"), [])
+        self.assertEqual(self.suggest(" "), [])
+
+    def test_index_is_refreshed_on_change(self):
+        self.assertEqual(self.suggest("cherry"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cherry = self.add_variant("cherry")
+
+        self.assertEqual(self.suggest("cherry"), [cherry.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Nectar"
+            self.product.save()
+
+        self.assertEqual(
+            self.suggest("nectar", limit="x"), [cherry.pk, self.variant.pk]
+        )
+        self.assertEqual(self.suggest("nectar", limit=1), [cherry.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cherry.delete()
+
+        self.assertEqual(self.suggest("cherry"), [])
+
+    def test_lookups_do_not_query_the_database(self):
+        autocomplete_variants("orange")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                autocomplete_variants("orange"),
+                [
+                    {
+                        "id": self.variant.pk,
+                        "sku": self.variant.sku,
+                        "name": self.variant.display_name,
+                    }
+                ],
+            )
+
+        self.assertEqual(len(queries), 0)
+
+    def test_price_changes_keep_the_index(self):
+        autocomplete_variants("orange")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.price = Decimal("3.00")
+            self.variant.save()
+            reprice_product_variants([{"id": self.variant.pk, "price": "4.00"}])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                [match["id"] for match in autocomplete_variants("orange")],
+                [self.variant.pk],
+            )
+
+        self.assertEqual(len(queries), 0)
+
+    def test_postgres_backend_ranks_by_trigram_similarity(self):
+        def capture(execute, sql, params, many, context):
+            raise DatabaseError(sql, params)
+
+        with connection.execute_wrapper(capture):
+            with self.assertRaises(DatabaseError) as context:
+                PostgresSearchBackend().autocomplete("oran", 5)
+
+        sql, params = context.exception.args
+
+        self.assertIn(
+            'UPPER("products_productvariant".display_name::text) %% UPPER(%s)', sql
+        )
+        self.assertIn(
+            'ORDER BY (GREATEST(similarity(UPPER("products_productvariant".sku::text), '
+            "UPPER(%s)), similarity("
+            'UPPER("products_productvariant".display_name::text), UPPER(%s)))) DESC, '
+            '"products_productvariant"."id" ASC LIMIT 5',
+            sql,
+        )
+        self.assertEqual(params[-3:], ("oran", "oran", "oran"))
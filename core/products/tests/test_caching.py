@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.caching import get_versions, invalidate_models
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.warehouses.models import Stock, Warehouse
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.category = ProductCategory.objects.create(name="Drinks")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.product = Product.objects.create(
+            author=self.author, name="Juice", category=self.category, unit=self.unit
+        )
+        self.variant = ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            size=Decimal("1"),
+            price=Decimal("2.00"),
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return response.data, len(queries)
+
+    def test_responses_are_cached(self):
+        for url in (
+            "/api/v1/products/",
+            f"/api/v1/products/{self.product.pk}/",
+            "/api/v1/categories/",
+            "/api/v1/units/",
+            "/api/v1/variants/?limit=1",
+        ):
+            with self.subTest(url=url):
+                data, _ = self.get(url)
+                cached, count = self.get(url)
+
+                self.assertEqual(cached, data)
+                # Only the conditional GET validators are read, when enabled.
+                self.assertLessEqual(count, 1)
+
+    def test_writes_invalidate_dependent_responses(self):
+        self.get("/api/v1/units/")
+        self.get(f"/api/v1/variants/{self.variant.pk}/?expand=product")
+
+        self.product.name = "Nectar"
+        self.product.save()
+
+        data, _ = self.get(f"/api/v1/variants/{self.variant.pk}/?expand=product")
+        self.assertEqual(data["product"]["name"], "Nectar")
+
+        warehouse = Warehouse.objects.create(author=self.author, name="North")
+        Stock.objects.create(
+            warehouse=warehouse, product_variant=self.variant, quantity=5
+        )
+
+        data, _ = self.get("/api/v1/variants/")
+        self.assertEqual(data["results"][0]["total_on_hand"], 5)
+
+        _, count = self.get("/api/v1/units/")
+        self.assertGreater(count, 0)
+
+    def test_nested_product_changes_invalidate_responses(self):
+        urls = ("/api/v1/categories/", "/api/v1/units/")
+
+        for change in (
+            lambda: ProductVariant.objects.create(
+                author=self.author,
+                product=self.product,
+                size=Decimal("2"),
+                price=Decimal("2.00"),
+            ),
+            lambda: self.product.tags.add("fresh"),
+        ):
+            for url in urls:
+                self.get(url)
+
+            change()
+
+            for url in urls:
+                with self.subTest(url=url):
+                    _, count = self.get(url)
+                    self.assertGreater(count, 1)
+
+    def test_missing_objects_are_not_cached(self):
+        self.assertEqual(self.client.get("/api/v1/products/0/").status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/products/0/").status_code, 404)
+
+    def test_versions_are_bumped_again_on_commit(self):
+        product, unit = get_versions([Product, ProductUnit])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_models(Product)
+            self.assertEqual(get_versions([Product, ProductUnit]), [product + 1, unit])
+
+        self.assertEqual(get_versions([Product, ProductUnit]), [product + 2, unit])
@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.suppliers.models import Supplier, SupplierProduct
+from core.warehouses.models import Warehouse
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.category = ProductCategory.objects.create(name="Drinks")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.product = Product.objects.create(
+            author=self.author, name="Juice", category=self.category, unit=self.unit
+        )
+        self.variant = ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            size=Decimal("1"),
+            price=Decimal("2.00"),
+        )
+        self.supplier = Supplier.objects.create(
+            author=self.author, business_name="Farm"
+        )
+        Warehouse.objects.create(author=self.author, name="North")
+
+    def test_unchanged_lists_are_not_modified(self):
+        for url in (
+            "/api/v1/products/",
+            f"/api/v1/products/{self.product.pk}/",
+            "/api/v1/categories/",
+            "/api/v1/variants/?limit=5",
+            "/api/v1/warehouses/",
+            "/api/v1/suppliers/",
+            "/api/v1/supplier-products/",
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["ETag"].startswith('W/"'))
+
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(queries), 1)
+
+    def test_last_modified(self):
+        response = self.client.get("/api/v1/products/")
+
+        response = self.client.get(
+            "/api/v1/products/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_refresh_the_etag(self):
+        products = self.client.get("/api/v1/products/")["ETag"]
+        suppliers = self.client.get("/api/v1/suppliers/")["ETag"]
+
+        ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            size=Decimal("2"),
+            price=Decimal("2.00"),
+        )
+        SupplierProduct.objects.create(
+            supplier=self.supplier,
+            product_variant=self.variant,
+            price=Decimal("1.00"),
+        )
+
+        for url, etag in (
+            ("/api/v1/products/", products),
+            ("/api/v1/suppliers/", suppliers),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_nested_product_changes_refresh_the_category_etag(self):
+        for change in (
+            lambda: ProductVariant.objects.create(
+                author=self.author,
+                product=self.product,
+                size=Decimal("2"),
+                price=Decimal("2.00"),
+            ),
+            lambda: self.product.tags.add("fresh"),
+        ):
+            etag = self.client.get("/api/v1/categories/")["ETag"]
+            change()
+
+            response = self.client.get("/api/v1/categories/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_invalid_and_missing_objects(self):
+        self.assertEqual(self.client.get("/api/v1/products/abc/").status_code, 404)
+        response = self.client.get("/api/v1/products/0/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
@@ -0,0 +1,183 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.expand import (
+    ExpandableFieldsMixin,
+    Expansion,
+    expand_queryset,
+    parse_expand,
+)
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.products.serializers import ProductVariantSerializer
+
+
+class TestExpand(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.category = ProductCategory.objects.create(name="Drinks")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.variant = self.add_variant("Juice")
+
+    def add_variant(self, name):
+        product = Product.objects.create(
+            author=self.author, name=name, category=self.category, unit=self.unit
+        )
+        product.tags.add("fresh")
+
+        return ProductVariant.objects.create(
+            author=self.author,
+            product=product,
+            size=Decimal("1"),
+            price=Decimal("2.50"),
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        return response, len(queries)
+
+    def test_relations_are_ids_by_default(self):
+        response, _ = self.get(f"/api/v1/variants/{self.variant.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["product"], self.variant.product_id)
+        self.assertEqual(response.data["author"], self.author.pk)
+
+    def test_detail_expansion(self):
+        response, _ = self.get(
+            f"/api/v1/variants/{self.variant.pk}/?expand=product.category,product.unit"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        product = response.data["product"]
+        self.assertEqual(product["name"], "Juice")
+        self.assertEqual(product["tags"], ["fresh"])
+        self.assertEqual(product["variant_count"], 1)
+        self.assertEqual(product["category"]["name"], "Drinks")
+        self.assertEqual(product["unit"]["symbol"], "l")
+
+    def test_partial_expansion(self):
+        response, _ = self.get(f"/api/v1/variants/{self.variant.pk}/?expand=product")
+
+        self.assertEqual(response.data["product"]["name"], "Juice")
+        self.assertEqual(response.data["product"]["category"], self.category.pk)
+
+    def test_list_expansion(self):
+        response, _ = self.get("/api/v1/variants/?expand=product.unit")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"][0]["product"]["unit"]["name"], "Litre"
+        )
+
+    def test_queries_do_not_grow_with_expanded_rows(self):
+        for url in (
+            f"/api/v1/variants/{self.variant.pk}/?expand=product.category,product.unit",
+            "/api/v1/variants/?expand=product.category,product.unit",
+            "/api/v1/products/?expand=category,unit",
+        ):
+            with self.subTest(url=url):
+                _, few = self.get(url)
+                self.add_variant(f"Juice {ProductVariant.objects.count()}")
+                self.add_variant(f"Juice {ProductVariant.objects.count()}")
+                response, many = self.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(many, few)
+
+    def test_expanded_fields_can_be_selected(self):
+        response, _ = self.get("/api/v1/variants/?expand=product&fields=id,product")
+
+        self.assertEqual(
+            response.data["results"][0],
+            {"id": self.variant.pk, "product": response.data["results"][0]["product"]},
+        )
+        self.assertEqual(response.data["results"][0]["product"]["name"], "Juice")
+
+    def test_unknown_expansions_are_rejected(self):
+        for value in ("supplier", "product.author", "product.unit.products"):
+            with self.subTest(value=value):
+                response, _ = self.get(f"/api/v1/variants/?expand={value}")
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["expand"], f"Cannot expand `{value}`.")
+
+    def test_parse_expand(self):
+        self.assertEqual(
+            parse_expand(
+                "product.category, product.unit,,product", ProductVariantSerializer
+            ),
+            {"product": {"category": {}, "unit": {}}},
+        )
+
+
+class ProductUnitWithProductsSerializer(
+    ExpandableFieldsMixin, serializers.ModelSerializer
+):
+    expandable_fields = {
+        "products": Expansion("core.products.serializers.ProductSerializer"),
+    }
+
+    class Meta:
+        model = ProductUnit
+        fields = ["id", "name", "products"]
+
+
+class TestExpandQueryset(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.product = Product.objects.create(
+            author=self.author,
+            name="Juice",
+            category=ProductCategory.objects.create(name="Drinks"),
+            unit=self.unit,
+        )
+        self.variant = ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            size=Decimal("1"),
+            price=Decimal("2.50"),
+        )
+
+    def test_reverse_relations_are_prefetched(self):
+        expand = parse_expand("products.category", ProductUnitWithProductsSerializer)
+        queryset = expand_queryset(
+            ProductUnit.objects.all(), ProductUnitWithProductsSerializer, expand
+        )
+
+        with self.assertNumQueries(2):
+            units = list(queryset)
+            categories = [
+                product.category.name
+                for unit in units
+                for product in unit.products.all()
+            ]
+
+        data = ProductUnitWithProductsSerializer(units, many=True, expand=expand).data
+
+        self.assertEqual(categories, ["Drinks"])
+        self.assertEqual(data[0]["products"][0]["name"], "Juice")
+        self.assertEqual(data[0]["products"][0]["category"]["name"], "Drinks")
+        self.assertEqual(data[0]["products"][0]["variant_count"], 1)
+
+    def test_prefetched_relations_are_no_longer_joined(self):
+        queryset = expand_queryset(
+            ProductVariant.objects.select_related("product__unit", "author"),
+            ProductVariantSerializer,
+            {"product": {}},
+        )
+
+        with self.assertNumQueries(3):
+            variant = queryset.get()
+            self.assertEqual(variant.author, self.author)
+            self.assertEqual(variant.product.name, "Juice")
+            self.assertEqual(variant.product.unit.name, "Litre")
@@ -0,0 +1,95 @@
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.products.views import ProductVariantViewSet
+
+
+class TestVariantExport(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.product = Product.objects.create(
+            author=self.author,
+            name="Juice",
+            category=ProductCategory.objects.create(name="Drinks"),
+            unit=ProductUnit.objects.create(name="Litre", symbol="l"),
+        )
+        self.variants = [
+            ProductVariant.objects.create(
+                author=self.author,
+                product=self.product,
+                size=Decimal(size),
+                flavor=flavor,
+                price=Decimal("2.50"),
+            )
+            for size, flavor in (("1", "Orange"), ("2", "Apple"), ("3", "Mango"))
+        ]
+
+    def export(self, query):
+        response = APIClient().get(f"/api/v1/variants/export/?{query}")
+
+        self.assertEqual(response.status_code, 200)
+
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson_export(self):
+        response, content = self.export("file_format=ndjson")
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn(
+            'filename="productvariant.ndjson"', response["Content-Disposition"]
+        )
+        self.assertEqual([row["id"] for row in rows], [v.pk for v in self.variants])
+        self.assertEqual(rows[0]["price"], "2.50")
+        self.assertEqual(rows[0]["product__name"], "Juice")
+        self.assertEqual(rows[0]["total_on_hand"], 0)
+        self.assertNotIn("description", rows[0])
+
+    def test_ndjson_export_without_orjson(self):
+        _, content = self.export("file_format=ndjson")
+
+        with patch("core.products.exports.orjson", None):
+            _, fallback = self.export("file_format=ndjson")
+
+        self.assertEqual(
+            [json.loads(line) for line in fallback.decode().splitlines()],
+            [json.loads(line) for line in content.decode().splitlines()],
+        )
+
+    def test_csv_export_is_filtered(self):
+        _, content = self.export("file_format=csv&flavor=Apple")
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+
+        self.assertEqual([row["id"] for row in rows], [str(self.variants[1].pk)])
+        self.assertEqual(rows[0]["sku"], self.variants[1].sku)
+
+    def test_empty_csv_export_has_header(self):
+        _, content = self.export("file_format=csv&flavor=Lime")
+
+        self.assertTrue(content.decode().startswith("id,sku,product,"))
+        self.assertEqual(len(content.decode().splitlines()), 1)
+
+    def test_gzip_export_is_chunked(self):
+        with patch.object(ProductVariantViewSet, "export_chunk_size", 2):
+            response, content = self.export("compression=gzip")
+
+        lines = gzip.decompress(content).decode().splitlines()
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(".ndjson.gz", response["Content-Disposition"])
+        self.assertEqual(len(lines), 3)
+
+    def test_invalid_format_is_rejected(self):
+        response = APIClient().get("/api/v1/variants/export/?file_format=xml")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("file_format", response.json())
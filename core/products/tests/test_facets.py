@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.facets import get_facet_counts
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+
+
+class TestFacets(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.drinks = ProductCategory.objects.create(name="Drinks")
+        self.snacks = ProductCategory.objects.create(name="Snacks")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+
+        self.juice = self.add_product("Juice", self.drinks, ["fresh", "cold"])
+        self.soda = self.add_product("Soda", self.drinks, ["cold"])
+        self.chips = self.add_product("Chips", self.snacks, [], is_active=False)
+
+        for brand, size in (("Acme", "1"), ("Acme", "1.5"), (None, "1")):
+            ProductVariant.objects.create(
+                author=self.author,
+                product=self.juice,
+                brand=brand,
+                size=Decimal(size),
+                flavor=f"{brand}-{size}",
+                price=Decimal("1.00"),
+            )
+
+    def add_product(self, name, category, tags, is_active=True):
+        product = Product.objects.create(
+            author=self.author,
+            name=name,
+            category=category,
+            unit=self.unit,
+            is_active=is_active,
+        )
+        product.tags.add(*tags)
+
+        return product
+
+    def facets(self, endpoint, **params):
+        response = self.client.get(f"/api/v1/{endpoint}/facets/", params)
+        self.assertEqual(response.status_code, 200)
+
+        return {
+            name: {facet["value"]: facet["count"] for facet in values}
+            for name, values in response.data.items()
+        }
+
+    def test_product_facets(self):
+        self.assertEqual(
+            self.facets("products"),
+            {
+                "category": {self.drinks.pk: 2, self.snacks.pk: 1},
+                "unit": {self.unit.pk: 3},
+                "is_active": {True: 2, False: 1},
+                "tags": {"cold": 2, "fresh": 1, None: 1},
+            },
+        )
+        self.assertEqual(
+            self.facets("products", is_active="true", limit=1)["category"],
+            {self.drinks.pk: 2},
+        )
+
+    def test_variant_facets(self):
+        facets = self.facets("variants", ordering="-brand")
+
+        self.assertEqual(facets["brand"], {"Acme": 2, None: 1})
+        self.assertEqual(facets["size"], {Decimal("1"): 2, Decimal("1.5"): 1})
+        self.assertEqual(facets["is_active"], {True: 3})
+
+    def test_counts_are_read_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_facet_counts(Product.objects.all())
+
+        self.assertEqual(len(queries), 1)
+
+    def test_values_are_read_in_their_column_types(self):
+        with CaptureQueriesContext(connection) as queries:
+            counts = get_facet_counts(Product.objects.all())
+
+        # No column is cast, so the values do not round-trip through the
+        # text rendering of the database.
+        self.assertNotRegex(queries[0]["sql"], r'CAST\("')
+        self.assertEqual(
+            {type(facet["value"]) for facet in counts["is_active"]}, {bool}
+        )
+        self.assertEqual({type(facet["value"]) for facet in counts["category"]}, {int})
+
+    def test_counts_are_cached_until_the_catalog_changes(self):
+        self.facets("products")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.facets("products")
+
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chips.category = self.drinks
+            self.chips.save()
+
+        self.assertEqual(self.facets("products")["category"], {self.drinks.pk: 3})
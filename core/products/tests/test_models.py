@@ -88,6 +88,29 @@ class TestProductVariantModel(TestCase):
         self.assertEqual(str(self.variant), "Apple (Apple Inc., 10g, Green)")
         # self.assertEqual(str(self.variant), "Apple (10g, Green)")
 
+    def test_display_name_is_stored(self):
+        variant = ProductVariant.objects.get(pk=self.variant.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(str(variant), "Apple (Apple Inc., 10g, Green)")
+
+    def test_display_name_follows_product_and_unit(self):
+        self.product.name = "Pear"
+        self.product.save()
+        self.unit.symbol = "gr"
+        self.unit.save()
+
+        self.assertEqual(
+            ProductVariant.objects.get(pk=self.variant.pk).display_name,
+            "Pear (Apple Inc., 10gr, Green)",
+        )
+
+    def test_display_name_keeps_fractional_sizes(self):
+        self.variant.size = Decimal("2.50")
+        self.variant.save()
+
+        self.assertEqual(str(self.variant), "Apple (Apple Inc., 2.5g, Green)")
+
     def test_readable_name(self):
         """Test the readable_name method of ProductVariant."""
         self.assertEqual(
@@ -0,0 +1,235 @@
+from datetime import timedelta
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import ProductVariant
+from core.products.pagination import KeysetPagination, StandardPagination
+from core.products.tests import factories as product_factories
+from core.warehouses.models import VariantAvailability
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        author = UserFactory()
+        product = product_factories.ProductFactory(author=author)
+
+        for index, brand in enumerate(["b", None, "a", "b", None, "c", "a"]):
+            product_factories.ProductVariantFactory(
+                author=author,
+                product=product,
+                brand=brand,
+                flavor=f"flavor-{index}",
+                price=Decimal(index % 3),
+            )
+
+        self.factory = APIRequestFactory()
+
+    def paginate(self, queryset, params, pagination_class=KeysetPagination):
+        pagination = pagination_class()
+        request = Request(self.factory.get("/variants/", params))
+        page = pagination.paginate_queryset(queryset, request)
+
+        return pagination.get_paginated_response([obj.pk for obj in page]).data
+
+    def cursor(self, link):
+        return parse_qs(urlparse(link).query)["cursor"][0]
+
+    def walk(self, queryset, direction="next", params=None):
+        params = {"limit": 2, **(params or {})}
+        pages = []
+
+        while True:
+            data = self.paginate(queryset, params)
+            pages.append(data["results"])
+
+            if not data[direction]:
+                return pages
+
+            params["cursor"] = self.cursor(data[direction])
+
+    def expected(self, ordering):
+        field = ordering.lstrip("-")
+        descending = ordering.startswith("-")
+
+        if field == "id":
+            return list(
+                ProductVariant.objects.order_by(ordering).values_list("pk", flat=True)
+            )
+
+        value = (
+            F(field).desc(nulls_last=True)
+            if descending
+            else F(field).asc(nulls_last=True)
+        )
+        pk = "-pk" if descending else "pk"
+
+        return list(
+            ProductVariant.objects.order_by(value, pk).values_list("pk", flat=True)
+        )
+
+    def test_walks_forwards_and_backwards_without_gaps(self):
+        for ordering in ("id", "-id", "brand", "-brand", "price", "-price"):
+            with self.subTest(ordering=ordering):
+                queryset = ProductVariant.objects.order_by(ordering)
+                pages = self.walk(queryset)
+
+                self.assertEqual(
+                    [pk for page in pages for pk in page],
+                    self.expected(ordering),
+                )
+
+                backwards = self.walk(
+                    queryset,
+                    direction="previous",
+                    params={"cursor": self.cursor_at_end(queryset)},
+                )
+                self.assertEqual(
+                    [pk for page in reversed(backwards) for pk in page],
+                    self.expected(ordering)[:-1],
+                )
+
+    def cursor_at_end(self, queryset):
+        pagination = KeysetPagination()
+        request = Request(self.factory.get("/variants/", {"limit": 100}))
+        page = pagination.paginate_queryset(queryset, request)
+        pagination.request = Request(self.factory.get("/variants/"))
+
+        return self.cursor(pagination.get_link(page[-1], reverse=True))
+
+    def test_first_page_has_no_previous_link(self):
+        data = self.paginate(ProductVariant.objects.order_by("id"), {"limit": 3})
+
+        self.assertIsNone(data["previous"])
+        self.assertEqual(len(data["results"]), 3)
+        self.assertNotIn("count", data)
+
+    def test_limit_is_capped(self):
+        pagination = KeysetPagination()
+
+        for params, limit in (({"limit": 1000}, 100), ({"limit": 0}, 10), ({}, 10)):
+            request = Request(self.factory.get("/variants/", params))
+            self.assertEqual(pagination.get_limit(request), limit)
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(NotFound):
+            self.paginate(ProductVariant.objects.all(), {"cursor": "not-a-cursor"})
+
+    def test_standard_pagination_opts_into_keyset(self):
+        queryset = ProductVariant.objects.order_by("id")
+
+        keyset = self.paginate(
+            queryset, {"pagination": "keyset"}, pagination_class=StandardPagination
+        )
+        offset = self.paginate(queryset, {}, pagination_class=StandardPagination)
+
+        self.assertNotIn("count", keyset)
+        self.assertEqual(offset["count"], 7)
+
+
+class TestKeysetPaginationViews(TestCase):
+    def setUp(self):
+        author = UserFactory()
+        product = product_factories.ProductFactory(author=author)
+        moved = timezone.now()
+        self.variants = []
+
+        for index, (brand, hours) in enumerate(
+            [("b", 3), (None, None), ("a", 1), ("b", None), (None, 2), ("c", 1)]
+        ):
+            variant = product_factories.ProductVariantFactory(
+                author=author, product=product, brand=brand, flavor=f"flavor-{index}"
+            )
+            VariantAvailability.objects.update_or_create(
+                product_variant=variant,
+                defaults={
+                    "last_movement_at": (
+                        None if hours is None else moved - timedelta(hours=hours)
+                    )
+                },
+            )
+            self.variants.append(variant)
+
+        self.client = APIClient()
+
+    def walk(self, url, direction):
+        pks = []
+
+        while url and len(pks) <= len(self.variants):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+
+            page = [result["id"] for result in response.data["results"]]
+            pks = pks + page if direction == "next" else page + pks
+            url = response.data[direction]
+
+        return pks, response.data
+
+    def expected(self, ordering):
+        field = ordering.lstrip("-")
+        value = (
+            F(field).desc(nulls_last=True)
+            if ordering.startswith("-")
+            else F(field).asc(nulls_last=True)
+        )
+        pk = "-pk" if ordering.startswith("-") else "pk"
+
+        return list(
+            ProductVariant.objects.annotate(
+                last_movement_at=F("availability__last_movement_at")
+            )
+            .order_by(value, pk)
+            .values_list("pk", flat=True)
+        )
+
+    def test_pages_follow_next_and_previous_links(self):
+        for ordering in ("brand", "-brand", "last_movement_at", "-last_movement_at"):
+            with self.subTest(ordering=ordering):
+                forwards, last = self.walk(
+                    f"/api/v1/variants/?pagination=keyset&limit=2&ordering={ordering}",
+                    "next",
+                )
+                self.assertEqual(forwards, self.expected(ordering))
+                self.assertIsNotNone(last["previous"])
+
+                backwards, first = self.walk(last["previous"], "previous")
+                self.assertEqual(backwards, self.expected(ordering)[:-2])
+                self.assertIsNotNone(first["next"])
+
+    def test_cursor_at_a_null_value(self):
+        response = self.client.get(
+            "/api/v1/variants/?pagination=keyset&limit=5&ordering=brand"
+        )
+        following = self.client.get(response.data["next"])
+
+        self.assertIsNone(response.data["results"][-1]["brand"])
+        self.assertEqual(
+            [result["id"] for result in following.data["results"]],
+            [self.variants[4].pk],
+        )
+        self.assertIsNone(following.data["next"])
+
+    def test_cursor_keeps_the_filters(self):
+        response = self.client.get(
+            "/api/v1/variants/?pagination=keyset&limit=1&ordering=brand&brand=b"
+        )
+        following = self.client.get(response.data["next"])
+
+        self.assertIn("brand=b", response.data["next"])
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [self.variants[0].pk],
+        )
+        self.assertEqual(
+            [result["id"] for result in following.data["results"]],
+            [self.variants[3].pk],
+        )
+        self.assertIsNone(following.data["next"])
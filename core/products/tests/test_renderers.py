@@ -0,0 +1,111 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.products.parsers import ORJSONParser
+from core.products.renderers import ORJSONRenderer
+
+
+class TestORJSONRenderer(TestCase):
+    def test_output_matches_json_renderer(self):
+        for data in (
+            {"price": Decimal("12.50"), "size": Decimal("1E+1")},
+            {
+                "created": datetime(
+                    2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc
+                ),
+                "naive": datetime(2024, 5, 1, 12, 30),
+                "day": date(2024, 5, 1),
+                "at": time(8, 15),
+                "duration": timedelta(hours=1, seconds=3),
+            },
+            {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+            {"name": 'Café\u2028\u2029"quoted"', 1: None, "label": gettext_lazy("x")},
+            [{"nested": [1, 2.5, True, None, {"a": ()}]}, "text"],
+            {"big": 2**70},
+            {},
+            [],
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(
+                    ORJSONRenderer().render(data), JSONRenderer().render(data)
+                )
+
+    def test_indented_output_matches_json_renderer(self):
+        data = {"price": Decimal("1.00"), "items": [1, 2]}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_api_responses_match_json_renderer(self):
+        author = UserFactory()
+        product = Product.objects.create(
+            author=author,
+            name="Juice",
+            category=ProductCategory.objects.create(name="Drinks"),
+            unit=ProductUnit.objects.create(name="Litre", symbol="l"),
+        )
+        ProductVariant.objects.create(
+            author=author, product=product, size=Decimal("1"), price=Decimal("2.00")
+        )
+        client = APIClient()
+        client.force_authenticate(author)
+
+        for url in ("/api/v1/products/", "/api/v1/variants/"):
+            with self.subTest(url=url):
+                response = client.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class TestORJSONParser(TestCase):
+    def parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+    def test_output_matches_json_parser(self):
+        for body in (
+            b'{"price": "12.50", "ids": [1, 2], "name": "Caf\\u00e9"}',
+            '{"name": "Café", "size": 1.5, "ok": true, "none": null}'.encode(),
+            b"[]",
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(
+                    self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+                )
+
+    def test_other_encodings_fall_back(self):
+        body = '{"name": "Café"}'.encode("latin-1")
+
+        self.assertEqual(self.parse(ORJSONParser(), body, "latin-1"), {"name": "Café"})
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in (b"", b"{", b'{"size": NaN}', b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(ORJSONParser(), body)
+
+    def test_api_requests_are_parsed(self):
+        author = UserFactory()
+        client = APIClient()
+        client.force_authenticate(author)
+
+        response = client.post("/api/v1/categories/", {"name": "Snacks"}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(ProductCategory.objects.filter(name="Snacks").exists())
@@ -0,0 +1,245 @@
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.products.search import (
+    PostgresSearchBackend,
+    SearchBackend,
+    get_search_backend,
+    get_search_words,
+    rebuild_search_index,
+)
+from core.products.services import create_product_variants
+
+
+class TestFullTextSearch(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.category = ProductCategory.objects.create(name="Beverages")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.juice = self.add_product("Orange Juice", "Fresh squeezed oranges")
+        self.soda = self.add_product("Lemon Soda", "Sparkling drink with orange zest")
+
+    def add_product(self, name, description):
+        return Product.objects.create(
+            author=self.author,
+            name=name,
+            description=description,
+            category=self.category,
+            unit=self.unit,
+        )
+
+    def add_variant(self, product, flavor, brand="Acme"):
+        return ProductVariant.objects.create(
+            author=self.author,
+            product=product,
+            brand=brand,
+            flavor=flavor,
+            size=Decimal("1"),
+            price=Decimal("2.00"),
+        )
+
+    def search(self, endpoint, query, **params):
+        response = self.client.get(f"/api/v1/{endpoint}/", {"search": query, **params})
+        self.assertEqual(response.status_code, 200)
+
+        return [result["id"] for result in response.data["results"]]
+
+    def test_results_are_ranked(self):
+        self.assertEqual(
+            self.search("products", "orange"), [self.juice.pk, self.soda.pk]
+        )
+        self.assertEqual(
+            self.search("products", "orange", ordering="-name"),
+            [self.juice.pk, self.soda.pk],
+        )
+        self.assertEqual(self.search("products", "ORANG sparkl"), [self.soda.pk])
+        self.assertEqual(self.search("products", "beverages juice"), [self.juice.pk])
+        self.assertEqual(self.search("products", "*:&"), [])
+
+    def test_index_follows_writes(self):
+        variant = self.add_variant(self.juice, "mango")
+        self.assertEqual(self.search("variants", "mango"), [variant.pk])
+
+        self.juice.name = "Nectar"
+        self.juice.save()
+        self.assertEqual(self.search("variants", "nectar mango"), [variant.pk])
+        self.assertEqual(self.search("products", "juice"), [])
+
+        self.category.name = "Drinks"
+        self.category.save()
+        self.assertEqual(
+            self.search("products", "drinks"), [self.juice.pk, self.soda.pk]
+        )
+
+        self.soda.delete()
+        self.assertEqual(self.search("products", "drinks"), [self.juice.pk])
+
+    def test_bulk_created_variants_are_indexed(self):
+        variants = create_product_variants(
+            [
+                {
+                    "product": self.soda.pk,
+                    "flavor": flavor,
+                    "size": Decimal("1"),
+                    "price": Decimal("1.00"),
+                }
+                for flavor in ("cherry", "lime")
+            ]
+        )
+
+        self.assertEqual(self.search("variants", "lime"), [variants[1].pk])
+
+    def test_query_count_does_not_grow_with_matches(self):
+        def count():
+            with CaptureQueriesContext(connection) as queries:
+                self.search("variants", "flavour")
+            return len(queries)
+
+        self.add_variant(self.juice, "flavour-1")
+        few = count()
+
+        for index in range(2, 6):
+            self.add_variant(self.juice, f"flavour-{index}")
+
+        self.assertEqual(count(), few)
+
+    def test_keyset_pagination_follows_rank(self):
+        variants = [
+            self.add_variant(self.soda, f"flavour-{index}") for index in range(3)
+        ]
+        response = self.client.get(
+            "/api/v1/variants/", {"search": "soda", "pagination": "keyset", "limit": 2}
+        )
+        second = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            sorted(
+                result["id"]
+                for result in response.data["results"] + second.data["results"]
+            ),
+            [variant.pk for variant in variants],
+        )
+
+    def test_search_words(self):
+        self.assertEqual(
+            get_search_words(['"orange', "juice*", "1l:"]), ["orange", "juice", "1l"]
+        )
+        self.assertIsNotNone(get_search_backend())
+
+    def test_rebuild_search_index_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "products_product_fts"')
+
+        self.assertEqual(self.search("products", "orange"), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Indexed 2 products and variants", out.getvalue())
+        self.assertEqual(
+            self.search("products", "orange"), [self.juice.pk, self.soda.pk]
+        )
+
+    def test_postgres_backend_writes_weighted_vectors(self):
+        with mock.patch("core.products.search.connection") as db:
+            db.ops.quote_name.side_effect = lambda name: f'"{name}"'
+            cursor = db.cursor.return_value.__enter__.return_value
+
+            PostgresSearchBackend().index(Product, [])
+            self.assertFalse(cursor.executemany.called)
+
+            PostgresSearchBackend().index(Product, [self.juice.pk])
+
+        sql, params = cursor.executemany.call_args.args
+
+        self.assertEqual(
+            sql,
+            'UPDATE "products_product" SET search_vector = '
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || "
+            "setweight(to_tsvector('simple', %s), 'C') WHERE id = %s",
+        )
+        self.assertEqual(
+            params,
+            [("Orange Juice", "Beverages", "Fresh squeezed oranges", self.juice.pk)],
+        )
+
+    def test_backend_follows_the_database(self):
+        self.addCleanup(get_search_backend.cache_clear)
+
+        for setting, vendor, backend in (
+            (
+                "core.products.search.PostgresSearchBackend",
+                "sqlite",
+                PostgresSearchBackend,
+            ),
+            (None, "mysql", None),
+        ):
+            with self.subTest(vendor=vendor):
+                get_search_backend.cache_clear()
+
+                with (
+                    self.settings(PRODUCT_SEARCH_BACKEND=setting),
+                    mock.patch("core.products.search.connection") as db,
+                ):
+                    db.vendor = vendor
+
+                    if backend:
+                        self.assertIsInstance(get_search_backend(), backend)
+                    else:
+                        self.assertIsNone(get_search_backend())
+                        self.assertEqual(rebuild_search_index(), 0)
+
+    def test_backends_implement_search(self):
+        with self.assertRaises(TypeError):
+            SearchBackend()
+
+
+class TestPostgresSearchMigration(SimpleTestCase):
+    def setUp(self):
+        migration = import_module("core.products.migrations.0009_search_indexes")
+        self.operation = migration.Migration.operations[1]
+
+    def run_sql(self, method, vendor):
+        editor = mock.Mock()
+        editor.connection.vendor = vendor
+        editor.connection.alias = "default"
+        getattr(self.operation, method)("products", editor, None, None)
+
+        return [call.args[0] for call in editor.execute.call_args_list]
+
+    def test_sql_runs_on_postgres_only(self):
+        self.assertEqual(self.run_sql("database_forwards", "sqlite"), [])
+        self.assertEqual(self.run_sql("database_backwards", "sqlite"), [])
+
+        forwards = self.run_sql("database_forwards", "postgresql")
+        backwards = self.run_sql("database_backwards", "postgresql")
+
+        self.assertEqual(len(forwards), 6)
+        self.assertEqual(
+            forwards[0],
+            "ALTER TABLE products_product ADD COLUMN search_vector tsvector",
+        )
+        self.assertEqual(len(backwards), 6)
+        self.assertEqual(
+            backwards[-1], "ALTER TABLE products_product DROP COLUMN search_vector"
+        )
+
+    def test_postgres_backend_queries_the_migrated_column(self):
+        queryset = PostgresSearchBackend().search(Product.objects.all(), ["juice"])
+
+        self.assertIn(
+            "\"products_product\".search_vector @@ to_tsquery('simple', juice:*)",
+            str(queryset.query),
+        )
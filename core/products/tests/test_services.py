@@ -0,0 +1,286 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import ProductPriceHistory, ProductUnit, ProductVariant
+from core.products.services import create_product_variants, reprice_product_variants
+from core.products.tests import factories as product_factories
+
+
+class TestRepriceProductVariants(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        product = product_factories.ProductFactory(author=self.author)
+        self.variants = [
+            product_factories.ProductVariantFactory(
+                author=self.author,
+                product=product,
+                flavor=f"flavor-{index}",
+                price=Decimal("10.00"),
+            )
+            for index in range(5)
+        ]
+
+    def price(self, variant):
+        return ProductVariant.objects.get(pk=variant.pk).price
+
+    def test_reprices_by_id_and_sku(self):
+        result = reprice_product_variants(
+            [
+                {"id": self.variants[0].pk, "price": Decimal("12.50")},
+                {"sku": self.variants[1].sku, "price": Decimal("8.00")},
+                {"id": self.variants[2].pk, "price": Decimal("10.00")},
+            ],
+            author=self.author,
+        )
+
+        self.assertEqual(result, {"repriced": 2, "unchanged": 1})
+        self.assertEqual(self.price(self.variants[0]), Decimal("12.50"))
+        self.assertEqual(self.price(self.variants[1]), Decimal("8.00"))
+        self.assertEqual(
+            list(
+                ProductPriceHistory.objects.order_by("product_variant").values_list(
+                    "product_variant", "price"
+                )
+            ),
+            [
+                (self.variants[0].pk, Decimal("10.00")),
+                (self.variants[1].pk, Decimal("10.00")),
+            ],
+        )
+
+        record = self.variants[0].history.first()
+        self.assertEqual(record.price, Decimal("12.50"))
+        self.assertEqual(record.history_type, "~")
+        self.assertEqual(record.history_user, self.author)
+        self.assertFalse(self.variants[2].history.filter(history_type="~").exists())
+
+    def test_last_price_wins_across_ids_and_skus(self):
+        result = reprice_product_variants(
+            [
+                {"sku": self.variants[0].sku, "price": Decimal("11.00")},
+                {"id": self.variants[0].pk, "price": Decimal("12.00")},
+                {"id": self.variants[1].pk, "price": Decimal("11.00")},
+                {"sku": self.variants[1].sku, "price": Decimal("13.00")},
+            ]
+        )
+
+        self.assertEqual(result, {"repriced": 2, "unchanged": 0})
+        self.assertEqual(self.price(self.variants[0]), Decimal("12.00"))
+        self.assertEqual(self.price(self.variants[1]), Decimal("13.00"))
+        self.assertEqual(ProductPriceHistory.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def count(price):
+            with CaptureQueriesContext(connection) as queries:
+                reprice_product_variants(
+                    [{"id": variant.pk, "price": price} for variant in variants]
+                )
+            return len(queries)
+
+        variants = self.variants[:1]
+        few = count(Decimal("11.00"))
+        variants = self.variants
+
+        self.assertEqual(count(Decimal("12.00")), few)
+
+    def test_unknown_variants_are_rejected(self):
+        with self.assertRaises(ValidationError) as context:
+            reprice_product_variants(
+                [
+                    {"id": self.variants[0].pk, "price": Decimal("1.00")},
+                    {"sku": "MISSING", "price": Decimal("1.00")},
+                ]
+            )
+
+        self.assertIn("MISSING", context.exception.message_dict["product_variant"][0])
+        self.assertEqual(self.price(self.variants[0]), Decimal("10.00"))
+
+    def test_bulk_reprice_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        url = "/api/v1/variants/bulk-reprice/"
+
+        response = client.post(
+            url,
+            {"prices": [{"sku": self.variants[3].sku, "price": "9.99"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"repriced": 1, "unchanged": 0})
+        self.assertEqual(self.price(self.variants[3]), Decimal("9.99"))
+
+        for prices in (
+            [],
+            [{"price": "1.00"}],
+            [{"id": self.variants[0].pk, "sku": "X", "price": "1.00"}],
+            [{"id": 0, "price": "1.00"}],
+        ):
+            with self.subTest(prices=prices):
+                response = client.post(url, {"prices": prices}, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_reprice_variants_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prices.csv")
+
+            with open(path, "w") as file:
+                file.write("id,sku,price\n")
+                file.write(f"{self.variants[0].pk},,3.00\n")
+                file.write(f",{self.variants[4].sku},4.00\n")
+
+            out = StringIO()
+            call_command("reprice_variants", path, stdout=out)
+
+            self.assertIn("Repriced 2 variants, 0 unchanged", out.getvalue())
+            self.assertEqual(self.price(self.variants[4]), Decimal("4.00"))
+
+            with open(path, "a") as file:
+                file.write(",MISSING,1.00\n")
+
+            with self.assertRaisesMessage(CommandError, "MISSING"):
+                call_command("reprice_variants", path, stdout=out)
+
+            with open(path, "a") as file:
+                file.write("abc,,1.00\n")
+
+            with self.assertRaisesMessage(CommandError, "Invalid prices"):
+                call_command("reprice_variants", path, stdout=out)
+
+
+class TestCreateProductVariants(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+        self.product = product_factories.ProductFactory(
+            author=self.author, name="Orange Juice", unit=self.unit
+        )
+
+    def rows(self, count, brand="Acme", start=0):
+        return [
+            {
+                "product": self.product.pk,
+                "brand": brand,
+                "size": Decimal(index + 1),
+                "flavor": f"flavor-{index}",
+                "price": Decimal("1.00"),
+            }
+            for index in range(start, start + count)
+        ]
+
+    def test_creates_variants_with_history(self):
+        variants = create_product_variants(self.rows(3), author=self.author)
+
+        self.assertEqual(ProductVariant.objects.count(), 3)
+        self.assertEqual(
+            [variant.sku for variant in variants],
+            ["ORANGE-Acme-1-FLA", "ORANGE-Acme-2-FLA", "ORANGE-Acme-3-FLA"],
+        )
+        variant = ProductVariant.objects.get(pk=variants[0].pk)
+        self.assertEqual(variant.slug, "orange-juice-1-flavor-0")
+        self.assertEqual(variant.display_name, "Orange Juice (Acme, 1l, flavor-0)")
+        self.assertEqual(variant.history.get().history_user, self.author)
+
+    def test_colliding_skus_are_suffixed(self):
+        product_factories.ProductVariantFactory(
+            author=self.author,
+            product=self.product,
+            brand="Acme",
+            size=Decimal("1"),
+            flavor="flavor-x",
+        )
+        rows = self.rows(1) + self.rows(1, start=10)
+        rows[1]["size"] = Decimal("1.5")
+
+        variants = create_product_variants(rows)
+
+        self.assertEqual(
+            [variant.sku for variant in variants],
+            ["ORANGE-Acme-1-FLA-1", "ORANGE-Acme-1-FLA-2"],
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def count(rows):
+            with CaptureQueriesContext(connection) as queries:
+                create_product_variants(rows)
+            return len(queries)
+
+        few = count(self.rows(1, brand="A"))
+
+        self.assertEqual(count(self.rows(20, brand="B", start=1)), few)
+
+    def test_invalid_rows_are_rejected(self):
+        create_product_variants(self.rows(1))
+
+        for rows, field in (
+            ([{**self.rows(1)[0], "product": 0}], "product"),
+            (self.rows(1, brand="Other"), "slug"),
+            (self.rows(1, start=1) * 2, "slug"),
+        ):
+            with self.subTest(field=field):
+                with self.assertRaises(ValidationError) as context:
+                    create_product_variants(rows)
+
+                self.assertIn(field, context.exception.message_dict)
+
+        self.assertEqual(ProductVariant.objects.count(), 1)
+
+    def test_concurrent_duplicates_are_rejected(self):
+        with mock.patch(
+            "core.products.services.bulk_create_with_history",
+            side_effect=IntegrityError,
+        ):
+            with self.assertRaises(ValidationError) as context:
+                create_product_variants(self.rows(2))
+
+        self.assertIn("non_field_errors", context.exception.message_dict)
+        self.assertFalse(ProductVariant.objects.exists())
+
+    def test_list_post_creates_variants(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        rows = [{**row, "size": str(row["size"])} for row in self.rows(2)]
+        for row in rows:
+            row["price"] = "1.00"
+
+        response = client.post("/api/v1/variants/", rows, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(
+            ProductVariant.objects.get(pk=response.data[0]["id"]).author, self.author
+        )
+
+        for data in ([], [{"product": self.product.pk}], [{**rows[0], "product": 0}]):
+            with self.subTest(data=data):
+                response = client.post("/api/v1/variants/", data, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_single_post_creates_a_variant(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        row = {
+            "product": self.product.pk,
+            "brand": "Acme",
+            "size": "1",
+            "flavor": "Orange",
+            "price": "1.00",
+        }
+
+        response = client.post("/api/v1/variants/", row, format="json")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["sku"], "ORANGE-Acme-1-ORA")
+        self.assertEqual(
+            ProductVariant.objects.get(pk=response.data["id"]).author, self.author
+        )
@@ -0,0 +1,100 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.warehouses.models import Stock, Warehouse
+
+
+class TestSparseFieldsets(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            author=self.author,
+            name="Juice",
+            description="Freshly squeezed.",
+            category=ProductCategory.objects.create(name="Drinks"),
+            unit=ProductUnit.objects.create(name="Litre", symbol="l"),
+        )
+        self.variant = ProductVariant.objects.create(
+            author=self.author,
+            product=self.product,
+            size=Decimal("1"),
+            price=Decimal("2.50"),
+            description="A long description of the variant.",
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        return response, " ".join(query["sql"] for query in queries)
+
+    def test_fields_trim_the_response_and_the_columns(self):
+        response, sql = self.get("/api/v1/variants/?fields=id,sku,price")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.variant.pk, "sku": self.variant.sku, "price": "2.50"}],
+        )
+        self.assertNotIn('"products_productvariant"."description"', sql)
+        self.assertNotIn('"products_productvariant"."image"', sql)
+
+    def test_related_fields_keep_their_relation(self):
+        response, _ = self.get("/api/v1/variants/?fields=id,name,unit")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.variant.pk, "name": "Juice", "unit": "l"}],
+        )
+
+    def test_detail_fields(self):
+        response, sql = self.get(f"/api/v1/variants/{self.variant.pk}/?fields=id,sku")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data, {"id": self.variant.pk, "sku": self.variant.sku}
+        )
+        self.assertNotIn('"products_productvariant"."description"', sql)
+
+    def test_omit_drops_fields(self):
+        response, sql = self.get("/api/v1/products/?omit=description,tags")
+        (result,) = response.data["results"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("description", result)
+        self.assertNotIn("tags", result)
+        self.assertEqual(result["name"], "Juice")
+        self.assertEqual(result["category_name"], "Drinks")
+        self.assertNotIn('"products_product"."description"', sql)
+
+    def test_full_response_without_parameters(self):
+        response, sql = self.get("/api/v1/variants/")
+
+        self.assertIn("description", response.data["results"][0])
+        self.assertIn('"products_productvariant"."description"', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        for query in ("fields=id,colour", "omit=colour"):
+            with self.subTest(query=query):
+                response, _ = self.get(f"/api/v1/variants/?{query}")
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [query.split("=")[0]])
+
+    def test_other_apps_support_fields(self):
+        warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        stock = Stock.objects.create(
+            warehouse=warehouse, product_variant=self.variant, quantity=4
+        )
+
+        response, _ = self.get("/api/v1/stocks/?fields=id,quantity")
+
+        self.assertEqual(response.data["results"], [{"id": stock.pk, "quantity": 4}])
@@ -0,0 +1,222 @@
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Max
+from django.test import RequestFactory, TestCase
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import Product, ProductCategory, ProductUnit, ProductVariant
+from core.products.serializers import (
+    ProductCategorySerializer,
+    ProductSerializer,
+    ProductVariantSerializer,
+)
+from core.products.values import compile_values_reader
+from core.products.views import ProductVariantViewSet
+from core.warehouses.models import Stock, Warehouse
+from core.warehouses.serializers import StockSerializer
+
+
+class TestValuesList(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            author=self.author,
+            name="Juice",
+            category=ProductCategory.objects.create(name="Drinks"),
+            unit=ProductUnit.objects.create(name="Litre", symbol="l"),
+        )
+        self.uncategorized = Product.objects.create(author=self.author, name="Mystery")
+        self.variants = [
+            ProductVariant.objects.create(
+                author=self.author,
+                product=self.product,
+                size=Decimal("1"),
+                price=Decimal("2.5"),
+                image="variants/juice.png",
+            ),
+            ProductVariant.objects.create(
+                author=self.author,
+                product=self.uncategorized,
+                size=Decimal("2"),
+                price=Decimal("3.00"),
+            ),
+        ]
+
+    def serialize(self, url, serializer_class, queryset):
+        request = Request(RequestFactory().get(url))
+
+        return serializer_class(queryset, many=True, context={"request": request}).data
+
+    def test_variant_list_matches_the_serializer(self):
+        response = self.client.get("/api/v1/variants/")
+        queryset = ProductVariantViewSet(
+            request=None, action="list", format_kwarg=None
+        ).get_queryset()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(
+            compile_values_reader(ProductVariantSerializer(), queryset)
+        )
+        self.assertEqual(
+            response.json()["results"],
+            self.serialize("/api/v1/variants/", ProductVariantSerializer, queryset),
+        )
+        self.assertNotIn("category", response.json()["results"][1])
+        self.assertEqual(response.json()["results"][0]["price"], "2.50")
+
+    def test_stock_list_matches_the_serializer(self):
+        warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        Stock.objects.create(
+            warehouse=warehouse,
+            product_variant=self.variants[0],
+            quantity=7,
+            reserved_quantity=2,
+        )
+
+        response = self.client.get("/api/v1/stocks/")
+
+        self.assertEqual(
+            response.json()["results"],
+            self.serialize("/api/v1/stocks/", StockSerializer, Stock.objects.all()),
+        )
+        self.assertEqual(response.json()["results"][0]["available_quantity"], 5)
+
+    def test_keyset_pages_are_read_from_values(self):
+        response = self.client.get("/api/v1/variants/?pagination=keyset&limit=1")
+        following = self.client.get(response.data["next"])
+
+        self.assertEqual(response.data["results"][0]["id"], self.variants[0].pk)
+        self.assertEqual(following.data["results"][0]["id"], self.variants[1].pk)
+
+    def test_sparse_fields_are_read_from_values(self):
+        response = self.client.get("/api/v1/variants/?fields=id,name,category")
+
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"id": self.variants[0].pk, "name": "Juice", "category": "Drinks"},
+                {"id": self.variants[1].pk, "name": "Mystery"},
+            ],
+        )
+
+    def test_unsupported_serializers_are_not_compiled(self):
+        for serializer in (ProductSerializer(), ProductCategorySerializer()):
+            with self.subTest(serializer=type(serializer).__name__):
+                self.assertIsNone(
+                    compile_values_reader(
+                        serializer, serializer.Meta.model.objects.all()
+                    )
+                )
+
+    def test_expanded_lists_fall_back_to_the_serializer(self):
+        response = self.client.get("/api/v1/variants/?expand=product")
+        queryset = ProductVariantViewSet(
+            request=None, action="list", format_kwarg=None
+        ).get_queryset()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(
+            compile_values_reader(
+                ProductVariantSerializer(expand={"product": {}}), queryset
+            )
+        )
+        self.assertEqual(response.json()["results"][0]["product"]["name"], "Juice")
+        self.assertEqual(
+            [result["id"] for result in response.json()["results"]],
+            [variant.pk for variant in self.variants],
+        )
+
+    def test_unpaginated_lists_are_read_from_values(self):
+        view = ProductVariantViewSet.as_view({"get": "list"}, pagination_class=None)
+
+        response = view(APIRequestFactory().get("/api/v1/variants/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["id"] for result in response.data],
+            [variant.pk for variant in self.variants],
+        )
+        self.assertEqual(response.data[1]["price"], "3.00")
+
+
+class TestCompileValuesReader(TestCase):
+    def compile(self, **fields):
+        serializer_class = type("VariantSerializer", (serializers.Serializer,), fields)
+
+        return compile_values_reader(serializer_class(), ProductVariant.objects.all())
+
+    def test_unreadable_fields_are_not_compiled(self):
+        for name, field in (
+            ("whole object", serializers.CharField(source="*")),
+            (
+                "slug relation",
+                serializers.SlugRelatedField(
+                    source="product", slug_field="name", read_only=True
+                ),
+            ),
+            ("property", serializers.CharField(source="missing")),
+            ("reverse relation", serializers.IntegerField(source="availability")),
+            ("through a value", serializers.CharField(source="brand.upper")),
+            (
+                "nullable relation with a default",
+                serializers.CharField(source="product.category.name", default=""),
+            ),
+            (
+                "required through a nullable relation",
+                serializers.CharField(source="product.category.name"),
+            ),
+            (
+                "relation on a value",
+                serializers.PrimaryKeyRelatedField(source="brand", read_only=True),
+            ),
+            (
+                "value on a relation",
+                serializers.IntegerField(source="product", read_only=True),
+            ),
+        ):
+            with self.subTest(field=name):
+                self.assertIsNone(self.compile(value=field))
+
+    def test_relations_are_not_read_from_annotations(self):
+        serializer_class = type(
+            "VariantSerializer",
+            (serializers.Serializer,),
+            {"stock": serializers.PrimaryKeyRelatedField(read_only=True)},
+        )
+        queryset = ProductVariant.objects.annotate(stock=Max("stocks"))
+
+        self.assertIsNone(compile_values_reader(serializer_class(), queryset))
+
+    def test_null_relations_render_null_fields(self):
+        reader = self.compile(
+            category=serializers.CharField(
+                source="product.category.name", allow_null=True, read_only=True
+            ),
+            password=serializers.CharField(write_only=True),
+        )
+
+        row = {"pk": 1, "product": 1, "product__category": None}
+
+        self.assertEqual(
+            reader({**row, "product__category__name": None}), {"category": None}
+        )
+
+    def test_values_the_fast_paths_do_not_handle(self):
+        updated = datetime(2024, 1, 2, 3, 4, 5)
+        reader = self.compile(
+            price=serializers.DecimalField(max_digits=10, decimal_places=2),
+            updated=serializers.DateTimeField(),
+        )
+
+        self.assertEqual(
+            reader({"pk": 1, "price": 3, "updated": updated}),
+            {
+                "price": "3.00",
+                "updated": serializers.DateTimeField().to_representation(updated),
+            },
+        )
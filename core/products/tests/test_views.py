@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import ProductCategory, ProductUnit
+from core.products.tests import factories as product_factories
+from core.warehouses.models import Stock, Warehouse
+
+
+class TestListQueryCounts(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.category = ProductCategory.objects.create(name="Drinks")
+        self.unit = ProductUnit.objects.create(name="Litre", symbol="l")
+
+    def add_products(self, count):
+        for _ in range(count):
+            product = product_factories.ProductFactory(
+                author=self.author, category=self.category, unit=self.unit
+            )
+            product.tags.add("fresh")
+            product_factories.ProductVariantFactory(author=self.author, product=product)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        for url in (
+            "/api/v1/products/",
+            "/api/v1/categories/",
+            "/api/v1/units/",
+            f"/api/v1/categories/{self.category.pk}/",
+            "/api/v1/variants/",
+        ):
+            with self.subTest(url=url):
+                self.add_products(1)
+                few = self.count_queries(url)
+                self.add_products(4)
+
+                self.assertEqual(self.count_queries(url), few)
+
+
+class TestVariantAvailabilityViews(TestCase):
+    def setUp(self):
+        author = UserFactory()
+        self.client = APIClient()
+        self.stocked, self.unstocked, self.emptied = [
+            product_factories.ProductVariantFactory(author=author) for _ in range(3)
+        ]
+
+        for product_variant, quantity in (
+            (self.stocked, 8),
+            (self.stocked, 4),
+            (self.emptied, 0),
+        ):
+            Stock.objects.create(
+                warehouse=Warehouse.objects.create(author=author, name="Depot"),
+                product_variant=product_variant,
+                quantity=quantity,
+            )
+
+    def get_ids(self, query):
+        response = self.client.get(f"/api/v1/variants/?{query}")
+
+        self.assertEqual(response.status_code, 200)
+
+        return [result["id"] for result in response.data["results"]]
+
+    def test_availability_is_listed(self):
+        response = self.client.get(
+            f"/api/v1/variants/?product={self.stocked.product_id}"
+        )
+        (result,) = response.data["results"]
+
+        self.assertEqual(result["total_on_hand"], 12)
+        self.assertEqual(result["warehouses_stocked"], 2)
+
+    def test_filter_by_availability(self):
+        for query, expected in (
+            ("in_stock=true", [self.stocked]),
+            ("in_stock=false", [self.unstocked, self.emptied]),
+            ("min_on_hand=10", [self.stocked]),
+            ("min_on_hand=13", []),
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.get_ids(query), [variant.pk for variant in expected]
+                )
+
+    def test_order_by_availability(self):
+        self.assertEqual(
+            self.get_ids("ordering=-total_on_hand,id"),
+            [self.stocked.pk, self.unstocked.pk, self.emptied.pk],
+        )
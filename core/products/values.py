@@ -0,0 +1,325 @@
+"""
+Reading serializer representations straight from `values()` rows.
+
+Instead of loading model instances and letting every serializer field walk
+its source on each of them, the sources of the fields are resolved once to
+`values()` paths, and each row is turned into the representation with the
+`to_representation` of the fields only. The output is the same as the one
+of the serializer, for the serializers whose fields can all be read this
+way.
+"""
+
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+# The representation of a field reached through a NULL relation is skipped.
+SKIP = object()
+
+# The serializer fields representing the values of these model fields as is.
+UNCONVERTED_FIELDS = {
+    serializers.CharField: (models.CharField, models.TextField),
+    serializers.SlugField: (models.SlugField,),
+    serializers.IntegerField: (models.IntegerField,),
+    serializers.BooleanField: (models.BooleanField,),
+}
+
+
+class ValuesReader:
+    """
+    Build the representations of a serializer from `values()` rows.
+
+    Each reader is the output name, the `values()` path, the conversion of
+    non-null values, the paths of the nullable relations the source goes
+    through and the representation when one of them is NULL.
+
+    Parameters
+    ----------
+    readers : list[tuple]
+        The `(name, path, convert, guards, missing)` of each field.
+    expressions : dict
+        The expressions read under the name of a field.
+    """
+
+    def __init__(self, readers, expressions):
+        self.readers = readers
+        self.expressions = expressions
+        self.paths = sorted(
+            {"pk"}
+            | {path for _, path, _, _, _ in readers if path not in expressions}
+            | {guard for _, _, _, guards, _ in readers for guard in guards}
+        )
+
+    def values(self, queryset):
+        """
+        Return the `values()` queryset of the rows the readers read.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The filtered queryset.
+
+        Returns
+        -------
+        QuerySet
+            The rows, as dictionaries.
+        """
+        return queryset.prefetch_related(None).values(*self.paths, **self.expressions)
+
+    def __call__(self, row):
+        """
+        Return the representation of a row.
+
+        Parameters
+        ----------
+        row : dict
+            The `values()` row.
+
+        Returns
+        -------
+        dict
+            The representation of the row.
+        """
+        ret = {}
+
+        for name, path, convert, guards, missing in self.readers:
+            if guards and any(row[guard] is None for guard in guards):
+                if missing is not SKIP:
+                    ret[name] = missing
+                continue
+
+            value = row[path]
+            ret[name] = value if value is None or convert is None else convert(value)
+
+        return ret
+
+
+def _get_converter(field, model_field):
+    """
+    Return the conversion of the non-null values of a field to their
+    representation.
+
+    What the representation of the datetimes and decimals depends on, apart
+    from the value, is looked up once instead of on every value.
+
+    Parameters
+    ----------
+    field : Field
+        The bound serializer field.
+    model_field : Field or None
+        The model field read, or `None` for an expression or annotation.
+
+    Returns
+    -------
+    callable or None
+        The conversion, or `None` when the values are their representation.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        field_timezone = (
+            field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        )
+
+        if (
+            isinstance(output_format, str)
+            and output_format.lower() == ISO_8601
+            and field_timezone is not None
+        ):
+
+            def convert(value):
+                if not timezone.is_aware(value):
+                    return field.to_representation(value)
+
+                value = value.astimezone(field_timezone).isoformat()
+
+                return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+            return convert
+
+    elif isinstance(field, serializers.DecimalField):
+        coerce_to_string = getattr(
+            field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+        )
+
+        if (
+            coerce_to_string
+            and field.decimal_places is not None
+            and not field.localize
+            and not field.normalize_output
+        ):
+            exponent = decimal.Decimal(".1") ** field.decimal_places
+            context = decimal.getcontext().copy()
+
+            if field.max_digits is not None:
+                context.prec = field.max_digits
+
+            def convert(value):
+                if not isinstance(value, decimal.Decimal):
+                    return field.to_representation(value)
+
+                return "{:f}".format(
+                    value.quantize(exponent, rounding=field.rounding, context=context)
+                )
+
+            return convert
+
+    elif model_field is not None and isinstance(
+        model_field, UNCONVERTED_FIELDS.get(type(field), ())
+    ):
+        return None
+
+    return field.to_representation
+
+
+def _compile_field(field, queryset, expressions):
+    """
+    Resolve the source of a serializer field to a `values()` reader.
+
+    Parameters
+    ----------
+    field : Field
+        The bound serializer field.
+    queryset : QuerySet
+        The queryset the field is read from.
+    expressions : dict
+        The expressions read under the name of a field.
+
+    Returns
+    -------
+    tuple or None
+        The reader of the field, or `None` when the field cannot be read
+        from a `values()` row.
+    """
+    if isinstance(field, (ManyRelatedField, serializers.BaseSerializer)):
+        return None
+
+    if field.source == "*":
+        return None
+
+    attrs = field.source_attrs
+    is_related = isinstance(field, serializers.RelatedField)
+
+    if is_related and not isinstance(field, PrimaryKeyRelatedField):
+        return None
+
+    if len(attrs) == 1 and (
+        attrs[0] in expressions or attrs[0] in queryset.query.annotations
+    ):
+        if is_related or isinstance(field, serializers.FileField):
+            return None
+
+        return field.field_name, attrs[0], _get_converter(field, None), (), None
+
+    model = queryset.model
+    guards = []
+
+    for position, attr in enumerate(attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+
+        if position == len(attrs) - 1:
+            break
+
+        if not model_field.many_to_one and not model_field.one_to_one:
+            return None
+
+        if model_field.null:
+            guards.append("__".join(attrs[: position + 1]))
+
+        model = model_field.related_model
+
+    # DRF defaults, nulls or skips a field whose source goes through a NULL
+    # relation.
+    if not guards:
+        missing = None
+    elif field.default is not empty:
+        return None
+    elif field.allow_null:
+        missing = None
+    elif not field.required:
+        missing = SKIP
+    else:
+        return None
+
+    path = "__".join(attrs)
+
+    if is_related:
+        if not model_field.is_relation:
+            return None
+
+        convert = field.pk_field.to_representation if field.pk_field else None
+    elif model_field.is_relation:
+        return None
+    elif isinstance(field, serializers.FileField):
+
+        def convert(name, field=field, model_field=model_field):
+            return field.to_representation(
+                model_field.attr_class(None, model_field, name)
+            )
+
+    else:
+        convert = _get_converter(field, model_field)
+
+    return field.field_name, path, convert, tuple(guards), missing
+
+
+def compile_values_reader(serializer, queryset, expressions=None):
+    """
+    Compile the reader of the representations of a serializer from the
+    `values()` rows of a queryset.
+
+    Parameters
+    ----------
+    serializer : Serializer
+        The serializer, with the fields to render.
+    queryset : QuerySet
+        The filtered queryset.
+    expressions : dict, optional
+        The expressions computing the fields that are not model fields or
+        annotations of the queryset, by field name.
+
+    Returns
+    -------
+    ValuesReader or None
+        The reader, or `None` when a field of the serializer cannot be read
+        from a `values()` row, or the serializer customizes its
+        representation.
+    """
+    expressions = expressions or {}
+
+    if (
+        type(serializer).to_representation
+        is not serializers.Serializer.to_representation
+    ):
+        return None
+
+    readers = []
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        reader = _compile_field(field, queryset, expressions)
+
+        if reader is None:
+            return None
+
+        readers.append(reader)
+
+    used = {path for _, path, _, _, _ in readers}
+
+    return ValuesReader(
+        readers,
+        {name: expression for name, expression in expressions.items() if name in used},
+    )
@@ -2,6 +2,8 @@
 Views for the `products` app.
 """
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Prefetch
 from django.db.utils import IntegrityError
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import authentication, permissions, status, viewsets
@@ -13,10 +15,29 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from . import models as product_models
 from . import serializers as product_serializers
+from . import services as product_services
+from .autocomplete import autocomplete_variants
+from .filters import FullTextSearchFilter, ProductVariantFilter
+from .mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ExpandMixin,
+    ExportMixin,
+    FacetsMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+)
 from .pagination import StandardPagination
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    FacetsMixin,
+    ExpandMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for the Product model.
     """
@@ -24,13 +45,20 @@ class ProductViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = product_models.Product.objects.all().order_by("id")
     serializer_class = product_serializers.ProductSerializer
+    cache_models = [
+        "products.Product",
+        "products.ProductCategory",
+        "products.ProductUnit",
+        "products.ProductVariant",
+        "taggit.TaggedItem",
+    ]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
 
-    filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
+    filter_backends = [OrderingFilter, FullTextSearchFilter, DjangoFilterBackend]
 
     filterset_fields = ["category", "unit", "is_active"]
     search_fields = ["name", "slug", "category__name", "description"]
@@ -38,6 +66,17 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     ordering = ["id"]
 
+    def get_queryset(self):
+        """
+        Load the category, unit, tags and variant count of the products.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        return product_serializers.get_product_queryset().order_by("id")
+
     def perform_create(self, serializer):
         """
         Set the current authenticated user as the author when creating a product.
@@ -96,7 +135,9 @@ class ProductViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProductCategoryViewSet(viewsets.ModelViewSet):
+class ProductCategoryViewSet(
+    ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for the ProductCategory model.
     """
@@ -104,6 +145,12 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = product_models.ProductCategory.objects.all()
     serializer_class = product_serializers.ProductCategorySerializer
+    cache_models = [
+        "products.ProductCategory",
+        "products.Product",
+        "products.ProductVariant",
+        "taggit.TaggedItem",
+    ]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
@@ -117,6 +164,26 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
 
     ordering = ["id"]
 
+    def get_queryset(self):
+        """
+        Annotate the product count, and load the products for the detail view.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        queryset = super().get_queryset().annotate(product_count=Count("products"))
+
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "products", queryset=product_serializers.get_product_queryset()
+                )
+            )
+
+        return queryset
+
     def get_serializer_class(self):
         """
         Return the appropriate serializer based on the request type.
@@ -190,7 +257,9 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProductUnitViewSet(viewsets.ModelViewSet):
+class ProductUnitViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for the ProductUnit model.
     """
@@ -198,6 +267,12 @@ class ProductUnitViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = product_models.ProductUnit.objects.all()
     serializer_class = product_serializers.ProductUnitSerializer
+    cache_models = [
+        "products.ProductUnit",
+        "products.Product",
+        "products.ProductVariant",
+        "taggit.TaggedItem",
+    ]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
@@ -211,6 +286,26 @@ class ProductUnitViewSet(viewsets.ModelViewSet):
 
     ordering = ["id"]
 
+    def get_queryset(self):
+        """
+        Annotate the product count and load the products of the units.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        return (
+            super()
+            .get_queryset()
+            .annotate(product_count=Count("products"))
+            .prefetch_related(
+                Prefetch(
+                    "products", queryset=product_serializers.get_product_queryset()
+                )
+            )
+        )
+
     @action(detail=False, methods=["post"], url_path="bulk-delete")
     def bulk_delete(self, request):
         """
@@ -245,7 +340,16 @@ class ProductUnitViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProductVariantViewSet(viewsets.ModelViewSet):
+class ProductVariantViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    FacetsMixin,
+    ExportMixin,
+    ValuesListMixin,
+    ExpandMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for the ProductVariant model.
     """
@@ -253,19 +357,67 @@ class ProductVariantViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = product_models.ProductVariant.objects.all().order_by("id")
     serializer_class = product_serializers.ProductVariantSerializer
+    cache_models = [
+        "products.ProductVariant",
+        "products.Product",
+        "products.ProductCategory",
+        "products.ProductUnit",
+        "taggit.TaggedItem",
+        "warehouses.VariantAvailability",
+    ]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
 
-    filter_backends = [SearchFilter, OrderingFilter]
-
-    ordering_fields = ["name", "product", "flavor", "brand", "is_active", "updated"]
+    filter_backends = [OrderingFilter, FullTextSearchFilter, DjangoFilterBackend]
+
+    filterset_class = ProductVariantFilter
+    ordering_fields = [
+        "name",
+        "product",
+        "flavor",
+        "brand",
+        "is_active",
+        "updated",
+        "total_on_hand",
+        "warehouses_stocked",
+        "last_movement_at",
+    ]
     search_fields = ["name", "slug", "product__name", "description", "flavor", "brand"]
+    export_fields = [
+        "id",
+        "sku",
+        "product",
+        "product__name",
+        "display_name",
+        "brand",
+        "flavor",
+        "size",
+        "price",
+        "is_active",
+        "total_on_hand",
+        "warehouses_stocked",
+        "last_movement_at",
+        "updated",
+        "created",
+    ]
 
     ordering = ["id"]
 
+    def get_queryset(self):
+        """
+        Annotate the variants with their maintained cross-warehouse availability
+        and load the product details the serializers read.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        return product_serializers.get_product_variant_queryset().order_by("id")
+
     def get_serializer_class(self):
         """
         Use ProductVariantDetailSerializer for retrieving a single product variant.
@@ -280,6 +432,48 @@ class ProductVariantViewSet(viewsets.ModelViewSet):
 
         return product_serializers.ProductVariantSerializer
 
+    def create(self, request, *args, **kwargs):
+        """
+        Create a product variant, or many at once when given a list.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        *args : tuple
+            Positional arguments passed to the view.
+        **kwargs : dict
+            Keyword arguments passed to the view.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = product_serializers.ProductVariantBulkCreateSerializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            variants = product_services.create_product_variants(
+                serializer.validated_data,
+                author=request.user,
+            )
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+        return Response(
+            [
+                {"id": variant.pk, "sku": variant.sku, "slug": variant.slug}
+                for variant in variants
+            ],
+            status=status.HTTP_201_CREATED,
+        )
+
     def perform_create(self, serializer):
         """
         Set the current authenticated user as the author
@@ -338,8 +532,74 @@ class ProductVariantViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Custom action to suggest variants for a partly typed SKU or name.
+
+        Takes the typed text as `?q=` and the number of suggestions as
+        `?limit=`, and returns the `id`, `sku` and `name` of each match.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        prefix = request.query_params.get("q", "").strip()
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+
+        if not prefix:
+            return Response([], status=status.HTTP_200_OK)
+
+        return Response(
+            autocomplete_variants(prefix, limit=max(1, min(limit, 50))),
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-reprice")
+    def bulk_reprice(self, request):
+        """
+        Custom action to change the prices of multiple variants at once.
+
+        Each entry of `prices` holds the `id` or the `sku` of a variant and
+        its new `price`.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        serializer = product_serializers.ProductVariantRepriceSerializer(
+            data=request.data
+        )
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = product_services.reprice_product_variants(
+                serializer.validated_data["prices"],
+                author=request.user,
+            )
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+        return Response(result, status=status.HTTP_200_OK)
+
 
-class ProductPriceHistoryViewSet(viewsets.ModelViewSet):
+class ProductPriceHistoryViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for the ProductPriceHistory model.
     """
@@ -34,7 +34,7 @@ class SupplierAdmin(admin.ModelAdmin):
     list_filter = ("country", "city")
     ordering = ("business_name",)
     date_hierarchy = "created"
-    show_facets = admin.ShowFacets.ALWAYS
+    show_facets = admin.ShowFacets.ALLOW
 
 
 @admin.register(SupplierProduct)
@@ -49,4 +49,4 @@ class SupplierProductAdmin(admin.ModelAdmin):
     ordering = ("supplier", "product_variant")
     raw_id_fields = ("supplier", "product_variant")
     date_hierarchy = "created"
-    show_facets = admin.ShowFacets.ALWAYS
+    show_facets = admin.ShowFacets.ALLOW
@@ -12,3 +12,9 @@ class SuppliersConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.suppliers"
+
+    def ready(self):
+        """
+        Import signals.
+        """
+        import core.suppliers.signals
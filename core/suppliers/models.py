@@ -2,6 +2,8 @@
 Models for the `suppliers` app.
 """
 
+from decimal import Decimal
+
 from django.core.validators import MinValueValidator
 from django.db import models
 from simple_history.models import HistoricalRecords
@@ -93,7 +95,7 @@ class SupplierProduct(models.Model):
     price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
-        validators=[MinValueValidator(0)],
+        validators=[MinValueValidator(Decimal("0"))],
         help_text="Price of the product.",
     )
 
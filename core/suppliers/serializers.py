@@ -2,10 +2,16 @@
 Serializers for the suppliers app.
 """
 
+from django.db.models import Count
 from rest_framework import serializers
 
 from core.custom_user.models import User
+from core.products.expand import ExpandableFieldsMixin, Expansion
 from core.products.models import ProductVariant
+from core.products.serializers import (
+    ProductVariantSerializer,
+    get_product_variant_queryset,
+)
 
 from .models import Supplier, SupplierProduct
 
@@ -36,6 +42,9 @@ class SupplierSerializer(serializers.ModelSerializer):
         int
             The number of products associated with this supplier.
         """
+        if hasattr(obj, "product_count"):
+            return obj.product_count
+
         return obj.products.count()
 
     class Meta:
@@ -46,11 +55,21 @@ class SupplierSerializer(serializers.ModelSerializer):
         }
 
 
-class SupplierProductSerializer(serializers.ModelSerializer):
+class SupplierProductSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the SupplierProduct model.
     """
 
+    expandable_fields = {
+        "supplier": Expansion(
+            SupplierSerializer,
+            Supplier.objects.annotate(product_count=Count("products")),
+        ),
+        "product_variant": Expansion(
+            ProductVariantSerializer, get_product_variant_queryset()
+        ),
+    }
+
     supplier = serializers.PrimaryKeyRelatedField(queryset=Supplier.objects.all())
     product_variant = serializers.PrimaryKeyRelatedField(
         queryset=ProductVariant.objects.all()
@@ -61,14 +80,18 @@ class SupplierProductSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class SupplierProductDetailSerializer(serializers.ModelSerializer):
+class SupplierProductDetailSerializer(
+    ExpandableFieldsMixin, serializers.ModelSerializer
+):
     """
     Detailed serializer for the SupplierProduct model.
-    Includes product and supplier details.
+    Includes the product name, and the supplier and product variant details
+    when expanded with `?expand=supplier,product_variant`.
     """
 
-    supplier = SupplierSerializer(read_only=True)
-    product_variant = serializers.CharField(
+    expandable_fields = SupplierProductSerializer.expandable_fields
+
+    product_name = serializers.CharField(
         source="product_variant.product.name",
         read_only=True,
     )
@@ -76,4 +99,3 @@ class SupplierProductDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = SupplierProduct
         fields = "__all__"
-        depth = 1
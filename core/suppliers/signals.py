@@ -0,0 +1,29 @@
+"""
+Signals for the suppliers app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.products.caching import invalidate_models
+
+from .models import SupplierProduct
+
+
+@receiver(post_save, sender=SupplierProduct)
+@receiver(post_delete, sender=SupplierProduct)
+def invalidate_supplier_products(sender, instance, **kwargs):
+    """
+    Invalidate the cached data read from the supplier products when they
+    change, such as the product counts of the suppliers.
+
+    Parameters
+    ----------
+    sender : SupplierProduct
+        The SupplierProduct model.
+    instance : SupplierProduct
+        The SupplierProduct instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    invalidate_models(SupplierProduct)
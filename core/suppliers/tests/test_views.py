@@ -0,0 +1,190 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.tests import factories as product_factories
+from core.suppliers.models import Supplier, SupplierProduct
+
+
+class TestSupplierListQueryCounts(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+
+    def add_suppliers(self, count):
+        for _ in range(count):
+            SupplierProduct.objects.create(
+                supplier=Supplier.objects.create(
+                    author=self.author, business_name="Acme"
+                ),
+                product_variant=self.product_variant,
+                price=Decimal("1.00"),
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/v1/suppliers/")
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries), response.data["results"]
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        self.add_suppliers(1)
+        few, _ = self.count_queries()
+        self.add_suppliers(4)
+        many, results = self.count_queries()
+
+        self.assertEqual(many, few)
+        self.assertEqual({result["product_count"] for result in results}, {1})
+
+
+class TestSupplierProductExpand(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.supplier_product = self.add_supplier_product()
+
+    def add_supplier_product(self):
+        return SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(author=self.author, business_name="Acme"),
+            product_variant=product_factories.ProductVariantFactory(author=self.author),
+            price=Decimal("1.00"),
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return response.data, len(queries)
+
+    def test_detail_has_ids_and_product_name(self):
+        data, _ = self.get(f"/api/v1/supplier-products/{self.supplier_product.pk}/")
+
+        self.assertEqual(data["supplier"], self.supplier_product.supplier_id)
+        self.assertEqual(
+            data["product_variant"], self.supplier_product.product_variant_id
+        )
+        self.assertEqual(
+            data["product_name"], self.supplier_product.product_variant.product.name
+        )
+
+    def test_detail_expansion(self):
+        data, _ = self.get(
+            f"/api/v1/supplier-products/{self.supplier_product.pk}/"
+            "?expand=supplier,product_variant.product.category"
+        )
+
+        self.assertEqual(data["supplier"]["business_name"], "Acme")
+        self.assertEqual(data["supplier"]["product_count"], 1)
+        self.assertEqual(
+            data["product_variant"]["product"]["category"]["id"],
+            self.supplier_product.product_variant.product.category_id,
+        )
+
+    def test_list_queries_do_not_grow_with_expanded_rows(self):
+        url = "/api/v1/supplier-products/?expand=supplier,product_variant.product"
+        _, few = self.get(url)
+        self.add_supplier_product()
+        self.add_supplier_product()
+        data, many = self.get(url)
+
+        self.assertEqual(many, few)
+        self.assertEqual(len(data["results"]), 3)
+
+    def test_expanded_fields_can_be_selected(self):
+        data, _ = self.get(
+            "/api/v1/supplier-products/?expand=supplier,product_variant"
+            "&fields=id,supplier"
+        )
+
+        self.assertEqual(set(data["results"][0]), {"id", "supplier"})
+        self.assertEqual(data["results"][0]["supplier"]["business_name"], "Acme")
+
+    def test_unknown_expansions_are_rejected(self):
+        response = self.client.get("/api/v1/supplier-products/?expand=supplier.author")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["expand"], "Cannot expand `supplier.author`.")
+
+
+class TestSupplierSparseFieldsets(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.supplier = Supplier.objects.create(
+            author=self.author,
+            business_name="Acme",
+            contact_person="Jo",
+            email="orders@acme.test",
+        )
+        self.supplier_product = SupplierProduct.objects.create(
+            supplier=self.supplier,
+            product_variant=product_factories.ProductVariantFactory(author=self.author),
+            price=Decimal("1.50"),
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        return response, " ".join(query["sql"] for query in queries)
+
+    def test_supplier_fields_trim_the_response_and_the_columns(self):
+        response, sql = self.get("/api/v1/suppliers/?fields=id,business_name")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.supplier.pk, "business_name": "Acme"}],
+        )
+        self.assertNotIn('"suppliers_supplier"."email"', sql)
+
+    def test_supplier_omit_keeps_the_other_fields(self):
+        response, _ = self.get(
+            f"/api/v1/suppliers/{self.supplier.pk}/?omit=email,phone,product_count"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["contact_person"], "Jo")
+        self.assertNotIn("email", response.data)
+        self.assertNotIn("phone", response.data)
+        self.assertNotIn("product_count", response.data)
+
+    def test_supplier_product_fields(self):
+        response, _ = self.get("/api/v1/supplier-products/?fields=id,price")
+        detail, _ = self.get(
+            f"/api/v1/supplier-products/{self.supplier_product.pk}/"
+            "?fields=id,product_name"
+        )
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.supplier_product.pk, "price": "1.50"}],
+        )
+        self.assertEqual(
+            detail.data,
+            {
+                "id": self.supplier_product.pk,
+                "product_name": self.supplier_product.product_variant.product.name,
+            },
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        for url, param in (
+            ("/api/v1/suppliers/?fields=id,secret", "fields"),
+            ("/api/v1/supplier-products/?omit=secret", "omit"),
+        ):
+            with self.subTest(url=url):
+                response, _ = self.get(url)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data[param], "Unknown fields: ['secret'].")
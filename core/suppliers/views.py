@@ -2,18 +2,20 @@
 Views for the `suppliers` app.
 """
 
+from django.db.models import Count
 from django.db.utils import IntegrityError
 from rest_framework import authentication, permissions, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from core.products.mixins import ConditionalGetMixin, ExpandMixin, SparseFieldsetMixin
 from core.products.pagination import StandardPagination
 
 from . import models as supplier_models
 from . import serializers as supplier_serializers
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for the Supplier model.
     """
@@ -21,12 +23,24 @@ class SupplierViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = supplier_models.Supplier.objects.all().order_by("id")
     serializer_class = supplier_serializers.SupplierSerializer
+    cache_models = ["suppliers.SupplierProduct"]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
 
+    def get_queryset(self):
+        """
+        Annotate the number of products of the suppliers.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        return super().get_queryset().annotate(product_count=Count("products"))
+
     def perform_create(self, serializer):
         """
         Set the current authenticated user as the author when creating a supplier.
@@ -51,7 +65,9 @@ class SupplierViewSet(viewsets.ModelViewSet):
             raise ValidationError({"error": "An unexpected database error occurred."})
 
 
-class SupplierProductViewSet(viewsets.ModelViewSet):
+class SupplierProductViewSet(
+    ConditionalGetMixin, ExpandMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for the SupplierProduct model.
     """
@@ -59,12 +75,51 @@ class SupplierProductViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = supplier_models.SupplierProduct.objects.all().order_by("id")
     serializer_class = supplier_serializers.SupplierProductSerializer
+    cache_models = [
+        "suppliers.Supplier",
+        "products.ProductVariant",
+        "products.Product",
+        "products.ProductCategory",
+        "products.ProductUnit",
+        "taggit.TaggedItem",
+        "warehouses.VariantAvailability",
+    ]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
 
+    def get_queryset(self):
+        """
+        Join the product of the variants when retrieving a supplier product.
+
+        Returns
+        -------
+        QuerySet
+            The queryset of the action.
+        """
+        queryset = super().get_queryset()
+
+        if self.action == "retrieve":
+            queryset = queryset.select_related("product_variant__product")
+
+        return queryset
+
+    def get_serializer_class(self):
+        """
+        Use SupplierProductDetailSerializer for retrieving a single supplier product.
+
+        Returns
+        -------
+        SupplierProductSerializer or SupplierProductDetailSerializer
+            The appropriate serializer based on the request type.
+        """
+        if self.action == "retrieve":
+            return supplier_serializers.SupplierProductDetailSerializer
+
+        return supplier_serializers.SupplierProductSerializer
+
     def perform_create(self, serializer):
         """
         Set the current authenticated user as the author when creating a supplier product.
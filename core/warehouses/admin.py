@@ -6,7 +6,14 @@ from django.contrib import admin
 
 from .models import Stock, StockAlert, StockTransfer, Warehouse, WarehouseUser
 
-admin.site.register(StockAlert)
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the `StockAlert` model.
+    """
+
+    list_select_related = ("stock__product_variant",)
 
 
 @admin.register(WarehouseUser)
@@ -16,6 +23,7 @@ class WarehouseUserAdmin(admin.ModelAdmin):
     """
 
     list_display = ("user", "warehouse", "role")
+    list_select_related = ("user", "warehouse")
     search_fields = ("user__email", "warehouse__name")
     list_filter = ("role",)
     ordering = ("warehouse", "user")
@@ -43,7 +51,8 @@ class StockAdmin(admin.ModelAdmin):
     """
 
     list_display = ("product_variant", "warehouse", "quantity", "low_stock_threshold")
-    search_fields = ("warehouse__name", "product_variant__name")
+    list_select_related = ("product_variant", "warehouse")
+    search_fields = ("warehouse__name", "product_variant__display_name")
     list_filter = ("warehouse",)
     ordering = ("warehouse", "product_variant")
 
@@ -62,11 +71,12 @@ class StockTransferAdmin(admin.ModelAdmin):
         "quantity",
         "created",
     )
+    list_select_related = ("product_variant", "from_warehouse", "to_warehouse")
     search_fields = (
         "reference_code",
         "from_warehouse__name",
         "to_warehouse__name",
-        "product_variant__name",
+        "product_variant__display_name",
     )
     list_filter = ("created", "from_warehouse", "to_warehouse")
     ordering = ("-created",)
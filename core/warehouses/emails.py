@@ -2,10 +2,15 @@
 Emails functions for the `core` app.
 """
 
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
+from django.utils import timezone
 
 from core.custom_user.models import User
-from core.warehouses.models import Stock
+from core.warehouses.models import Stock, StockAlert, WarehouseUser
 from core.warehouses.tasks import send_email_task
 
 
@@ -41,3 +46,103 @@ def send_low_stock_alert(
             subject=subject,
             html_message=html_message,
         )
+
+
+def send_low_stock_alerts(alerts: list[StockAlert]):
+    """
+    Send the low stock email of every alert to its warehouse managers.
+
+    The managers of all affected warehouses are fetched in one query.
+
+    Parameters
+    ----------
+    alerts : list[StockAlert]
+        The newly created stock alerts.
+    """
+    if not alerts:
+        return
+
+    stocks = Stock.objects.filter(
+        alerts__in=alerts,
+    ).select_related("warehouse", "product_variant")
+
+    managers = defaultdict(list)
+
+    for warehouse_id, email in WarehouseUser.objects.filter(
+        warehouse_id__in={stock.warehouse_id for stock in stocks},
+        role=WarehouseUser.RoleChoices.MANAGER,
+    ).values_list("warehouse_id", "user__email"):
+        if email:
+            managers[warehouse_id].append(email)
+
+    for stock in stocks:
+        if managers[stock.warehouse_id]:
+            send_low_stock_alert(stock, managers[stock.warehouse_id])
+
+
+def send_low_stock_digests():
+    """
+    Email every warehouse manager one digest of their pending stock alerts.
+
+    All digests are rendered here, in the worker, and sent over a single
+    SMTP connection. The alerts are then marked as notified.
+
+    Returns
+    -------
+    int
+        The number of digest emails sent.
+    """
+    alerts = list(
+        StockAlert.objects.filter(is_active=True, notified_at__isnull=True)
+        .select_related("stock__warehouse", "stock__product_variant")
+        .order_by("stock__warehouse_id", "id")
+    )
+
+    if not alerts:
+        return 0
+
+    alerts_by_warehouse = defaultdict(list)
+
+    for alert in alerts:
+        alerts_by_warehouse[alert.stock.warehouse].append(alert)
+
+    warehouses = {warehouse.pk: warehouse for warehouse in alerts_by_warehouse}
+    digests = defaultdict(list)
+
+    for warehouse_id, email in WarehouseUser.objects.filter(
+        warehouse_id__in=warehouses,
+        role=WarehouseUser.RoleChoices.MANAGER,
+    ).values_list("warehouse_id", "user__email"):
+        if email:
+            warehouse = warehouses[warehouse_id]
+            digests[email].append((warehouse, alerts_by_warehouse[warehouse]))
+
+    messages = []
+
+    for email, warehouse_alerts in digests.items():
+        message = EmailMultiAlternatives(
+            subject=(
+                "Low stock digest: "
+                f"{sum(len(alerts) for _, alerts in warehouse_alerts)} alerts"
+            ),
+            body="",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+        )
+        message.attach_alternative(
+            render_to_string(
+                "warehouses/emails/low_stock_digest.html",
+                {"warehouse_alerts": warehouse_alerts},
+            ),
+            "text/html",
+        )
+        messages.append(message)
+
+    with get_connection() as connection:
+        connection.send_messages(messages)
+
+    StockAlert.objects.filter(id__in=[alert.id for alert in alerts]).update(
+        notified_at=timezone.now()
+    )
+
+    return len(messages)
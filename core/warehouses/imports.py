@@ -0,0 +1,130 @@
+"""
+Readers for stock count files uploaded to the `warehouses` app.
+"""
+
+import codecs
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+
+IMPORT_FORMATS = [
+    ("csv", "CSV"),
+    ("ndjson", "NDJSON"),
+]
+
+
+def _read_csv(lines):
+    """
+    Yield the records of a CSV stock count with a header row.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The decoded lines of the file.
+
+    Yields
+    ------
+    dict
+        The record of each line.
+    """
+    yield from csv.DictReader(lines)
+
+
+def _read_ndjson(lines):
+    """
+    Yield the records of a newline-delimited JSON stock count.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The decoded lines of the file.
+
+    Yields
+    ------
+    dict or None
+        The record of each line, or `None` for a line that is not valid JSON.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def _decode(file):
+    """
+    Yield the lines of an uploaded file decoded from UTF-8.
+
+    Parameters
+    ----------
+    file : File
+        The uploaded file, opened in binary mode.
+
+    Yields
+    ------
+    str
+        The decoded lines, without the byte order mark.
+
+    Raises
+    ------
+    ValidationError
+        If the file is not valid UTF-8.
+    """
+    try:
+        yield from codecs.iterdecode(file, "utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValidationError({"file": "The file must be encoded as UTF-8."})
+
+
+def read_stock_count(file, file_format):
+    """
+    Stream the lines of an uploaded stock count.
+
+    The file is decoded and parsed one line at a time, so the upload is
+    never held in memory as a whole.
+
+    Parameters
+    ----------
+    file : File
+        The uploaded file, opened in binary mode.
+    file_format : str
+        One of `IMPORT_FORMATS`.
+
+    Yields
+    ------
+    tuple of int
+        The product variant id and the counted quantity of each line.
+
+    Raises
+    ------
+    ValidationError
+        If the file is not valid UTF-8, or a line does not hold a product
+        variant id and a non-negative counted quantity.
+    """
+    reader = _read_csv if file_format == "csv" else _read_ndjson
+    lines = _decode(file)
+
+    for line_number, record in enumerate(reader(lines), start=1):
+        try:
+            product_variant_id = int(record["product_variant"])
+            counted_quantity = int(record["counted_quantity"])
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                {
+                    "file": (
+                        f"Record {line_number} must have an integer "
+                        "`product_variant` and `counted_quantity`."
+                    )
+                }
+            )
+
+        if counted_quantity < 0:
+            raise ValidationError(
+                {"file": f"Record {line_number} has a negative counted quantity."}
+            )
+
+        yield product_variant_id, counted_quantity
@@ -0,0 +1,52 @@
+"""
+Django management command to recompute the warehouse valuations from stock.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.warehouses.services import recompute_warehouse_valuations
+
+
+class Command(BaseCommand):
+    """
+    Recompute the maintained warehouse valuations from the stock records.
+
+    Example:
+        manage.py recompute_warehouse_valuations --warehouse=1 --warehouse=2
+    """
+
+    help = "Recompute the maintained warehouse valuations from the stock records."
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+
+        Parameters
+        ----------
+        parser : CommandParser
+            The argument parser.
+        """
+        parser.add_argument(
+            "--warehouse",
+            action="append",
+            type=int,
+            dest="warehouse_ids",
+            help="Only recompute this warehouse. May be given more than once.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Parameters
+        ----------
+        *args : tuple
+            Positional arguments passed to the command.
+        **options : dict
+            Keyword arguments passed to the command.
+        """
+        with transaction.atomic():
+            count = recompute_warehouse_valuations(options["warehouse_ids"])
+
+        self.stdout.write(f"Recomputed {count} warehouse valuations")
@@ -0,0 +1,160 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    """
+    Seed the ledger with the current balance of every stock record.
+    """
+    Stock = apps.get_model("warehouses", "Stock")
+    StockMovement = apps.get_model("warehouses", "StockMovement")
+
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                warehouse_id=stock.warehouse_id,
+                product_variant_id=stock.product_variant_id,
+                movement_type="RECEIPT",
+                quantity=stock.quantity,
+                reference="opening-balance",
+            )
+            for stock in Stock.objects.filter(quantity__gt=0).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+        ("warehouses", "0011_stockalert_is_active"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "movement_type",
+                    models.CharField(
+                        choices=[
+                            ("RECEIPT", "Receipt"),
+                            ("TRANSFER_IN", "Transfer In"),
+                            ("TRANSFER_OUT", "Transfer Out"),
+                            ("ADJUSTMENT", "Adjustment"),
+                            ("AUDIT_CORRECTION", "Audit Correction"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.IntegerField(
+                        help_text="Signed change in stock. Positive adds stock, negative removes it."
+                    ),
+                ),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        help_text="Reference of the transfer, adjustment or receipt behind the movement.",
+                        max_length=50,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product_variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_movements",
+                        to="products.productvariant",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_movements",
+                        to="warehouses.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("id",),
+                "indexes": [
+                    models.Index(
+                        fields=["warehouse", "product_variant", "created"],
+                        name="warehouses__warehou_9a4080_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.IntegerField(
+                        help_text="The balance after applying every movement up to `last_movement_id`."
+                    ),
+                ),
+                (
+                    "last_movement_id",
+                    models.PositiveBigIntegerField(
+                        help_text="Id of the last ledger movement folded into this snapshot."
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product_variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="products.productvariant",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="warehouses.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-last_movement_id",),
+                "indexes": [
+                    models.Index(
+                        fields=["warehouse", "product_variant", "-last_movement_id"],
+                        name="warehouses__warehou_5f15d1_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            record_opening_balances,
+            migrations.RunPython.noop,
+        ),
+    ]
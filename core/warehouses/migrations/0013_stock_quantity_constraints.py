@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+        ("warehouses", "0012_stockmovement_stocksnapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="stock",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("quantity__gte", 0)),
+                name="warehouses_stock_quantity_non_negative",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stocktransfer",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("quantity__gt", 0)),
+                name="warehouses_stocktransfer_quantity_positive",
+            ),
+        ),
+    ]
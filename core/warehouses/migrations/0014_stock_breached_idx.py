@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+        ("warehouses", "0013_stock_quantity_constraints"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stock",
+            index=models.Index(
+                condition=models.Q(("quantity__lte", models.F("low_stock_threshold"))),
+                fields=["warehouse", "product_variant"],
+                name="warehouses_stock_breached_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:16
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_alerts_notified(apps, schema_editor):
+    """
+    Treat every existing alert as already emailed so digests skip them.
+    """
+    StockAlert = apps.get_model("warehouses", "StockAlert")
+    StockAlert.objects.update(notified_at=F("created"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouses", "0014_stock_breached_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stockalert",
+            name="notified_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the warehouse managers were emailed about this alert.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(
+            mark_existing_alerts_notified,
+            migrations.RunPython.noop,
+        ),
+    ]
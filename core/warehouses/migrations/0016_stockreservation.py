@@ -0,0 +1,119 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+        ("warehouses", "0015_stockalert_notified_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stock",
+            name="reserved_quantity",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="The quantity held by active reservations.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="stockmovement",
+            name="movement_type",
+            field=models.CharField(
+                choices=[
+                    ("RECEIPT", "Receipt"),
+                    ("TRANSFER_IN", "Transfer In"),
+                    ("TRANSFER_OUT", "Transfer Out"),
+                    ("ADJUSTMENT", "Adjustment"),
+                    ("AUDIT_CORRECTION", "Audit Correction"),
+                    ("FULFILLMENT", "Fulfillment"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        help_text="Reference of the order holding the stock.",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVE", "Active"),
+                            ("RELEASED", "Released"),
+                            ("CONSUMED", "Consumed"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        default="ACTIVE",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        help_text="When the hold lapses if it is neither consumed nor released."
+                    ),
+                ),
+                ("updated", models.DateTimeField(auto_now=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "product_variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="products.productvariant",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="warehouses.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created",),
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "ACTIVE")),
+                        fields=["expires_at"],
+                        name="warehouses_reservation_due_idx",
+                    )
+                ],
+            },
+        ),
+    ]
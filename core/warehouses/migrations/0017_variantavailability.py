@@ -0,0 +1,96 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_variant_availability(apps, schema_editor):
+    """
+    Materialize the current availability of every stocked product variant.
+    """
+    Stock = apps.get_model("warehouses", "Stock")
+    StockMovement = apps.get_model("warehouses", "StockMovement")
+    VariantAvailability = apps.get_model("warehouses", "VariantAvailability")
+
+    last_movements = dict(
+        StockMovement.objects.values("product_variant_id")
+        .annotate(last_movement_at=Max("created"))
+        .order_by()
+        .values_list("product_variant_id", "last_movement_at")
+    )
+
+    VariantAvailability.objects.bulk_create(
+        [
+            VariantAvailability(
+                product_variant_id=row["product_variant_id"],
+                total_on_hand=row["total"] or 0,
+                warehouses_stocked=row["stocked"],
+                last_movement_at=last_movements.get(row["product_variant_id"]),
+            )
+            for row in Stock.objects.values("product_variant_id")
+            .annotate(
+                total=Sum("quantity"),
+                stocked=Count("id", filter=Q(quantity__gt=0)),
+            )
+            .order_by()
+            .iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_alter_product_tags"),
+        ("warehouses", "0016_stockreservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VariantAvailability",
+            fields=[
+                (
+                    "product_variant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="products.productvariant",
+                    ),
+                ),
+                (
+                    "total_on_hand",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        default=0,
+                        help_text="The stock held across all warehouses.",
+                    ),
+                ),
+                (
+                    "warehouses_stocked",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="The number of warehouses holding any stock.",
+                    ),
+                ),
+                (
+                    "last_movement_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the stock of the variant last changed.",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Variant availabilities",
+            },
+        ),
+        migrations.RunPython(
+            backfill_variant_availability,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+
+def backfill_warehouse_valuations(apps, schema_editor):
+    """
+    Value the current stock of every warehouse.
+    """
+    Stock = apps.get_model("warehouses", "Stock")
+    Warehouse = apps.get_model("warehouses", "Warehouse")
+    WarehouseValuation = apps.get_model("warehouses", "WarehouseValuation")
+
+    totals = dict(
+        Stock.objects.values("warehouse_id")
+        .annotate(
+            total=Sum(
+                ExpressionWrapper(
+                    F("quantity") * F("product_variant__price"),
+                    output_field=DecimalField(max_digits=16, decimal_places=2),
+                )
+            )
+        )
+        .order_by()
+        .values_list("warehouse_id", "total")
+    )
+
+    WarehouseValuation.objects.bulk_create(
+        [
+            WarehouseValuation(
+                warehouse_id=warehouse_id,
+                total_value=totals.get(warehouse_id) or 0,
+            )
+            for warehouse_id in Warehouse.objects.values_list("pk", flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouses", "0017_variantavailability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WarehouseValuation",
+            fields=[
+                (
+                    "warehouse",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="valuation",
+                        serialize=False,
+                        to="warehouses.warehouse",
+                    ),
+                ),
+                (
+                    "total_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="The sum of quantity times price over the warehouse stock.",
+                        max_digits=16,
+                    ),
+                ),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            backfill_warehouse_valuations,
+            migrations.RunPython.noop,
+        ),
+    ]
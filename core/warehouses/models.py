@@ -161,6 +161,11 @@ class Stock(models.Model):
         related_name="stocks",
     )
     quantity = models.PositiveIntegerField(default=0)
+    reserved_quantity = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="The quantity held by active reservations.",
+    )
     low_stock_threshold = models.PositiveIntegerField(
         default=10,
         help_text="When the stock quantity is below this value, the warehouse will be notified.",
@@ -168,6 +173,19 @@ class Stock(models.Model):
 
     class Meta:
         unique_together = ("warehouse", "product_variant")
+        indexes = [
+            models.Index(
+                fields=["warehouse", "product_variant"],
+                condition=models.Q(quantity__lte=models.F("low_stock_threshold")),
+                name="warehouses_stock_breached_idx",
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(quantity__gte=0),
+                name="warehouses_stock_quantity_non_negative",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -180,31 +198,17 @@ class Stock(models.Model):
         """
         return f"{self.product_variant} - {self.quantity} in {self.warehouse}"
 
-    def save(self, *args, **kwargs):
+    @property
+    def available_quantity(self):
         """
-        Override save method to check for low stock and trigger alerts.
+        Return the quantity that is not held by active reservations.
 
-        Parameters
-        ----------
-        *args : tuple
-            The positional arguments.
-        **kwargs : dict
-            The keyword arguments.
+        Returns
+        -------
+        int
+            The available-to-promise quantity.
         """
-        super().save(*args, **kwargs)
-
-        if self.quantity <= self.low_stock_threshold:
-            # Check if an active alert already exists
-            active_alert = StockAlert.objects.filter(stock=self, is_active=True).first()
-
-            if active_alert:
-                return
-
-            # Trigger low stock alert
-            StockAlert.objects.create(
-                stock=self,
-                alert_type="LOW_STOCK" if self.quantity > 0 else "OUT_OF_STOCK",
-            )
+        return self.quantity - self.reserved_quantity
 
 
 class StockAlert(models.Model):
@@ -228,6 +232,11 @@ class StockAlert(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True, editable=False)
     is_active = models.BooleanField(default=True)
+    notified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the warehouse managers were emailed about this alert.",
+    )
 
     def __str__(self):
         """
@@ -282,6 +291,12 @@ class StockTransfer(models.Model):
 
     class Meta:
         ordering = ("-created",)
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(quantity__gt=0),
+                name="warehouses_stocktransfer_quantity_positive",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -298,12 +313,17 @@ class StockTransfer(models.Model):
             f"from {self.from_warehouse} to {self.to_warehouse}."
         )
 
-    def clean(self):
+    def validate_transfer(self):
         """
         Ensure that `from_warehouse` and `to_warehouse` are different,
-        and validate stock availability.
+        and that a positive quantity is transferred.
+
+        Raises
+        ------
+        ValidationError
+            If the transfer is not valid.
         """
-        if self.from_warehouse == self.to_warehouse:
+        if self.from_warehouse_id == self.to_warehouse_id:
             raise ValidationError(
                 {
                     "to_warehouse": (
@@ -318,6 +338,13 @@ class StockTransfer(models.Model):
                 {"quantity": "Transfer quantity must be greater than zero."}
             )
 
+    def clean(self):
+        """
+        Ensure that `from_warehouse` and `to_warehouse` are different,
+        and validate stock availability.
+        """
+        self.validate_transfer()
+
         # Check available stock
         from_stock = Stock.objects.filter(
             warehouse=self.from_warehouse,
@@ -331,7 +358,11 @@ class StockTransfer(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Override save to ensure stock modification is done safely.
+        Override save to move the stock atomically along with the transfer.
+
+        Stock is only moved when the transfer is created. Availability is
+        enforced by the conditional update itself, so no separate read or
+        row lock is needed.
 
         Parameters
         ----------
@@ -340,40 +371,17 @@ class StockTransfer(models.Model):
         **kwargs : dict
             The keyword arguments.
         """
-        self.clean()
+        from .services import transfer_stock
 
-        with transaction.atomic():
-            # Lock stock row for update to prevent race conditions
-            from_stock = (
-                Stock.objects.select_for_update()
-                .filter(
-                    warehouse=self.from_warehouse,
-                    product_variant=self.product_variant,
-                )
-                .first()
-            )
-
-            if (
-                not from_stock or from_stock.quantity < self.quantity
-            ):  # pragma: no cover
-                raise ValidationError(
-                    {
-                        "quantity": "Insufficient stock in the source warehouse.",
-                    }
-                )
-
-            from_stock.quantity -= self.quantity
-            from_stock.save()
-
-            to_stock, _ = Stock.objects.select_for_update().get_or_create(
-                warehouse=self.to_warehouse,
-                product_variant=self.product_variant,
-            )
-            to_stock.quantity += self.quantity
-            to_stock.save()
+        self.validate_transfer()
+        adding = self._state.adding
 
+        with transaction.atomic():
             super().save(*args, **kwargs)
 
+            if adding:
+                transfer_stock(self)
+
 
 class StockAudit(models.Model):
     """
@@ -476,7 +484,7 @@ class StockAdjustment(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Adjust the product variant's stock quantity before saving.
+        Adjust the product variant's stock quantity when the adjustment is created.
 
         Parameters
         ----------
@@ -485,21 +493,15 @@ class StockAdjustment(models.Model):
         **kwargs : dict
             The keyword arguments.
         """
-        with transaction.atomic():
-            inventory = Stock.objects.get(
-                warehouse=self.warehouse,
-                product_variant=self.product_variant,
-            )
-            inventory.quantity += self.adjustment_quantity
-            inventory.save()
+        from .services import adjust_stock
 
-        if (
-            self.adjustment_quantity < 0
-            and abs(self.adjustment_quantity) > self.stock.quantity
-        ):
-            raise ValidationError("Insufficient stock for adjustment.")
+        adding = self._state.adding
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if adding:
+                adjust_stock(self)
 
     def __str__(self):
         """
@@ -514,3 +516,303 @@ class StockAdjustment(models.Model):
             f"Adjustment of {self.adjustment_quantity} for "
             f"{self.product_variant} in {self.warehouse}"
         )
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger entry recording a single change to a stock balance.
+    """
+
+    MOVEMENT_TYPES = [
+        ("RECEIPT", "Receipt"),
+        ("TRANSFER_IN", "Transfer In"),
+        ("TRANSFER_OUT", "Transfer Out"),
+        ("ADJUSTMENT", "Adjustment"),
+        ("AUDIT_CORRECTION", "Audit Correction"),
+        ("FULFILLMENT", "Fulfillment"),
+    ]
+
+    class MovementTypes:
+        """
+        Provide a class-based interface for movement types.
+        """
+
+        RECEIPT = "RECEIPT"
+        TRANSFER_IN = "TRANSFER_IN"
+        TRANSFER_OUT = "TRANSFER_OUT"
+        ADJUSTMENT = "ADJUSTMENT"
+        AUDIT_CORRECTION = "AUDIT_CORRECTION"
+        FULFILLMENT = "FULFILLMENT"
+
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.CASCADE,
+        related_name="stock_movements",
+    )
+    product_variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name="stock_movements",
+    )
+    movement_type = models.CharField(
+        max_length=20,
+        choices=MOVEMENT_TYPES,
+    )
+    quantity = models.IntegerField(
+        help_text="Signed change in stock. Positive adds stock, negative removes it.",
+    )
+    reference = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Reference of the transfer, adjustment or receipt behind the movement.",
+    )
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["warehouse", "product_variant", "created"]),
+        ]
+
+    def __str__(self):
+        """
+        Return a string representation of the stock movement.
+
+        Returns
+        -------
+        str
+            The string representation.
+        """
+        return (
+            f"{self.get_movement_type_display()} of {self.quantity} for "
+            f"{self.product_variant} in {self.warehouse}"
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Insert the movement, refusing to rewrite an existing ledger entry.
+
+        Parameters
+        ----------
+        *args : tuple
+            The positional arguments.
+        **kwargs : dict
+            The keyword arguments.
+        """
+        if not self._state.adding:
+            raise ValidationError("Stock movements are append-only.")
+
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Refuse to delete a ledger entry.
+
+        Parameters
+        ----------
+        *args : tuple
+            The positional arguments.
+        **kwargs : dict
+            The keyword arguments.
+        """
+        raise ValidationError("Stock movements are append-only.")
+
+
+class StockSnapshot(models.Model):
+    """
+    Stores the compacted balance of a stock record up to a ledger position.
+    """
+
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+    )
+    product_variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+    )
+    quantity = models.IntegerField(
+        help_text="The balance after applying every movement up to `last_movement_id`.",
+    )
+    last_movement_id = models.PositiveBigIntegerField(
+        help_text="Id of the last ledger movement folded into this snapshot.",
+    )
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        ordering = ("-last_movement_id",)
+        indexes = [
+            models.Index(
+                fields=["warehouse", "product_variant", "-last_movement_id"],
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Return a string representation of the stock snapshot.
+
+        Returns
+        -------
+        str
+            The string representation.
+        """
+        return (
+            f"Snapshot of {self.product_variant} in {self.warehouse} "
+            f"at movement {self.last_movement_id}: {self.quantity}"
+        )
+
+
+class StockReservation(models.Model):
+    """
+    Holds stock of a product variant in a warehouse for an in-flight order.
+    """
+
+    STATUS_CHOICES = [
+        ("ACTIVE", "Active"),
+        ("RELEASED", "Released"),
+        ("CONSUMED", "Consumed"),
+        ("EXPIRED", "Expired"),
+    ]
+
+    class StatusChoices:
+        """
+        Provide a class-based interface for status choices.
+        """
+
+        ACTIVE = "ACTIVE"
+        RELEASED = "RELEASED"
+        CONSUMED = "CONSUMED"
+        EXPIRED = "EXPIRED"
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations",
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations",
+    )
+    product_variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations",
+    )
+    quantity = models.PositiveIntegerField()
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Reference of the order holding the stock.",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="ACTIVE",
+    )
+    expires_at = models.DateTimeField(
+        help_text="When the hold lapses if it is neither consumed nor released.",
+    )
+    updated = models.DateTimeField(auto_now=True, editable=False)
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        ordering = ("-created",)
+        indexes = [
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(status="ACTIVE"),
+                name="warehouses_reservation_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Return a string representation of the stock reservation.
+
+        Returns
+        -------
+        str
+            The string representation.
+        """
+        return (
+            f"Reservation of {self.quantity} {self.product_variant} "
+            f"in {self.warehouse} ({self.get_status_display()})"
+        )
+
+
+class VariantAvailability(models.Model):
+    """
+    Maintains the on-hand stock of a product variant across all warehouses.
+    """
+
+    product_variant = models.OneToOneField(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="availability",
+    )
+    total_on_hand = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        help_text="The stock held across all warehouses.",
+    )
+    warehouses_stocked = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of warehouses holding any stock.",
+    )
+    last_movement_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the stock of the variant last changed.",
+    )
+
+    class Meta:
+        verbose_name_plural = "Variant availabilities"
+
+    def __str__(self):
+        """
+        Return a string representation of the variant availability.
+
+        Returns
+        -------
+        str
+            The string representation.
+        """
+        return (
+            f"{self.product_variant} - {self.total_on_hand} in "
+            f"{self.warehouses_stocked} warehouses"
+        )
+
+
+class WarehouseValuation(models.Model):
+    """
+    Maintains the value of the stock held in a warehouse at current prices.
+    """
+
+    warehouse = models.OneToOneField(
+        Warehouse,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="valuation",
+    )
+    total_value = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        help_text="The sum of quantity times price over the warehouse stock.",
+    )
+    updated = models.DateTimeField(auto_now=True, editable=False)
+
+    def __str__(self):
+        """
+        Return a string representation of the warehouse valuation.
+
+        Returns
+        -------
+        str
+            The string representation.
+        """
+        return f"{self.warehouse} - {self.total_value}"
@@ -2,19 +2,24 @@
 Serializer definitions for the `Warehouses` app.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 
 from core.custom_user.models import User
 from core.products.models import ProductVariant
 
+from .imports import IMPORT_FORMATS
 from .models import (
     Stock,
     StockAdjustment,
     StockAlert,
     StockAudit,
+    StockMovement,
+    StockReservation,
     StockTransfer,
     Warehouse,
     WarehouseUser,
+    WarehouseValuation,
 )
 
 
@@ -35,6 +40,9 @@ class WarehouseSerializer(serializers.ModelSerializer):
         """
         Return the number of stock items associated with this warehouse.
 
+        Reads the `stock_count` annotation of `WarehouseViewSet` and only
+        counts the stock of warehouses that were not loaded through it.
+
         Parameters
         ----------
         obj : Warehouse
@@ -45,6 +53,9 @@ class WarehouseSerializer(serializers.ModelSerializer):
         int
             The number of stock items.
         """
+        if hasattr(obj, "stock_count"):
+            return obj.stock_count
+
         return obj.stocks.count()
 
     def get_user_roles(self, obj):
@@ -98,6 +109,7 @@ class StockSerializer(serializers.ModelSerializer):
     product_variant = serializers.PrimaryKeyRelatedField(
         queryset=ProductVariant.objects.all()
     )
+    available_quantity = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Stock
@@ -132,6 +144,29 @@ class StockTransferSerializer(serializers.ModelSerializer):
         }
 
 
+class BulkStockTransferLineSerializer(serializers.Serializer):
+    """
+    Serializer for a single line of a bulk stock transfer.
+    """
+
+    product_variant = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class BulkStockTransferSerializer(serializers.Serializer):
+    """
+    Serializer for moving many product variants between two warehouses.
+    """
+
+    from_warehouse = serializers.PrimaryKeyRelatedField(
+        queryset=Warehouse.objects.all()
+    )
+    to_warehouse = serializers.PrimaryKeyRelatedField(
+        queryset=Warehouse.objects.all(),
+    )
+    lines = BulkStockTransferLineSerializer(many=True, allow_empty=False)
+
+
 class StockAlertSerializer(serializers.ModelSerializer):
     """
     Serializer for the StockAlert model.
@@ -152,6 +187,62 @@ class StockAuditSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class StockAlertSweepSerializer(serializers.Serializer):
+    """
+    Serializer for the stock records a low stock alert sweep checks.
+    """
+
+    stock_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_null=True,
+        help_text="The stock records to check. Checks every record when omitted.",
+    )
+
+
+class StockAuditImportSerializer(serializers.Serializer):
+    """
+    Serializer for uploading the stock count of a whole warehouse.
+    """
+
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all())
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=IMPORT_FORMATS, required=False)
+    apply_adjustments = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        """
+        Infer the format of the file from its extension when not given.
+
+        Parameters
+        ----------
+        attrs : dict
+            The validated data.
+
+        Returns
+        -------
+        dict
+            The validated data with a `file_format`.
+
+        Raises
+        ------
+        serializers.ValidationError
+            If the format is not given and cannot be inferred.
+        """
+        if "file_format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            formats = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}
+
+            if extension not in formats:
+                raise serializers.ValidationError(
+                    {"file_format": "Please provide the format of the file."}
+                )
+
+            attrs["file_format"] = formats[extension]
+
+        return attrs
+
+
 class StockAdjustmentSerializer(serializers.ModelSerializer):
     """
     Serializer for the StockAdjustment model.
@@ -160,3 +251,54 @@ class StockAdjustmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = StockAdjustment
         fields = "__all__"
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the StockMovement model.
+    """
+
+    class Meta:
+        model = StockMovement
+        fields = "__all__"
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the StockReservation model.
+    """
+
+    author = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(),
+        required=False,
+        write_only=True,
+    )
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all())
+    product_variant = serializers.PrimaryKeyRelatedField(
+        queryset=ProductVariant.objects.all()
+    )
+    quantity = serializers.IntegerField(min_value=1)
+    ttl = serializers.IntegerField(
+        min_value=1,
+        default=settings.STOCK_RESERVATION_TTL,
+        write_only=True,
+        help_text="Seconds until the hold lapses.",
+    )
+
+    class Meta:
+        model = StockReservation
+        fields = "__all__"
+        extra_kwargs = {
+            "status": {"read_only": True},
+            "expires_at": {"read_only": True},
+        }
+
+
+class WarehouseValuationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the WarehouseValuation model.
+    """
+
+    class Meta:
+        model = WarehouseValuation
+        fields = "__all__"
@@ -0,0 +1,1196 @@
+"""
+Services operating on stock balances and the stock movement ledger.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.products.caching import invalidate_models
+from core.products.models import ProductVariant
+
+from .models import (
+    Stock,
+    StockAdjustment,
+    StockAlert,
+    StockAudit,
+    StockMovement,
+    StockReservation,
+    StockSnapshot,
+    StockTransfer,
+    VariantAvailability,
+    Warehouse,
+    WarehouseValuation,
+)
+
+VALUE_FIELD = DecimalField(max_digits=16, decimal_places=2)
+
+
+def record_movement(stock, quantity, movement_type, reference=""):
+    """
+    Record a direct change to a stock record in the movement ledger and in
+    the warehouse valuation.
+
+    Stock written through the other services is valued by them, so this is
+    only needed for changes saved on the stock record itself.
+
+    Parameters
+    ----------
+    stock : Stock
+        The stock record that changed.
+    quantity : int
+        The signed change in quantity.
+    movement_type : str
+        One of `StockMovement.MovementTypes`.
+    reference : str, optional
+        A reference for the change, e.g. a delivery note number.
+
+    Returns
+    -------
+    StockMovement or None
+        The recorded movement, or `None` when the quantity is zero.
+    """
+    if not quantity:
+        return None
+
+    shift_warehouse_valuations(
+        [(stock.warehouse_id, stock.product_variant_id, quantity)]
+    )
+
+    return StockMovement.objects.create(
+        warehouse_id=stock.warehouse_id,
+        product_variant_id=stock.product_variant_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        reference=reference,
+    )
+
+
+def compact_stock_ledger(settle_seconds=60):
+    """
+    Fold new ledger movements into a fresh snapshot per stock record.
+
+    Only movements older than `settle_seconds` are compacted so that rows
+    from transactions that are still in flight are never skipped.
+
+    Parameters
+    ----------
+    settle_seconds : int, optional
+        Minimum age of a movement before it is folded into a snapshot.
+
+    Returns
+    -------
+    int
+        The number of snapshots written.
+    """
+    previous = (
+        StockSnapshot.objects.aggregate(watermark=Max("last_movement_id"))["watermark"]
+        or 0
+    )
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+    watermark = StockMovement.objects.filter(
+        id__gt=previous,
+        created__lte=cutoff,
+    ).aggregate(watermark=Max("id"))["watermark"]
+
+    if watermark is None:
+        return 0
+
+    latest_snapshot = StockSnapshot.objects.filter(
+        warehouse_id=OuterRef("warehouse_id"),
+        product_variant_id=OuterRef("product_variant_id"),
+    ).order_by("-last_movement_id")
+
+    balances = (
+        StockMovement.objects.filter(id__gt=previous, id__lte=watermark)
+        .values("warehouse_id", "product_variant_id")
+        .annotate(
+            delta=Sum("quantity"),
+            opening=Coalesce(
+                Subquery(latest_snapshot.values("quantity")[:1]),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by()
+    )
+
+    snapshots = StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(
+                warehouse_id=balance["warehouse_id"],
+                product_variant_id=balance["product_variant_id"],
+                quantity=balance["opening"] + balance["delta"],
+                last_movement_id=watermark,
+            )
+            for balance in balances
+        ]
+    )
+
+    return len(snapshots)
+
+
+def get_stock_balance_at(warehouse, product_variant, at):
+    """
+    Return the stock balance of a product variant in a warehouse at a point in time.
+
+    The balance starts from the latest snapshot taken before `at` and only
+    replays the ledger movements recorded after it.
+
+    Parameters
+    ----------
+    warehouse : Warehouse
+        The warehouse holding the stock.
+    product_variant : ProductVariant
+        The product variant being stocked.
+    at : datetime
+        The point in time to compute the balance for.
+
+    Returns
+    -------
+    int
+        The stock balance at `at`.
+    """
+    snapshot = (
+        StockSnapshot.objects.filter(
+            warehouse=warehouse,
+            product_variant=product_variant,
+            created__lte=at,
+        )
+        .order_by("-last_movement_id")
+        .first()
+    )
+
+    movements = StockMovement.objects.filter(
+        warehouse=warehouse,
+        product_variant=product_variant,
+        created__lte=at,
+    )
+    opening = 0
+
+    if snapshot:
+        opening = snapshot.quantity
+        movements = movements.filter(id__gt=snapshot.last_movement_id)
+
+    return opening + (movements.aggregate(total=Sum("quantity"))["total"] or 0)
+
+
+def sweep_low_stock_alerts(stock_ids=None):
+    """
+    Create alerts for breached stock records and resolve recovered ones.
+
+    Breached records are found with a single query backed by the partial
+    index on `quantity <= low_stock_threshold`, and the missing alerts are
+    written with one `bulk_create`.
+
+    Parameters
+    ----------
+    stock_ids : list[int], optional
+        Restrict the sweep to these stock records. Sweeps every record
+        when omitted.
+
+    Returns
+    -------
+    list[StockAlert]
+        The alerts that were created.
+    """
+    stocks = Stock.objects.all()
+
+    if stock_ids is not None:
+        stocks = stocks.filter(id__in=stock_ids)
+
+    StockAlert.objects.filter(
+        is_active=True,
+        stock__in=stocks.filter(quantity__gt=F("low_stock_threshold")),
+    ).update(is_active=False)
+
+    breached = stocks.filter(quantity__lte=F("low_stock_threshold")).exclude(
+        Exists(StockAlert.objects.filter(stock=OuterRef("pk"), is_active=True))
+    )
+
+    return StockAlert.objects.bulk_create(
+        [
+            StockAlert(
+                stock_id=stock_id,
+                alert_type="LOW_STOCK" if quantity > 0 else "OUT_OF_STOCK",
+            )
+            for stock_id, quantity in breached.values_list("id", "quantity")
+        ]
+    )
+
+
+def refresh_variant_availability(product_variant_ids):
+    """
+    Recompute the cross-warehouse availability of the given product variants.
+
+    Only the stock rows of the changed variants are aggregated, so the cost
+    is bounded by the number of warehouses rather than the catalog size.
+
+    Parameters
+    ----------
+    product_variant_ids : list[int]
+        The ids of the product variants whose stock changed.
+    """
+    totals = (
+        Stock.objects.filter(product_variant_id__in=product_variant_ids)
+        .values("product_variant_id")
+        .annotate(
+            total=Sum("quantity"),
+            stocked=Count("id", filter=Q(quantity__gt=0)),
+        )
+        .order_by()
+    )
+    totals = {row["product_variant_id"]: row for row in totals}
+    now = timezone.now()
+
+    VariantAvailability.objects.bulk_create(
+        [
+            VariantAvailability(
+                product_variant_id=product_variant_id,
+                total_on_hand=totals.get(product_variant_id, {}).get("total", 0),
+                warehouses_stocked=totals.get(product_variant_id, {}).get("stocked", 0),
+                last_movement_at=now,
+            )
+            for product_variant_id in set(product_variant_ids)
+        ],
+        update_conflicts=True,
+        unique_fields=["product_variant"],
+        update_fields=["total_on_hand", "warehouses_stocked", "last_movement_at"],
+    )
+    invalidate_models(VariantAvailability)
+
+
+def shift_warehouse_valuations(changes):
+    """
+    Apply stock quantity changes to the maintained warehouse valuations.
+
+    The changes are priced in one query and folded into a single update,
+    so the cost does not depend on how much stock the warehouses hold.
+
+    Parameters
+    ----------
+    changes : iterable of tuple
+        `(warehouse_id, product_variant_id, quantity)` triples, where the
+        quantity is the signed change applied to the stock record.
+    """
+    changes = [change for change in changes if change[2]]
+
+    if not changes:
+        return
+
+    prices = dict(
+        ProductVariant.objects.filter(
+            pk__in={product_variant_id for _, product_variant_id, _ in changes}
+        ).values_list("pk", "price")
+    )
+    deltas = defaultdict(Decimal)
+
+    for warehouse_id, product_variant_id, quantity in changes:
+        deltas[warehouse_id] += prices[product_variant_id] * quantity
+
+    _apply_valuation_deltas(deltas)
+
+
+def _apply_valuation_deltas(deltas):
+    """
+    Add value deltas to the warehouse valuations in a single update.
+
+    Parameters
+    ----------
+    deltas : dict
+        The value to add to each warehouse, keyed by warehouse id.
+    """
+    WarehouseValuation.objects.bulk_create(
+        [WarehouseValuation(warehouse_id=warehouse_id) for warehouse_id in deltas],
+        ignore_conflicts=True,
+    )
+    WarehouseValuation.objects.filter(warehouse_id__in=deltas).update(
+        total_value=F("total_value")
+        + Case(
+            *[
+                When(warehouse_id=warehouse_id, then=Value(delta))
+                for warehouse_id, delta in deltas.items()
+            ],
+            output_field=VALUE_FIELD,
+        ),
+        updated=timezone.now(),
+    )
+
+
+def revalue_product_variant(product_variant_id, price_delta):
+    """
+    Apply a price change of a product variant to the warehouse valuations.
+
+    Parameters
+    ----------
+    product_variant_id : int
+        The id of the repriced product variant.
+    price_delta : Decimal
+        The new price minus the previous price.
+    """
+    if not price_delta:
+        return
+
+    stocks = Stock.objects.filter(product_variant_id=product_variant_id)
+    quantity = stocks.filter(warehouse_id=OuterRef("warehouse_id")).values("quantity")[
+        :1
+    ]
+
+    WarehouseValuation.objects.filter(
+        warehouse_id__in=stocks.filter(quantity__gt=0).values("warehouse_id")
+    ).update(
+        total_value=F("total_value")
+        + ExpressionWrapper(
+            Subquery(quantity) * Value(price_delta),
+            output_field=VALUE_FIELD,
+        ),
+        updated=timezone.now(),
+    )
+
+
+def revalue_product_variants(price_deltas):
+    """
+    Apply the price changes of many product variants to the warehouse
+    valuations.
+
+    The stock of the variants is read in one query and the changes are
+    folded into a single update.
+
+    Parameters
+    ----------
+    price_deltas : dict
+        The new price minus the previous price, keyed by product variant id.
+    """
+    price_deltas = {pk: delta for pk, delta in price_deltas.items() if delta}
+
+    if not price_deltas:
+        return
+
+    deltas = defaultdict(Decimal)
+
+    for warehouse_id, product_variant_id, quantity in (
+        Stock.objects.filter(product_variant_id__in=price_deltas)
+        .exclude(quantity=0)
+        .values_list("warehouse_id", "product_variant_id", "quantity")
+    ):
+        deltas[warehouse_id] += price_deltas[product_variant_id] * quantity
+
+    if deltas:
+        _apply_valuation_deltas(deltas)
+
+
+def recompute_warehouse_valuations(warehouse_ids=None):
+    """
+    Recompute the valuations of the given warehouses from their stock.
+
+    Parameters
+    ----------
+    warehouse_ids : list[int], optional
+        Restrict the recompute to these warehouses. Recomputes every
+        warehouse when omitted.
+
+    Returns
+    -------
+    int
+        The number of valuations written.
+    """
+    warehouses = Warehouse.objects.all()
+
+    if warehouse_ids is not None:
+        warehouses = warehouses.filter(pk__in=warehouse_ids)
+
+    totals = dict(
+        Stock.objects.filter(warehouse__in=warehouses)
+        .values("warehouse_id")
+        .annotate(
+            total=Sum(
+                ExpressionWrapper(
+                    F("quantity") * F("product_variant__price"),
+                    output_field=VALUE_FIELD,
+                )
+            )
+        )
+        .order_by()
+        .values_list("warehouse_id", "total")
+    )
+
+    valuations = WarehouseValuation.objects.bulk_create(
+        [
+            WarehouseValuation(
+                warehouse_id=warehouse_id,
+                total_value=totals.get(warehouse_id) or 0,
+            )
+            for warehouse_id in warehouses.values_list("pk", flat=True)
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["warehouse"],
+        update_fields=["total_value", "updated"],
+    )
+
+    return len(valuations)
+
+
+def schedule_low_stock_sweep(stock_ids):
+    """
+    Enqueue a low stock alert sweep for the given records once the
+    current transaction commits.
+
+    Parameters
+    ----------
+    stock_ids : iterable of int
+        The ids of the stock records whose quantity decreased. Querysets
+        are only evaluated after the commit, outside of the write path.
+    """
+    from .tasks import sweep_low_stock_alerts_task
+
+    transaction.on_commit(
+        lambda: sweep_low_stock_alerts_task.delay(stock_ids=list(stock_ids))
+    )
+
+
+def add_stock(warehouse_id, product_variant_id, quantity):
+    """
+    Atomically add stock, creating the stock record if it does not exist yet.
+
+    Parameters
+    ----------
+    warehouse_id : int
+        The id of the warehouse receiving the stock.
+    product_variant_id : int
+        The id of the product variant being stocked.
+    quantity : int
+        The quantity to add.
+    """
+    stocks = Stock.objects.filter(
+        warehouse_id=warehouse_id,
+        product_variant_id=product_variant_id,
+    )
+
+    if stocks.update(quantity=F("quantity") + quantity):
+        return
+
+    try:
+        with transaction.atomic():
+            Stock.objects.bulk_create(
+                [
+                    Stock(
+                        warehouse_id=warehouse_id,
+                        product_variant_id=product_variant_id,
+                        quantity=quantity,
+                    )
+                ]
+            )
+    except IntegrityError:  # pragma: no cover
+        # Another transaction created the record first
+        stocks.update(quantity=F("quantity") + quantity)
+
+
+def remove_stock(warehouse_id, product_variant_id, quantity, keep_reserved=True):
+    """
+    Atomically remove stock if, and only if, enough of it is available.
+
+    The check and the decrement happen in a single conditional `UPDATE`, so
+    no row has to be read or locked beforehand.
+
+    Parameters
+    ----------
+    warehouse_id : int
+        The id of the warehouse the stock leaves.
+    product_variant_id : int
+        The id of the product variant being removed.
+    quantity : int
+        The quantity to remove.
+    keep_reserved : bool, optional
+        Refuse to remove stock that is held by active reservations.
+
+    Raises
+    ------
+    ValidationError
+        If the warehouse does not hold enough stock.
+    """
+    required = F("reserved_quantity") + quantity if keep_reserved else quantity
+
+    if not Stock.objects.filter(
+        warehouse_id=warehouse_id,
+        product_variant_id=product_variant_id,
+        quantity__gte=required,
+    ).update(quantity=F("quantity") - quantity):
+        raise ValidationError({"quantity": "Insufficient stock in the warehouse."})
+
+    schedule_low_stock_sweep(
+        Stock.objects.filter(
+            warehouse_id=warehouse_id,
+            product_variant_id=product_variant_id,
+        ).values_list("id", flat=True)
+    )
+
+
+def apply_stock_change(
+    warehouse_id,
+    product_variant_id,
+    quantity,
+    movement_type,
+    reference="",
+    keep_reserved=True,
+):
+    """
+    Apply a signed change to a stock balance and record it in the ledger.
+
+    Parameters
+    ----------
+    warehouse_id : int
+        The id of the warehouse holding the stock.
+    product_variant_id : int
+        The id of the product variant being changed.
+    quantity : int
+        The signed change. Positive adds stock, negative removes it.
+    movement_type : str
+        One of `StockMovement.MovementTypes`.
+    reference : str, optional
+        A reference for the change recorded on the ledger movement.
+    keep_reserved : bool, optional
+        Refuse to remove stock that is held by active reservations.
+    """
+    if quantity < 0:
+        remove_stock(warehouse_id, product_variant_id, -quantity, keep_reserved)
+    elif quantity > 0:
+        add_stock(warehouse_id, product_variant_id, quantity)
+    else:
+        return
+
+    StockMovement.objects.create(
+        warehouse_id=warehouse_id,
+        product_variant_id=product_variant_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        reference=reference,
+    )
+
+
+def transfer_stock(transfer):
+    """
+    Move the stock of a single transfer between its two warehouses.
+
+    The two balance updates are issued in warehouse id order so that
+    transfers running in opposite directions lock rows in the same order.
+    Must be called inside a transaction.
+
+    Parameters
+    ----------
+    transfer : StockTransfer
+        The transfer to apply.
+    """
+    changes = sorted(
+        [
+            (
+                transfer.from_warehouse_id,
+                -transfer.quantity,
+                StockMovement.MovementTypes.TRANSFER_OUT,
+            ),
+            (
+                transfer.to_warehouse_id,
+                transfer.quantity,
+                StockMovement.MovementTypes.TRANSFER_IN,
+            ),
+        ]
+    )
+
+    for warehouse_id, quantity, movement_type in changes:
+        apply_stock_change(
+            warehouse_id,
+            transfer.product_variant_id,
+            quantity,
+            movement_type,
+            reference=str(transfer.reference_code),
+        )
+
+    shift_warehouse_valuations(
+        (warehouse_id, transfer.product_variant_id, quantity)
+        for warehouse_id, quantity, _ in changes
+    )
+    refresh_variant_availability([transfer.product_variant_id])
+
+
+def adjust_stock(adjustment):
+    """
+    Apply a manual stock adjustment to its stock record.
+
+    Damage and loss can remove reserved stock, so reservations are not
+    protected here. Must be called inside a transaction.
+
+    Parameters
+    ----------
+    adjustment : StockAdjustment
+        The adjustment to apply.
+    """
+    apply_stock_change(
+        adjustment.warehouse_id,
+        adjustment.product_variant_id,
+        adjustment.adjustment_quantity,
+        (
+            StockMovement.MovementTypes.AUDIT_CORRECTION
+            if adjustment.reason == "AUDIT_CORRECTION"
+            else StockMovement.MovementTypes.ADJUSTMENT
+        ),
+        reference=f"adjustment-{adjustment.pk}",
+        keep_reserved=False,
+    )
+    shift_warehouse_valuations(
+        [
+            (
+                adjustment.warehouse_id,
+                adjustment.product_variant_id,
+                adjustment.adjustment_quantity,
+            )
+        ]
+    )
+    refresh_variant_availability([adjustment.product_variant_id])
+
+
+def bulk_transfer_stock(author, from_warehouse, to_warehouse, lines):
+    """
+    Transfer many product variants between two warehouses in one transaction.
+
+    Every affected stock row is locked with a single `SELECT ... FOR UPDATE`
+    ordered by (warehouse, product variant), so concurrent transfers always
+    acquire locks in the same order and cannot deadlock each other.
+
+    Parameters
+    ----------
+    author : User
+        The user performing the transfer.
+    from_warehouse : Warehouse
+        The warehouse the stock leaves.
+    to_warehouse : Warehouse
+        The warehouse the stock arrives at.
+    lines : list[dict]
+        The transfer lines, each with a `product_variant` id and a `quantity`.
+
+    Returns
+    -------
+    list[StockTransfer]
+        The created stock transfers, one per product variant.
+
+    Raises
+    ------
+    ValidationError
+        If the warehouses are the same, a product variant does not exist,
+        or the source warehouse does not hold enough stock.
+    """
+    if from_warehouse.pk == to_warehouse.pk:
+        raise ValidationError(
+            {
+                "to_warehouse": (
+                    "Destination warehouse must be different from source warehouse."
+                )
+            }
+        )
+
+    quantities = defaultdict(int)
+
+    for line in lines:
+        if line["quantity"] <= 0:
+            raise ValidationError(
+                {"quantity": "Transfer quantity must be greater than zero."}
+            )
+        quantities[line["product_variant"]] += line["quantity"]
+
+    variant_ids = sorted(quantities)
+    missing = set(variant_ids) - set(
+        ProductVariant.objects.filter(id__in=variant_ids).values_list("id", flat=True)
+    )
+
+    if missing:
+        raise ValidationError(
+            {"product_variant": f"Unknown product variants: {sorted(missing)}."}
+        )
+
+    with transaction.atomic():
+        Stock.objects.bulk_create(
+            [
+                Stock(warehouse=to_warehouse, product_variant_id=variant_id)
+                for variant_id in variant_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+        stocks = {
+            (stock.warehouse_id, stock.product_variant_id): stock
+            for stock in Stock.objects.select_for_update()
+            .filter(
+                warehouse_id__in=[from_warehouse.pk, to_warehouse.pk],
+                product_variant_id__in=variant_ids,
+            )
+            .order_by("warehouse_id", "product_variant_id")
+        }
+
+        insufficient = [
+            variant_id
+            for variant_id in variant_ids
+            if (from_warehouse.pk, variant_id) not in stocks
+            or stocks[(from_warehouse.pk, variant_id)].available_quantity
+            < quantities[variant_id]
+        ]
+
+        if insufficient:
+            raise ValidationError(
+                {
+                    "quantity": (
+                        "Insufficient stock in the source warehouse for product "
+                        f"variants: {insufficient}."
+                    )
+                }
+            )
+
+        sources = []
+
+        for variant_id in variant_ids:
+            source = stocks[(from_warehouse.pk, variant_id)]
+            source.quantity -= quantities[variant_id]
+            stocks[(to_warehouse.pk, variant_id)].quantity += quantities[variant_id]
+            sources.append(source)
+
+        Stock.objects.bulk_update(list(stocks.values()), ["quantity"])
+
+        transfers = StockTransfer.objects.bulk_create(
+            [
+                StockTransfer(
+                    author=author,
+                    product_variant_id=variant_id,
+                    from_warehouse=from_warehouse,
+                    to_warehouse=to_warehouse,
+                    quantity=quantities[variant_id],
+                )
+                for variant_id in variant_ids
+            ]
+        )
+
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(
+                    warehouse=warehouse,
+                    product_variant_id=transfer.product_variant_id,
+                    movement_type=movement_type,
+                    quantity=sign * transfer.quantity,
+                    reference=str(transfer.reference_code),
+                )
+                for transfer in transfers
+                for warehouse, movement_type, sign in (
+                    (from_warehouse, StockMovement.MovementTypes.TRANSFER_OUT, -1),
+                    (to_warehouse, StockMovement.MovementTypes.TRANSFER_IN, 1),
+                )
+            ]
+        )
+
+        shift_warehouse_valuations(
+            (warehouse.pk, variant_id, sign * quantities[variant_id])
+            for variant_id in variant_ids
+            for warehouse, sign in ((from_warehouse, -1), (to_warehouse, 1))
+        )
+        refresh_variant_availability(variant_ids)
+        schedule_low_stock_sweep([source.pk for source in sources])
+
+    return transfers
+
+
+def import_stock_audit(author, warehouse, counts, apply_adjustments=False):
+    """
+    Record a whole cycle count of a warehouse in one transaction.
+
+    The recorded quantities of the counted product variants are read with
+    a single query and the discrepancies are computed in memory, so the
+    cost is a fixed number of batched statements regardless of the length
+    of the count. Only the stock of the counted variants is locked.
+    Lines counting the same product variant are summed.
+
+    Parameters
+    ----------
+    author : User
+        The user performing the audit.
+    warehouse : Warehouse
+        The warehouse that was counted.
+    counts : iterable of tuple
+        `(product_variant_id, counted_quantity)` pairs.
+    apply_adjustments : bool, optional
+        Correct the stock to the counted quantities with audit correction
+        adjustments.
+
+    Returns
+    -------
+    dict
+        The number of audits and adjustments created.
+
+    Raises
+    ------
+    ValidationError
+        If a product variant does not exist.
+    """
+    counted = defaultdict(int)
+
+    for product_variant_id, counted_quantity in counts:
+        counted[product_variant_id] += counted_quantity
+
+    with transaction.atomic():
+        stocks = Stock.objects.filter(
+            warehouse=warehouse, product_variant_id__in=list(counted)
+        )
+
+        if apply_adjustments:
+            stocks = stocks.select_for_update().order_by("product_variant_id")
+
+        stocks = {stock.product_variant_id: stock for stock in stocks}
+        recorded = {
+            product_variant_id: stock.quantity
+            for product_variant_id, stock in stocks.items()
+        }
+
+        unstocked = set(counted) - set(stocks)
+        missing = unstocked - set(
+            ProductVariant.objects.filter(id__in=unstocked).values_list("id", flat=True)
+        )
+
+        if missing:
+            raise ValidationError(
+                {"product_variant": f"Unknown product variants: {sorted(missing)}."}
+            )
+
+        audits = StockAudit.objects.bulk_create(
+            [
+                StockAudit(
+                    warehouse=warehouse,
+                    product_variant_id=product_variant_id,
+                    counted_quantity=counted_quantity,
+                    recorded_quantity=recorded.get(product_variant_id, 0),
+                    discrepancy=counted_quantity - recorded.get(product_variant_id, 0),
+                    created_by=author,
+                )
+                for product_variant_id, counted_quantity in sorted(counted.items())
+            ],
+            batch_size=1000,
+        )
+        discrepancies = [audit for audit in audits if audit.discrepancy]
+
+        if not apply_adjustments or not discrepancies:
+            return {"audits": len(audits), "adjustments": 0}
+
+        adjustments = StockAdjustment.objects.bulk_create(
+            [
+                StockAdjustment(
+                    warehouse=warehouse,
+                    product_variant_id=audit.product_variant_id,
+                    adjustment_quantity=audit.discrepancy,
+                    reason="AUDIT_CORRECTION",
+                    created_by=author,
+                )
+                for audit in discrepancies
+            ],
+            batch_size=1000,
+        )
+
+        Stock.objects.bulk_create(
+            [
+                Stock(
+                    warehouse=warehouse,
+                    product_variant_id=audit.product_variant_id,
+                    quantity=audit.counted_quantity,
+                )
+                for audit in discrepancies
+                if audit.product_variant_id not in stocks
+            ],
+            batch_size=1000,
+        )
+
+        updated = []
+
+        for audit in discrepancies:
+            if audit.product_variant_id in stocks:
+                stock = stocks[audit.product_variant_id]
+                stock.quantity = audit.counted_quantity
+                updated.append(stock)
+
+        Stock.objects.bulk_update(updated, ["quantity"], batch_size=1000)
+
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(
+                    warehouse=warehouse,
+                    product_variant_id=adjustment.product_variant_id,
+                    movement_type=StockMovement.MovementTypes.AUDIT_CORRECTION,
+                    quantity=adjustment.adjustment_quantity,
+                    reference=f"adjustment-{adjustment.pk}",
+                )
+                for adjustment in adjustments
+            ],
+            batch_size=1000,
+        )
+
+        variant_ids = [audit.product_variant_id for audit in discrepancies]
+
+        shift_warehouse_valuations(
+            (warehouse.pk, audit.product_variant_id, audit.discrepancy)
+            for audit in discrepancies
+        )
+        refresh_variant_availability(variant_ids)
+        schedule_low_stock_sweep(
+            [
+                stocks[audit.product_variant_id].pk
+                for audit in discrepancies
+                if audit.discrepancy < 0
+            ]
+        )
+
+    return {"audits": len(audits), "adjustments": len(adjustments)}
+
+
+def reserve_stock(
+    author, warehouse, product_variant, quantity, expires_at, reference=""
+):
+    """
+    Hold stock for an in-flight order until it expires.
+
+    The available quantity is checked and the reserved counter bumped in a
+    single conditional `UPDATE`, so the cost does not depend on how many
+    reservations are outstanding.
+
+    Parameters
+    ----------
+    author : User
+        The user placing the hold.
+    warehouse : Warehouse
+        The warehouse holding the stock.
+    product_variant : ProductVariant
+        The product variant to reserve.
+    quantity : int
+        The quantity to reserve.
+    expires_at : datetime
+        When the hold lapses if it was neither consumed nor released.
+    reference : str, optional
+        A reference for the hold, e.g. an order number.
+
+    Returns
+    -------
+    StockReservation
+        The created reservation.
+
+    Raises
+    ------
+    ValidationError
+        If not enough unreserved stock is available.
+    """
+    if quantity <= 0:
+        raise ValidationError(
+            {"quantity": "Reserved quantity must be greater than zero."}
+        )
+
+    with transaction.atomic():
+        if not Stock.objects.filter(
+            warehouse=warehouse,
+            product_variant=product_variant,
+            quantity__gte=F("reserved_quantity") + quantity,
+        ).update(reserved_quantity=F("reserved_quantity") + quantity):
+            raise ValidationError(
+                {"quantity": "Insufficient available stock in the warehouse."}
+            )
+
+        return StockReservation.objects.create(
+            author=author,
+            warehouse=warehouse,
+            product_variant=product_variant,
+            quantity=quantity,
+            expires_at=expires_at,
+            reference=reference,
+        )
+
+
+def _close_reservation(reservation, status):
+    """
+    Move an active reservation to a final status exactly once.
+
+    Parameters
+    ----------
+    reservation : StockReservation
+        The reservation to close.
+    status : str
+        One of `StockReservation.StatusChoices`.
+
+    Raises
+    ------
+    ValidationError
+        If the reservation is no longer active.
+    """
+    if not StockReservation.objects.filter(
+        pk=reservation.pk,
+        status=StockReservation.StatusChoices.ACTIVE,
+    ).update(status=status, updated=timezone.now()):
+        raise ValidationError({"status": "The reservation is no longer active."})
+
+    reservation.status = status
+
+
+def release_reservation(reservation):
+    """
+    Release a reservation, returning its quantity to the available stock.
+
+    Parameters
+    ----------
+    reservation : StockReservation
+        The reservation to release.
+    """
+    with transaction.atomic():
+        _close_reservation(reservation, StockReservation.StatusChoices.RELEASED)
+
+        Stock.objects.filter(
+            warehouse_id=reservation.warehouse_id,
+            product_variant_id=reservation.product_variant_id,
+        ).update(reserved_quantity=F("reserved_quantity") - reservation.quantity)
+
+
+def consume_reservation(reservation):
+    """
+    Fulfil a reservation, removing its quantity from stock.
+
+    Damage and loss adjustments can remove reserved stock, so the stock is
+    only decremented if it still holds the reserved quantity.
+
+    Parameters
+    ----------
+    reservation : StockReservation
+        The reservation to consume.
+
+    Raises
+    ------
+    ValidationError
+        If the reservation is no longer active, or the warehouse no longer
+        holds its quantity.
+    """
+    with transaction.atomic():
+        _close_reservation(reservation, StockReservation.StatusChoices.CONSUMED)
+
+        stocks = Stock.objects.filter(
+            warehouse_id=reservation.warehouse_id,
+            product_variant_id=reservation.product_variant_id,
+        )
+
+        if not stocks.filter(
+            quantity__gte=reservation.quantity,
+            reserved_quantity__gte=reservation.quantity,
+        ).update(
+            quantity=F("quantity") - reservation.quantity,
+            reserved_quantity=F("reserved_quantity") - reservation.quantity,
+        ):
+            # The status update is rolled back with the transaction.
+            reservation.status = StockReservation.StatusChoices.ACTIVE
+            raise ValidationError({"quantity": "Insufficient stock in the warehouse."})
+
+        StockMovement.objects.create(
+            warehouse_id=reservation.warehouse_id,
+            product_variant_id=reservation.product_variant_id,
+            movement_type=StockMovement.MovementTypes.FULFILLMENT,
+            quantity=-reservation.quantity,
+            reference=f"reservation-{reservation.pk}",
+        )
+
+        shift_warehouse_valuations(
+            [
+                (
+                    reservation.warehouse_id,
+                    reservation.product_variant_id,
+                    -reservation.quantity,
+                )
+            ]
+        )
+        refresh_variant_availability([reservation.product_variant_id])
+        schedule_low_stock_sweep(stocks.values_list("id", flat=True))
+
+
+def expire_stock_reservations(batch_size=1000):
+    """
+    Expire every lapsed reservation and release its hold in bulk.
+
+    Each batch costs a fixed number of statements: the lapsed rows are
+    locked and read, flagged as expired, and the reserved counters of all
+    affected stock records are decremented in one `UPDATE`.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        The maximum number of reservations expired per batch.
+
+    Returns
+    -------
+    int
+        The number of reservations expired.
+    """
+    expired = 0
+
+    while True:
+        with transaction.atomic():
+            lapsed = list(
+                StockReservation.objects.select_for_update()
+                .filter(
+                    status=StockReservation.StatusChoices.ACTIVE,
+                    expires_at__lte=timezone.now(),
+                )
+                .order_by("id")
+                .values_list("id", "warehouse_id", "product_variant_id", "quantity")[
+                    :batch_size
+                ]
+            )
+
+            if not lapsed:
+                return expired
+
+            StockReservation.objects.filter(
+                id__in=[reservation_id for reservation_id, *_ in lapsed]
+            ).update(
+                status=StockReservation.StatusChoices.EXPIRED,
+                updated=timezone.now(),
+            )
+
+            released = defaultdict(int)
+
+            for _, warehouse_id, product_variant_id, quantity in lapsed:
+                released[(warehouse_id, product_variant_id)] += quantity
+
+            keys = [
+                Q(warehouse_id=warehouse_id, product_variant_id=product_variant_id)
+                for warehouse_id, product_variant_id in released
+            ]
+
+            Stock.objects.filter(reduce(or_, keys)).update(
+                reserved_quantity=F("reserved_quantity")
+                - Case(
+                    *[
+                        When(key, then=Value(quantity))
+                        for key, quantity in zip(keys, released.values())
+                    ],
+                    default=Value(0),
+                )
+            )
+
+        expired += len(lapsed)
@@ -2,39 +2,120 @@
 Signals for the warehouses app.
 """
 
-from django.db.models.signals import post_save
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .emails import send_low_stock_alert
-from .models import StockAlert, WarehouseUser
+from core.products.caching import invalidate_models
+from core.products.models import ProductPriceHistory
+from core.products.signals import product_variants_repriced
+
+from .models import Stock, WarehouseUser
+from .services import (
+    refresh_variant_availability,
+    revalue_product_variant,
+    revalue_product_variants,
+    shift_warehouse_valuations,
+)
+
+
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def update_variant_availability(sender, instance, **kwargs):
+    """
+    Refresh the cross-warehouse availability of a variant when its stock is
+    written directly rather than through the stock services.
+
+    Parameters
+    ----------
+    sender : Stock
+        The Stock model.
+    instance : Stock
+        The Stock instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    refresh_variant_availability([instance.product_variant_id])
+
+
+@receiver(post_delete, sender=Stock)
+def value_deleted_stock(sender, instance, **kwargs):
+    """
+    Remove a deleted stock record from its warehouse valuation.
+
+    Parameters
+    ----------
+    sender : Stock
+        The Stock model.
+    instance : Stock
+        The Stock instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    shift_warehouse_valuations(
+        [(instance.warehouse_id, instance.product_variant_id, -instance.quantity)]
+    )
 
 
-@receiver(post_save, sender=StockAlert)
-def send_low_stock_email(sender, instance, created, **kwargs):  # pragma: no cover
+@receiver(post_save, sender=ProductPriceHistory)
+def revalue_repriced_stock(sender, instance, created, **kwargs):
     """
-    Send an email to the warehouse managers when a stock alert is created.
+    Revalue the stock of a product variant when its price changes.
+
+    `ProductVariant.save` records the previous price in the history before
+    the new price is written, in the same transaction, so the difference is
+    taken against the variant being saved and the revaluation is rolled
+    back if the variant cannot be saved.
 
     Parameters
     ----------
-    sender : StockAlert
-        The StockAlert model.
-    instance : StockAlert
-        The StockAlert instance.
+    sender : ProductPriceHistory
+        The ProductPriceHistory model.
+    instance : ProductPriceHistory
+        The ProductPriceHistory instance.
     created : bool
         Whether the instance was created or updated.
     **kwargs
         Additional keyword arguments.
     """
-
     if created:
-        warehouse_managers = WarehouseUser.objects.filter(
-            warehouse=instance.stock.warehouse,
-            role=WarehouseUser.RoleChoices.MANAGER,
-        ).select_related("user")
+        revalue_product_variant(
+            instance.product_variant_id,
+            Decimal(str(instance.product_variant.price)) - instance.price,
+        )
 
-        emails = [
-            manager.user.email for manager in warehouse_managers if manager.user.email
-        ]
 
-        if emails:
-            send_low_stock_alert(instance.stock, emails)
+@receiver(product_variants_repriced)
+def revalue_bulk_repriced_stock(sender, price_deltas, **kwargs):
+    """
+    Revalue the stock of product variants repriced in bulk.
+
+    Parameters
+    ----------
+    sender : ProductVariant
+        The ProductVariant model.
+    price_deltas : dict
+        The new price minus the previous price, keyed by product variant id.
+    **kwargs
+        Additional keyword arguments.
+    """
+    revalue_product_variants(price_deltas)
+
+
+@receiver(post_save, sender=WarehouseUser)
+@receiver(post_delete, sender=WarehouseUser)
+def invalidate_warehouse_users(sender, instance, **kwargs):
+    """
+    Invalidate the cached data read from the warehouse users when they change.
+
+    Parameters
+    ----------
+    sender : WarehouseUser
+        The WarehouseUser model.
+    instance : WarehouseUser
+        The WarehouseUser instance.
+    **kwargs
+        Additional keyword arguments.
+    """
+    invalidate_models(WarehouseUser)
@@ -5,9 +5,16 @@ Tasks for the `accounts` app.
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.mail import send_mail
+from django.utils import timezone
 
 from celery import shared_task
 from core.products.models import Product
+from core.warehouses.models import StockAlert
+from core.warehouses.services import (
+    compact_stock_ledger,
+    expire_stock_reservations,
+    sweep_low_stock_alerts,
+)
 
 
 @shared_task(name="send_email_task")
@@ -42,3 +49,76 @@ def send_email_task(email, subject, html_message):  # pragma: no cover
     )
 
     return email
+
+
+@shared_task(name="compact_stock_ledger")
+def compact_stock_ledger_task():  # pragma: no cover
+    """
+    Compact the stock movement ledger into fresh snapshots.
+
+    Returns
+    -------
+    int
+        The number of snapshots written.
+    """
+    return compact_stock_ledger()
+
+
+@shared_task(name="sweep_low_stock_alerts")
+def sweep_low_stock_alerts_task(stock_ids=None):
+    """
+    Raise and resolve low stock alerts and notify the warehouse managers.
+
+    Parameters
+    ----------
+    stock_ids : list[int], optional
+        Restrict the sweep to these stock records.
+
+    Returns
+    -------
+    int
+        The number of alerts created.
+    """
+    from core.warehouses.emails import send_low_stock_alerts
+
+    alerts = sweep_low_stock_alerts(stock_ids)
+
+    # In digest mode the alerts are buffered for `send_low_stock_digests`
+    if not settings.LOW_STOCK_ALERT_DIGEST_WINDOW:
+        send_low_stock_alerts(alerts)
+        StockAlert.objects.filter(id__in=[alert.id for alert in alerts]).update(
+            notified_at=timezone.now()
+        )
+
+    return len(alerts)
+
+
+@shared_task(name="send_low_stock_digests")
+def send_low_stock_digests_task():
+    """
+    Send the buffered low stock alerts as one digest email per manager.
+
+    Returns
+    -------
+    int
+        The number of digest emails sent.
+    """
+    from core.warehouses.emails import send_low_stock_digests
+
+    if not settings.LOW_STOCK_ALERT_DIGEST_WINDOW:
+        return 0
+
+    return send_low_stock_digests()
+
+
+@shared_task(name="expire_stock_reservations")
+def expire_stock_reservations_task():
+    """
+    Expire lapsed stock reservations and release their holds.
+
+    Returns
+    -------
+    int
+        The number of reservations expired.
+    """
+    return expire_stock_reservations()
@@ -0,0 +1,59 @@
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.tests import factories as product_factories
+from core.warehouses.emails import send_low_stock_digests
+from core.warehouses.models import Stock, StockAlert, Warehouse, WarehouseUser
+from core.warehouses.tasks import send_low_stock_digests_task
+
+
+class TestLowStockDigests(TestCase):
+    def setUp(self):
+        self.manager = UserFactory()
+        self.warehouses = [
+            Warehouse.objects.create(author=self.manager, name=name)
+            for name in ("North", "South")
+        ]
+        product = product_factories.ProductFactory(author=self.manager)
+
+        for warehouse in self.warehouses:
+            WarehouseUser.objects.create(
+                user=self.manager,
+                warehouse=warehouse,
+                role=WarehouseUser.RoleChoices.MANAGER,
+            )
+
+            for _ in range(3):
+                StockAlert.objects.bulk_create(
+                    [
+                        StockAlert(
+                            stock=Stock.objects.create(
+                                warehouse=warehouse,
+                                product_variant=product_factories.ProductVariantFactory(
+                                    product=product
+                                ),
+                                quantity=1,
+                            ),
+                            alert_type="LOW_STOCK",
+                        )
+                    ]
+                )
+
+    def test_one_digest_per_manager(self):
+        self.assertEqual(send_low_stock_digests(), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.manager.email])
+        self.assertEqual(mail.outbox[0].subject, "Low stock digest: 6 alerts")
+        self.assertFalse(StockAlert.objects.filter(notified_at__isnull=True).exists())
+
+        self.assertEqual(send_low_stock_digests(), 0)
+
+    def test_digest_task_is_disabled_without_window(self):
+        self.assertEqual(send_low_stock_digests_task(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(LOW_STOCK_ALERT_DIGEST_WINDOW=300)
+    def test_digest_task(self):
+        self.assertEqual(send_low_stock_digests_task(), 1)
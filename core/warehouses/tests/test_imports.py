@@ -0,0 +1,52 @@
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from core.warehouses.imports import read_stock_count
+
+
+class TestReadStockCount(SimpleTestCase):
+    def test_reads_csv(self):
+        file = BytesIO(b"product_variant,counted_quantity\n1,5\n2,0\n")
+
+        self.assertEqual(list(read_stock_count(file, "csv")), [(1, 5), (2, 0)])
+
+    def test_reads_ndjson(self):
+        file = BytesIO(
+            b'{"product_variant": 1, "counted_quantity": 5}\n'
+            b"\n"
+            b'{"product_variant": 2, "counted_quantity": 3}\n'
+        )
+
+        self.assertEqual(list(read_stock_count(file, "ndjson")), [(1, 5), (2, 3)])
+
+    def test_rejects_malformed_records(self):
+        for file, file_format in (
+            (BytesIO(b"product_variant\n1\n"), "csv"),
+            (BytesIO(b"not json\n"), "ndjson"),
+            (BytesIO(b'{"product_variant": 1, "counted_quantity": -1}\n'), "ndjson"),
+            (
+                BytesIO("product_variant,counted_quantity\n1,5\n".encode("utf-16")),
+                "csv",
+            ),
+            (
+                BytesIO(b'{"product_variant": 1, "counted_quantity": 5}\n\xff\n'),
+                "ndjson",
+            ),
+        ):
+            with self.assertRaises(ValidationError):
+                list(read_stock_count(file, file_format))
+
+    def test_rejects_files_not_in_utf8(self):
+        file = BytesIO(
+            "product_variant,counted_quantity\n1,5\n# caf\xe9\n".encode("latin-1")
+        )
+
+        with self.assertRaises(ValidationError) as error:
+            list(read_stock_count(file, "csv"))
+
+        self.assertEqual(
+            error.exception.message_dict,
+            {"file": ["The file must be encoded as UTF-8."]},
+        )
@@ -4,7 +4,14 @@ from django.test import TestCase
 from core.custom_user.tests.factories import UserFactory
 from core.products.models import ProductVariant
 from core.products.tests import factories as product_factories
-from core.warehouses.models import Stock, StockTransfer, Warehouse, WarehouseUser
+from core.warehouses.models import (
+    Stock,
+    StockAdjustment,
+    StockMovement,
+    StockTransfer,
+    Warehouse,
+    WarehouseUser,
+)
 
 
 class TestWarehouseModel(TestCase):
@@ -134,6 +141,23 @@ class TestStockTransferModel(TestCase):
         )
         self.assertEqual(to_stock.quantity, self.transfer.quantity)
 
+    def test_stock_transfer_records_movements(self):
+        self.transfer.save()
+
+        movements = StockMovement.objects.filter(
+            reference=str(self.transfer.reference_code)
+        )
+
+        self.assertEqual(
+            sorted(movements.values_list("warehouse", "quantity")),
+            sorted(
+                [
+                    (self.from_warehouse.id, -20),
+                    (self.to_warehouse.id, 20),
+                ]
+            ),
+        )
+
     def test_stock_transfer_zero_or_negative_quantity(self):
         # Ensure zero quantity transfer is invalid
         self.transfer.quantity = 0
@@ -144,3 +168,90 @@ class TestStockTransferModel(TestCase):
         self.transfer.quantity = -10
         with self.assertRaises(ValidationError):
             self.transfer.clean()
+
+
+class TestStockAdjustmentModel(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(
+            author=self.author, name="Adjusted Warehouse"
+        )
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=30,
+        )
+
+    def test_adjustment_updates_stock(self):
+        StockAdjustment.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            adjustment_quantity=-5,
+            reason="DAMAGE",
+            created_by=self.author,
+        )
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 25)
+
+    def test_adjustment_records_movement(self):
+        adjustment = StockAdjustment.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            adjustment_quantity=4,
+            reason="AUDIT_CORRECTION",
+            created_by=self.author,
+        )
+
+        movement = StockMovement.objects.get(reference=f"adjustment-{adjustment.pk}")
+        self.assertEqual(movement.quantity, 4)
+        self.assertEqual(
+            movement.movement_type, StockMovement.MovementTypes.AUDIT_CORRECTION
+        )
+
+    def test_insufficient_stock(self):
+        with self.assertRaises(ValidationError):
+            StockAdjustment.objects.create(
+                warehouse=self.warehouse,
+                product_variant=self.product_variant,
+                adjustment_quantity=-31,
+                created_by=self.author,
+            )
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 30)
+        self.assertFalse(StockAdjustment.objects.exists())
+
+
+class TestStockMovementModel(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(
+            author=self.author, name="Ledger Warehouse"
+        )
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.movement = StockMovement.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            movement_type=StockMovement.MovementTypes.RECEIPT,
+            quantity=12,
+        )
+
+    def test_string_representation(self):
+        self.assertEqual(
+            str(self.movement),
+            f"Receipt of 12 for {self.product_variant} in {self.warehouse}",
+        )
+
+    def test_movements_are_append_only(self):
+        self.movement.quantity = 13
+        with self.assertRaises(ValidationError):
+            self.movement.save()
+
+        with self.assertRaises(ValidationError):
+            self.movement.delete()
@@ -0,0 +1,778 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.models import ProductVariant
+from core.products.services import reprice_product_variants
+from core.products.tests import factories as product_factories
+from core.warehouses import services
+from core.warehouses.models import (
+    Stock,
+    StockAdjustment,
+    StockAlert,
+    StockAudit,
+    StockMovement,
+    StockReservation,
+    StockSnapshot,
+    StockTransfer,
+    VariantAvailability,
+    Warehouse,
+    WarehouseValuation,
+)
+from core.warehouses.tasks import expire_stock_reservations_task
+
+
+class TestStockLedgerServices(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(
+            author=self.author, name="Ledger Warehouse"
+        )
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=0,
+        )
+
+    def record(self, quantity):
+        return services.record_movement(
+            self.stock,
+            quantity,
+            StockMovement.MovementTypes.RECEIPT,
+        )
+
+    def test_record_movement_skips_zero(self):
+        self.assertIsNone(self.record(0))
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_compaction_folds_movements_into_snapshots(self):
+        self.record(10)
+        self.record(-3)
+
+        self.assertEqual(services.compact_stock_ledger(settle_seconds=0), 1)
+        snapshot = StockSnapshot.objects.get()
+        self.assertEqual(snapshot.quantity, 7)
+
+        self.record(5)
+
+        self.assertEqual(services.compact_stock_ledger(settle_seconds=0), 1)
+        self.assertEqual(StockSnapshot.objects.first().quantity, 12)
+
+        self.assertEqual(services.compact_stock_ledger(settle_seconds=0), 0)
+        self.assertIn("12", str(StockSnapshot.objects.first()))
+
+    def test_compaction_waits_for_movements_to_settle(self):
+        self.record(10)
+
+        self.assertEqual(services.compact_stock_ledger(), 0)
+
+    def test_balance_at(self):
+        self.record(10)
+        services.compact_stock_ledger(settle_seconds=0)
+        self.record(4)
+        now = timezone.now()
+
+        self.assertEqual(
+            services.get_stock_balance_at(self.warehouse, self.product_variant, now),
+            14,
+        )
+        self.assertEqual(
+            services.get_stock_balance_at(
+                self.warehouse,
+                self.product_variant,
+                now - timedelta(days=1),
+            ),
+            0,
+        )
+
+
+class TestBulkTransferStock(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.source = Warehouse.objects.create(author=self.author, name="Source")
+        self.destination = Warehouse.objects.create(
+            author=self.author, name="Destination"
+        )
+        product = product_factories.ProductFactory(author=self.author)
+        self.variants = [
+            product_factories.ProductVariantFactory(author=self.author, product=product)
+            for _ in range(3)
+        ]
+
+        for variant in self.variants:
+            Stock.objects.create(
+                warehouse=self.source,
+                product_variant=variant,
+                quantity=50,
+            )
+
+    def lines(self, quantity=20):
+        return [
+            {"product_variant": variant.id, "quantity": quantity}
+            for variant in self.variants
+        ]
+
+    def test_bulk_transfer(self):
+        transfers = services.bulk_transfer_stock(
+            self.author, self.source, self.destination, self.lines()
+        )
+
+        self.assertEqual(len(transfers), 3)
+        self.assertEqual(StockTransfer.objects.count(), 3)
+        self.assertEqual(
+            set(
+                Stock.objects.filter(warehouse=self.source).values_list(
+                    "quantity", flat=True
+                )
+            ),
+            {30},
+        )
+        self.assertEqual(
+            set(
+                Stock.objects.filter(warehouse=self.destination).values_list(
+                    "quantity", flat=True
+                )
+            ),
+            {20},
+        )
+        self.assertEqual(StockMovement.objects.count(), 6)
+
+    def test_duplicate_lines_are_merged(self):
+        lines = self.lines(10) + self.lines(15)
+
+        transfers = services.bulk_transfer_stock(
+            self.author, self.source, self.destination, lines
+        )
+
+        self.assertEqual({transfer.quantity for transfer in transfers}, {25})
+
+    def test_query_count_does_not_grow_with_lines(self):
+        with self.assertNumQueries(13):
+            services.bulk_transfer_stock(
+                self.author, self.source, self.destination, self.lines()
+            )
+
+    def test_low_stock_alerts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.bulk_transfer_stock(
+                self.author, self.source, self.destination, self.lines(45)
+            )
+
+        self.assertEqual(StockAlert.objects.filter(is_active=True).count(), 3)
+
+    def test_insufficient_stock(self):
+        with self.assertRaises(ValidationError):
+            services.bulk_transfer_stock(
+                self.author, self.source, self.destination, self.lines(51)
+            )
+
+        self.assertFalse(StockTransfer.objects.exists())
+        self.assertFalse(Stock.objects.filter(warehouse=self.destination).exists())
+
+    def test_invalid_lines(self):
+        with self.assertRaises(ValidationError):
+            services.bulk_transfer_stock(
+                self.author, self.source, self.source, self.lines()
+            )
+
+        with self.assertRaises(ValidationError):
+            services.bulk_transfer_stock(
+                self.author, self.source, self.destination, self.lines(0)
+            )
+
+        with self.assertRaises(ValidationError):
+            services.bulk_transfer_stock(
+                self.author,
+                self.source,
+                self.destination,
+                [{"product_variant": 0, "quantity": 1}],
+            )
+
+
+class TestStockMutations(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.source = Warehouse.objects.create(author=self.author, name="Source")
+        self.destination = Warehouse.objects.create(
+            author=self.author, name="Destination"
+        )
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.source,
+            product_variant=self.product_variant,
+            quantity=40,
+        )
+
+    def test_remove_stock_is_conditional(self):
+        services.remove_stock(self.source.id, self.product_variant.id, 15)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 25)
+
+        with self.assertRaises(ValidationError):
+            services.remove_stock(self.source.id, self.product_variant.id, 26)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 25)
+
+    def test_remove_stock_raises_alert(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.remove_stock(self.source.id, self.product_variant.id, 40)
+
+        alert = StockAlert.objects.get(stock=self.stock)
+        self.assertEqual(alert.alert_type, "OUT_OF_STOCK")
+
+    def test_add_stock_creates_missing_record(self):
+        services.add_stock(self.destination.id, self.product_variant.id, 5)
+        services.add_stock(self.destination.id, self.product_variant.id, 5)
+
+        self.assertEqual(
+            Stock.objects.get(
+                warehouse=self.destination,
+                product_variant=self.product_variant,
+            ).quantity,
+            10,
+        )
+
+    def test_apply_stock_change_ignores_zero(self):
+        services.apply_stock_change(
+            self.source.id,
+            self.product_variant.id,
+            0,
+            StockMovement.MovementTypes.ADJUSTMENT,
+        )
+
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_transfer_uses_conditional_updates(self):
+        Stock.objects.create(
+            warehouse=self.destination,
+            product_variant=self.product_variant,
+            quantity=20,
+        )
+        transfer = StockTransfer(
+            author=self.author,
+            product_variant=self.product_variant,
+            from_warehouse=self.source,
+            to_warehouse=self.destination,
+            quantity=10,
+        )
+
+        with self.assertNumQueries(12):
+            transfer.save()
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 30)
+
+    def test_transfer_rolls_back_on_insufficient_stock(self):
+        transfer = StockTransfer(
+            author=self.author,
+            product_variant=self.product_variant,
+            from_warehouse=self.source,
+            to_warehouse=self.destination,
+            quantity=41,
+        )
+
+        with self.assertRaises(ValidationError):
+            transfer.save()
+
+        self.assertFalse(StockTransfer.objects.exists())
+        self.assertFalse(Stock.objects.filter(warehouse=self.destination).exists())
+
+
+class TestSweepLowStockAlerts(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Swept")
+        product = product_factories.ProductFactory(author=self.author)
+        self.stocks = [
+            Stock.objects.create(
+                warehouse=self.warehouse,
+                product_variant=product_factories.ProductVariantFactory(
+                    author=self.author, product=product
+                ),
+                quantity=quantity,
+            )
+            for quantity in (0, 5, 50)
+        ]
+
+    def test_stock_writes_do_not_query_alerts(self):
+        stock = self.stocks[0]
+        stock.quantity = 1
+
+        with CaptureQueriesContext(connection) as queries:
+            stock.save()
+
+        self.assertFalse(
+            any("warehouses_stockalert" in query["sql"] for query in queries)
+        )
+
+    def test_sweep_creates_missing_alerts(self):
+        alerts = services.sweep_low_stock_alerts()
+
+        self.assertEqual(
+            sorted((alert.stock_id, alert.alert_type) for alert in alerts),
+            [
+                (self.stocks[0].id, "OUT_OF_STOCK"),
+                (self.stocks[1].id, "LOW_STOCK"),
+            ],
+        )
+        self.assertEqual(services.sweep_low_stock_alerts(), [])
+
+    def test_sweep_resolves_recovered_stock(self):
+        services.sweep_low_stock_alerts()
+        Stock.objects.filter(id=self.stocks[1].id).update(quantity=30)
+
+        services.sweep_low_stock_alerts(stock_ids=[self.stocks[1].id])
+
+        self.assertEqual(
+            list(
+                StockAlert.objects.filter(is_active=True).values_list(
+                    "stock_id", flat=True
+                )
+            ),
+            [self.stocks[0].id],
+        )
+
+
+class TestStockReservations(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Shop")
+        self.destination = Warehouse.objects.create(author=self.author, name="Outlet")
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=20,
+        )
+
+    def reserve(self, quantity, expires_in=timedelta(minutes=15)):
+        return services.reserve_stock(
+            self.author,
+            self.warehouse,
+            self.product_variant,
+            quantity,
+            timezone.now() + expires_in,
+            reference="order-1",
+        )
+
+    def test_reserve_updates_available_quantity(self):
+        reservation = self.reserve(8)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.reserved_quantity, 8)
+        self.assertEqual(self.stock.available_quantity, 12)
+        self.assertIn("Active", str(reservation))
+
+    def test_reserve_cost_is_constant(self):
+        self.reserve(5)
+
+        with self.assertNumQueries(4):
+            self.reserve(5)
+
+    def test_cannot_over_reserve(self):
+        self.reserve(15)
+
+        with self.assertRaises(ValidationError):
+            self.reserve(6)
+
+        with self.assertRaises(ValidationError):
+            self.reserve(0)
+
+    def test_reserved_stock_cannot_be_transferred(self):
+        self.reserve(15)
+
+        with self.assertRaises(ValidationError):
+            StockTransfer.objects.create(
+                author=self.author,
+                product_variant=self.product_variant,
+                from_warehouse=self.warehouse,
+                to_warehouse=self.destination,
+                quantity=6,
+            )
+
+    def test_release(self):
+        reservation = self.reserve(8)
+        services.release_reservation(reservation)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.reserved_quantity, 0)
+        self.assertEqual(reservation.status, StockReservation.StatusChoices.RELEASED)
+
+        with self.assertRaises(ValidationError):
+            services.release_reservation(reservation)
+
+    def test_consume(self):
+        reservation = self.reserve(8)
+        services.consume_reservation(reservation)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 12)
+        self.assertEqual(self.stock.reserved_quantity, 0)
+        self.assertEqual(
+            StockMovement.objects.get(
+                reference=f"reservation-{reservation.pk}"
+            ).quantity,
+            -8,
+        )
+
+    def test_cannot_consume_stock_lost_after_reserving(self):
+        reservation = self.reserve(8)
+        StockAdjustment.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            adjustment_quantity=-15,
+            created_by=self.author,
+        )
+
+        with self.assertRaises(ValidationError):
+            services.consume_reservation(reservation)
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 5)
+        self.assertEqual(self.stock.reserved_quantity, 8)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, StockReservation.StatusChoices.ACTIVE)
+        self.assertFalse(
+            StockMovement.objects.filter(
+                reference=f"reservation-{reservation.pk}"
+            ).exists()
+        )
+
+    def test_expire_lapsed_reservations(self):
+        other_variant = product_factories.ProductVariantFactory(
+            author=self.author, product=self.product_variant.product
+        )
+        Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=other_variant,
+            quantity=10,
+        )
+        services.reserve_stock(
+            self.author,
+            self.warehouse,
+            other_variant,
+            4,
+            timezone.now() - timedelta(seconds=1),
+        )
+        self.reserve(3, expires_in=-timedelta(seconds=1))
+        self.reserve(2, expires_in=-timedelta(seconds=1))
+        live = self.reserve(1)
+
+        self.assertEqual(services.expire_stock_reservations(batch_size=2), 3)
+        self.assertEqual(expire_stock_reservations_task(), 0)
+
+        self.assertEqual(
+            dict(
+                Stock.objects.filter(warehouse=self.warehouse).values_list(
+                    "product_variant", "reserved_quantity"
+                )
+            ),
+            {self.product_variant.id: 1, other_variant.id: 0},
+        )
+        live.refresh_from_db()
+        self.assertEqual(live.status, StockReservation.StatusChoices.ACTIVE)
+        self.assertEqual(
+            StockReservation.objects.filter(
+                status=StockReservation.StatusChoices.EXPIRED
+            ).count(),
+            3,
+        )
+
+
+class TestVariantAvailability(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouses = [
+            Warehouse.objects.create(author=self.author, name=name)
+            for name in ("North", "South")
+        ]
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            quantity=30,
+        )
+
+    def availability(self):
+        return VariantAvailability.objects.get(product_variant=self.product_variant)
+
+    def test_direct_stock_writes_refresh_availability(self):
+        self.assertEqual(self.availability().total_on_hand, 30)
+        self.assertEqual(self.availability().warehouses_stocked, 1)
+
+        self.stock.delete()
+
+        self.assertEqual(self.availability().total_on_hand, 0)
+        self.assertEqual(self.availability().warehouses_stocked, 0)
+
+    def test_transfers_refresh_availability(self):
+        StockTransfer.objects.create(
+            author=self.author,
+            product_variant=self.product_variant,
+            from_warehouse=self.warehouses[0],
+            to_warehouse=self.warehouses[1],
+            quantity=10,
+        )
+
+        availability = self.availability()
+        self.assertEqual(availability.total_on_hand, 30)
+        self.assertEqual(availability.warehouses_stocked, 2)
+        self.assertIsNotNone(availability.last_movement_at)
+        self.assertIn("30 in 2 warehouses", str(availability))
+
+    def test_adjustments_refresh_availability(self):
+        StockAdjustment.objects.create(
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            adjustment_quantity=-30,
+            created_by=self.author,
+        )
+
+        self.assertEqual(self.availability().total_on_hand, 0)
+        self.assertEqual(self.availability().warehouses_stocked, 0)
+
+
+class TestWarehouseValuation(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouses = [
+            Warehouse.objects.create(author=self.author, name=name)
+            for name in ("North", "South")
+        ]
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author, price=Decimal("2.50")
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            quantity=40,
+        )
+        services.record_movement(self.stock, 40, StockMovement.MovementTypes.RECEIPT)
+
+    def value(self, warehouse):
+        return WarehouseValuation.objects.get(warehouse=warehouse).total_value
+
+    def test_recorded_stock_writes_update_valuation(self):
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("100.00"))
+
+        self.stock.quantity = 10
+        self.stock.save()
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("100.00"))
+
+        services.record_movement(
+            self.stock, -30, StockMovement.MovementTypes.ADJUSTMENT
+        )
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("25.00"))
+
+        self.stock.delete()
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("0.00"))
+
+    def test_failed_price_change_does_not_revalue_stock(self):
+        self.product_variant.price = Decimal("3.00")
+
+        with mock.patch.object(ProductVariant, "save_base", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.product_variant.save()
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("100.00"))
+
+    def test_bulk_repricing_revalues_stock(self):
+        stock = Stock.objects.create(
+            warehouse=self.warehouses[1],
+            product_variant=self.product_variant,
+            quantity=4,
+        )
+        services.record_movement(stock, 4, StockMovement.MovementTypes.RECEIPT)
+
+        reprice_product_variants([{"id": self.product_variant.pk, "price": "3.00"}])
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("120.00"))
+        self.assertEqual(self.value(self.warehouses[1]), Decimal("12.00"))
+
+    def test_unchanged_prices_do_not_revalue_stock(self):
+        with self.assertNumQueries(0):
+            services.revalue_product_variants({self.product_variant.pk: Decimal("0")})
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("100.00"))
+
+    def test_transfers_move_value_between_warehouses(self):
+        StockTransfer.objects.create(
+            author=self.author,
+            product_variant=self.product_variant,
+            from_warehouse=self.warehouses[0],
+            to_warehouse=self.warehouses[1],
+            quantity=10,
+        )
+        services.bulk_transfer_stock(
+            author=self.author,
+            from_warehouse=self.warehouses[0],
+            to_warehouse=self.warehouses[1],
+            lines=[{"product_variant": self.product_variant.pk, "quantity": 6}],
+        )
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("60.00"))
+        self.assertEqual(self.value(self.warehouses[1]), Decimal("40.00"))
+        self.assertIn("North", str(WarehouseValuation.objects.first()))
+
+    def test_adjustments_and_fulfilment_update_valuation(self):
+        StockAdjustment.objects.create(
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            adjustment_quantity=-4,
+            created_by=self.author,
+        )
+        reservation = services.reserve_stock(
+            author=self.author,
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            quantity=6,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        services.consume_reservation(reservation)
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("75.00"))
+
+    def test_price_change_revalues_stock(self):
+        self.product_variant.price = Decimal("3.00")
+        self.product_variant.save()
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("120.00"))
+
+    def test_recompute_command_repairs_drift(self):
+        WarehouseValuation.objects.update(total_value=0)
+        out = StringIO()
+
+        call_command("recompute_warehouse_valuations", stdout=out)
+
+        self.assertEqual(self.value(self.warehouses[0]), Decimal("100.00"))
+        self.assertEqual(self.value(self.warehouses[1]), Decimal("0.00"))
+        self.assertIn("Recomputed 2 warehouse valuations", out.getvalue())
+
+        call_command(
+            "recompute_warehouse_valuations",
+            f"--warehouse={self.warehouses[1].pk}",
+            stdout=out,
+        )
+        self.assertIn("Recomputed 1 warehouse valuations", out.getvalue())
+
+
+class TestImportStockAudit(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Counted")
+        product = product_factories.ProductFactory(author=self.author)
+        self.variants = [
+            product_factories.ProductVariantFactory(author=self.author, product=product)
+            for _ in range(3)
+        ]
+
+        for variant, quantity in zip(self.variants[:2], (10, 20)):
+            Stock.objects.create(
+                warehouse=self.warehouse,
+                product_variant=variant,
+                quantity=quantity,
+            )
+
+    def counts(self):
+        return [
+            (self.variants[0].pk, 7),
+            (self.variants[1].pk, 20),
+            (self.variants[2].pk, 3),
+            (self.variants[2].pk, 2),
+        ]
+
+    def test_records_discrepancies_without_touching_stock(self):
+        result = services.import_stock_audit(self.author, self.warehouse, self.counts())
+
+        self.assertEqual(result, {"audits": 3, "adjustments": 0})
+        self.assertEqual(
+            dict(StockAudit.objects.values_list("product_variant", "discrepancy")),
+            {self.variants[0].pk: -3, self.variants[1].pk: 0, self.variants[2].pk: 5},
+        )
+        self.assertEqual(
+            Stock.objects.get(product_variant=self.variants[0]).quantity,
+            10,
+        )
+
+    def test_applies_corrections_in_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = services.import_stock_audit(
+                self.author,
+                self.warehouse,
+                self.counts(),
+                apply_adjustments=True,
+            )
+
+        self.assertEqual(result, {"audits": 3, "adjustments": 2})
+        self.assertEqual(
+            dict(
+                Stock.objects.filter(warehouse=self.warehouse).values_list(
+                    "product_variant", "quantity"
+                )
+            ),
+            {self.variants[0].pk: 7, self.variants[1].pk: 20, self.variants[2].pk: 5},
+        )
+        self.assertEqual(
+            StockMovement.objects.filter(
+                movement_type=StockMovement.MovementTypes.AUDIT_CORRECTION
+            ).count(),
+            2,
+        )
+        self.assertTrue(
+            StockAdjustment.objects.filter(reason="AUDIT_CORRECTION").exists()
+        )
+
+    def test_query_count_does_not_grow_with_lines(self):
+        with self.assertNumQueries(14):
+            services.import_stock_audit(
+                self.author,
+                self.warehouse,
+                self.counts(),
+                apply_adjustments=True,
+            )
+
+    def test_only_counted_stock_is_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            services.import_stock_audit(
+                self.author,
+                self.warehouse,
+                [(self.variants[0].pk, 10)],
+                apply_adjustments=True,
+            )
+
+        stock_reads = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "warehouses_stock"' in query["sql"]
+        ]
+        self.assertEqual(len(stock_reads), 1)
+        self.assertIn(
+            f'"warehouses_stock"."product_variant_id" IN ({self.variants[0].pk})',
+            stock_reads[0],
+        )
+
+    def test_unknown_variants_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            services.import_stock_audit(self.author, self.warehouse, [(0, 1)])
+
+        self.assertFalse(StockAudit.objects.exists())
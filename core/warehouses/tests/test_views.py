@@ -0,0 +1,710 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.custom_user.tests.factories import UserFactory
+from core.products.tests import factories as product_factories
+from core.warehouses import services as warehouse_services
+from core.warehouses.models import (
+    Stock,
+    StockAdjustment,
+    StockMovement,
+    StockReservation,
+    StockTransfer,
+    Warehouse,
+    WarehouseUser,
+    WarehouseValuation,
+)
+from core.warehouses.views import StockViewSet
+
+
+class TestWarehouseListQueryCounts(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+
+    def add_warehouses(self, count):
+        for _ in range(count):
+            warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+            WarehouseUser.objects.create(
+                user=UserFactory(),
+                warehouse=warehouse,
+                role=WarehouseUser.RoleChoices.MANAGER,
+            )
+            Stock.objects.create(
+                warehouse=warehouse,
+                product_variant=self.product_variant,
+                quantity=5,
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/v1/warehouses/")
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries), response.data["results"]
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        self.add_warehouses(1)
+        few, _ = self.count_queries()
+        self.add_warehouses(4)
+        many, results = self.count_queries()
+
+        self.assertEqual(many, few)
+        self.assertEqual({result["stock_count"] for result in results}, {1})
+        self.assertEqual({len(result["user_roles"]) for result in results}, {1})
+
+
+class TestStockExports(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=5,
+        )
+
+    def export(self, url):
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+
+    def test_stock_export_joins_warehouse_and_variant(self):
+        (row,) = self.export("/api/v1/stocks/export/")
+
+        self.assertEqual(row["id"], self.stock.pk)
+        self.assertEqual(row["warehouse__name"], "Depot")
+        self.assertEqual(row["product_variant__sku"], self.product_variant.sku)
+        self.assertEqual(row["quantity"], 5)
+
+    def test_movement_export_is_filtered(self):
+        StockMovement.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            movement_type=StockMovement.MovementTypes.RECEIPT,
+            quantity=5,
+        )
+
+        rows = self.export("/api/v1/stock-movements/export/?movement_type=RECEIPT")
+        other = self.export("/api/v1/stock-movements/export/?movement_type=ADJUSTMENT")
+
+        self.assertEqual([row["quantity"] for row in rows], [5])
+        self.assertEqual(other, [])
+
+    def test_transfer_export_requires_authentication(self):
+        response = APIClient().get("/api/v1/stock-transfers/export/")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.export("/api/v1/stock-transfers/export/"), [])
+
+
+class TestStockReservationViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=10,
+        )
+
+    def reserve(self, quantity):
+        response = self.client.post(
+            "/api/v1/stock-reservations/",
+            {
+                "warehouse": self.warehouse.pk,
+                "product_variant": self.product_variant.pk,
+                "quantity": quantity,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        return response.data["id"]
+
+    def test_consume(self):
+        reservation = self.reserve(4)
+
+        response = self.client.post(
+            f"/api/v1/stock-reservations/{reservation}/consume/"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["status"], StockReservation.StatusChoices.CONSUMED
+        )
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 6)
+
+    def test_consume_after_damage_is_rejected(self):
+        reservation = self.reserve(4)
+        StockAdjustment.objects.create(
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            adjustment_quantity=-8,
+            reason="DAMAGE",
+            created_by=self.author,
+        )
+
+        response = self.client.post(
+            f"/api/v1/stock-reservations/{reservation}/consume/"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.data)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 2)
+
+    def test_release(self):
+        reservation = self.reserve(4)
+
+        response = self.client.post(
+            f"/api/v1/stock-reservations/{reservation}/release/"
+        )
+        again = self.client.post(f"/api/v1/stock-reservations/{reservation}/release/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["status"], StockReservation.StatusChoices.RELEASED
+        )
+        self.assertEqual(again.status_code, 400)
+        self.assertEqual(again.data["status"], ["The reservation is no longer active."])
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 10)
+        self.assertEqual(self.stock.reserved_quantity, 0)
+
+    def test_reserving_more_than_available_is_rejected(self):
+        self.reserve(8)
+
+        response = self.client.post(
+            "/api/v1/stock-reservations/",
+            {
+                "warehouse": self.warehouse.pk,
+                "product_variant": self.product_variant.pk,
+                "quantity": 3,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["quantity"],
+            ["Insufficient available stock in the warehouse."],
+        )
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+
+class TestStockViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author, price=Decimal("2.00")
+        )
+
+    def value(self):
+        return WarehouseValuation.objects.get(warehouse=self.warehouse).total_value
+
+    def test_direct_writes_are_recorded_and_valued(self):
+        response = self.client.post(
+            "/api/v1/stocks/",
+            {
+                "warehouse": self.warehouse.pk,
+                "product_variant": self.product_variant.pk,
+                "quantity": 10,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.value(), Decimal("20.00"))
+
+        response = self.client.patch(
+            f"/api/v1/stocks/{response.data['id']}/", {"quantity": 4}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.value(), Decimal("8.00"))
+        self.assertEqual(
+            list(
+                StockMovement.objects.order_by("id").values_list("quantity", flat=True)
+            ),
+            [10, -6],
+        )
+
+    def test_direct_writes_sweep_low_stock_alerts(self):
+        with mock.patch(
+            "core.warehouses.tasks.sweep_low_stock_alerts_task.delay"
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/v1/stocks/",
+                    {
+                        "warehouse": self.warehouse.pk,
+                        "product_variant": self.product_variant.pk,
+                        "quantity": 10,
+                    },
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 201, response.data)
+            delay.assert_called_once_with(stock_ids=[response.data["id"]])
+
+            delay.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f"/api/v1/stocks/{response.data['id']}/",
+                    {"quantity": 1},
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 200, response.data)
+            delay.assert_called_once_with(stock_ids=[response.data["id"]])
+
+    def add_stock(self, quantity):
+        response = self.client.post(
+            "/api/v1/stocks/",
+            {
+                "warehouse": self.warehouse.pk,
+                "product_variant": self.product_variant.pk,
+                "quantity": quantity,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        return Stock.objects.get(pk=response.data["id"])
+
+    def test_updates_are_recorded_from_the_current_quantity(self):
+        stale = self.add_stock(10)
+        warehouse_services.apply_stock_change(
+            self.warehouse.pk,
+            self.product_variant.pk,
+            -3,
+            StockMovement.MovementTypes.FULFILLMENT,
+        )
+
+        with mock.patch.object(StockViewSet, "get_object", return_value=stale):
+            response = self.client.patch(
+                f"/api/v1/stocks/{stale.pk}/", {"quantity": 4}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            list(
+                StockMovement.objects.order_by("id").values_list("quantity", flat=True)
+            ),
+            [10, -3, -3],
+        )
+        self.assertEqual(Stock.objects.get(pk=stale.pk).quantity, 4)
+
+    def test_reserved_stock_cannot_be_edited_away(self):
+        stock = self.add_stock(10)
+        warehouse_services.reserve_stock(
+            author=self.author,
+            warehouse=self.warehouse,
+            product_variant=self.product_variant,
+            quantity=6,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        response = self.client.patch(
+            f"/api/v1/stocks/{stock.pk}/", {"quantity": 5}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["quantity"],
+            ["Quantity cannot be less than the reserved quantity."],
+        )
+        stock.refresh_from_db()
+        self.assertEqual(stock.quantity, 10)
+        self.assertEqual(stock.reserved_quantity, 6)
+
+    def test_valuation(self):
+        url = f"/api/v1/warehouses/{self.warehouse.pk}/valuation/"
+        empty = APIClient().get(url)
+        stock = Stock.objects.create(
+            warehouse=self.warehouse, product_variant=self.product_variant, quantity=3
+        )
+        warehouse_services.record_movement(
+            stock, 3, StockMovement.MovementTypes.RECEIPT
+        )
+
+        response = APIClient().get(url)
+
+        self.assertEqual(empty.status_code, 200)
+        self.assertEqual(empty.data["total_value"], "0.00")
+        self.assertEqual(response.data["warehouse"], self.warehouse.pk)
+        self.assertEqual(response.data["total_value"], "6.00")
+
+    def test_deleted_stock_is_no_longer_valued(self):
+        held = Stock.objects.create(
+            warehouse=self.warehouse, product_variant=self.product_variant, quantity=3
+        )
+        warehouse_services.record_movement(held, 3, StockMovement.MovementTypes.RECEIPT)
+        empty = Stock.objects.create(
+            warehouse=self.warehouse,
+            product_variant=product_factories.ProductVariantFactory(
+                author=self.author, price=Decimal("5.00")
+            ),
+            quantity=0,
+        )
+
+        response = self.client.delete(f"/api/v1/stocks/{empty.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.value(), Decimal("6.00"))
+
+        response = self.client.delete(f"/api/v1/stocks/{held.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.value(), Decimal("0.00"))
+
+
+class TestInsufficientStockViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouses = [
+            Warehouse.objects.create(author=self.author, name=name)
+            for name in ("North", "South")
+        ]
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+        self.stock = Stock.objects.create(
+            warehouse=self.warehouses[0],
+            product_variant=self.product_variant,
+            quantity=5,
+        )
+
+    def assert_stock_unchanged(self):
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 5)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_transfer_of_missing_stock_is_rejected(self):
+        response = self.client.post(
+            "/api/v1/stock-transfers/",
+            {
+                "product_variant": self.product_variant.pk,
+                "from_warehouse": self.warehouses[0].pk,
+                "to_warehouse": self.warehouses[1].pk,
+                "quantity": 6,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.data)
+        self.assertFalse(StockTransfer.objects.exists())
+        self.assert_stock_unchanged()
+
+    def test_transfer_is_applied(self):
+        response = self.client.post(
+            "/api/v1/stock-transfers/",
+            {
+                "product_variant": self.product_variant.pk,
+                "from_warehouse": self.warehouses[0].pk,
+                "to_warehouse": self.warehouses[1].pk,
+                "quantity": 2,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(StockTransfer.objects.get().author, self.author)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 3)
+
+    def test_adjustment_of_missing_stock_is_rejected(self):
+        response = self.client.post(
+            "/api/v1/stock-adjustments/",
+            {
+                "warehouse": self.warehouses[0].pk,
+                "product_variant": self.product_variant.pk,
+                "adjustment_quantity": -6,
+                "reason": "LOSS",
+                "created_by": self.author.pk,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quantity", response.data)
+        self.assertFalse(StockAdjustment.objects.exists())
+        self.assert_stock_unchanged()
+
+    def test_adjustment_is_applied(self):
+        response = self.client.post(
+            "/api/v1/stock-adjustments/",
+            {
+                "warehouse": self.warehouses[0].pk,
+                "product_variant": self.product_variant.pk,
+                "adjustment_quantity": -2,
+                "reason": "DAMAGE",
+                "created_by": self.author.pk,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 3)
+
+
+class TestStockAuditImportViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouse = Warehouse.objects.create(author=self.author, name="Depot")
+        self.product_variant = product_factories.ProductVariantFactory(
+            author=self.author
+        )
+
+    def upload(self, content, name="count.csv"):
+        return self.client.post(
+            "/api/v1/stock-audits/import/",
+            {
+                "warehouse": self.warehouse.pk,
+                "file": SimpleUploadedFile(name, content),
+            },
+            format="multipart",
+        )
+
+    def test_import(self):
+        response = self.upload(
+            f"product_variant,counted_quantity\n{self.product_variant.pk},4\n".encode()
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data, {"audits": 1, "adjustments": 0})
+
+    def test_files_not_in_utf8_are_rejected(self):
+        response = self.upload(
+            f"product_variant,counted_quantity\n{self.product_variant.pk},4\n"
+            "# Café\n".encode("latin-1")
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["file"], ["The file must be encoded as UTF-8."])
+
+    def test_format_is_inferred_from_the_extension(self):
+        row = {"product_variant": self.product_variant.pk, "counted_quantity": 4}
+        response = self.upload(f"{json.dumps(row)}\n".encode(), name="count.jsonl")
+        unknown = self.upload(b"4", name="count.txt")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data, {"audits": 1, "adjustments": 0})
+        self.assertEqual(unknown.status_code, 400)
+        self.assertEqual(
+            unknown.data["file_format"], ["Please provide the format of the file."]
+        )
+
+
+class TestStockAlertSweepViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def sweep(self, data):
+        with mock.patch(
+            "core.warehouses.tasks.sweep_low_stock_alerts_task.delay"
+        ) as delay:
+            response = self.client.post(
+                "/api/v1/stock-alert/sweep/", data, format="json"
+            )
+
+        return response, delay
+
+    def test_sweep_is_scheduled(self):
+        for data, stock_ids in (({"stock_ids": [1, 2]}, [1, 2]), ({}, None)):
+            with self.subTest(data=data):
+                response, delay = self.sweep(data)
+
+                self.assertEqual(response.status_code, 202)
+                delay.assert_called_once_with(stock_ids=stock_ids)
+
+    def test_invalid_stock_ids_are_rejected(self):
+        for stock_ids in ("1", ["x"], [0], [1.5]):
+            with self.subTest(stock_ids=stock_ids):
+                response, delay = self.sweep({"stock_ids": stock_ids})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("stock_ids", response.data)
+                delay.assert_not_called()
+
+
+class TestStockBalanceViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.stock = Stock.objects.create(
+            warehouse=Warehouse.objects.create(author=self.author, name="Depot"),
+            product_variant=product_factories.ProductVariantFactory(author=self.author),
+            quantity=6,
+        )
+        self.received_at = timezone.now() - timedelta(hours=1)
+        receipt = warehouse_services.record_movement(
+            self.stock, 10, StockMovement.MovementTypes.RECEIPT
+        )
+        StockMovement.objects.filter(pk=receipt.pk).update(created=self.received_at)
+        warehouse_services.record_movement(
+            self.stock, -4, StockMovement.MovementTypes.FULFILLMENT
+        )
+
+    def balance(self, **params):
+        return self.client.get(f"/api/v1/stocks/{self.stock.pk}/balance/", params)
+
+    def test_balance_now(self):
+        response = self.balance()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["stock"], self.stock.pk)
+        self.assertEqual(response.data["quantity"], 6)
+
+    def test_balance_at_a_point_in_time(self):
+        for at, quantity in (
+            (self.received_at - timedelta(minutes=1), 0),
+            (self.received_at + timedelta(minutes=1), 10),
+        ):
+            with self.subTest(at=at):
+                response = self.balance(at=at.isoformat())
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data["quantity"], quantity)
+
+    def test_invalid_point_in_time_is_rejected(self):
+        response = self.balance(at="yesterday")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"], "Please provide `at` as an ISO 8601 datetime."
+        )
+
+
+class TestBulkTransferViews(TestCase):
+    def setUp(self):
+        self.author = UserFactory()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.warehouses = [
+            Warehouse.objects.create(author=self.author, name=name)
+            for name in ("North", "South")
+        ]
+        self.product_variants = [
+            product_factories.ProductVariantFactory(author=self.author)
+            for _ in range(2)
+        ]
+
+        for product_variant in self.product_variants:
+            Stock.objects.create(
+                warehouse=self.warehouses[0],
+                product_variant=product_variant,
+                quantity=5,
+            )
+
+    def transfer(self, lines, to_warehouse=None):
+        return self.client.post(
+            "/api/v1/stock-transfers/bulk/",
+            {
+                "from_warehouse": self.warehouses[0].pk,
+                "to_warehouse": (to_warehouse or self.warehouses[1]).pk,
+                "lines": lines,
+            },
+            format="json",
+        )
+
+    def quantities(self, warehouse):
+        return dict(
+            Stock.objects.filter(warehouse=warehouse).values_list(
+                "product_variant", "quantity"
+            )
+        )
+
+    def test_bulk_transfer(self):
+        first, second = self.product_variants
+
+        response = self.transfer(
+            [
+                {"product_variant": second.pk, "quantity": 1},
+                {"product_variant": first.pk, "quantity": 2},
+                {"product_variant": second.pk, "quantity": 3},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            {row["product_variant"]: row["quantity"] for row in response.data},
+            {first.pk: 2, second.pk: 4},
+        )
+        self.assertEqual(
+            self.quantities(self.warehouses[0]), {first.pk: 3, second.pk: 1}
+        )
+        self.assertEqual(
+            self.quantities(self.warehouses[1]), {first.pk: 2, second.pk: 4}
+        )
+
+    def test_invalid_bulk_transfers_are_rejected(self):
+        first, second = self.product_variants
+
+        for name, lines, to_warehouse, field in (
+            (
+                "insufficient stock",
+                [
+                    {"product_variant": first.pk, "quantity": 1},
+                    {"product_variant": second.pk, "quantity": 6},
+                ],
+                None,
+                "quantity",
+            ),
+            (
+                "unknown variant",
+                [{"product_variant": second.pk + 100, "quantity": 1}],
+                None,
+                "product_variant",
+            ),
+            (
+                "same warehouse",
+                [{"product_variant": first.pk, "quantity": 1}],
+                self.warehouses[0],
+                "to_warehouse",
+            ),
+        ):
+            with self.subTest(name):
+                response = self.transfer(lines, to_warehouse)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.data)
+                self.assertEqual(
+                    self.quantities(self.warehouses[0]), {first.pk: 5, second.pk: 5}
+                )
+                self.assertEqual(self.quantities(self.warehouses[1]), {})
+                self.assertFalse(StockTransfer.objects.exists())
@@ -16,6 +16,8 @@ router.register(r"stock-transfers", views.StockTransferViewSet)
 router.register(r"stock-adjustments", views.StockAdjustmentViewSet)
 router.register(r"stock-audits", views.StockAuditViewSet)
 router.register(r"stock-alert", views.StockAlertViewSet)
+router.register(r"stock-movements", views.StockMovementViewSet)
+router.register(r"stock-reservations", views.StockReservationViewSet)
 router.register(r"stocks", views.StockViewSet)
 
 urlpatterns = [
@@ -2,19 +2,39 @@
 Views for the `warehouses` app.
 """
 
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField
 from django.db.utils import IntegrityError
-from rest_framework import authentication, permissions, viewsets
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import authentication, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from core.products.mixins import (
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+)
 from core.products.pagination import StandardPagination
 from core.warehouses import permissions as warehouse_permissions
 
 from . import models as warehouse_models
 from . import serializers as warehouse_serializers
+from . import services as warehouse_services
+from . import tasks as warehouse_tasks
+from .imports import read_stock_count
 
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for the Warehouse model.
     """
@@ -22,12 +42,31 @@ class WarehouseViewSet(viewsets.ModelViewSet):
     pagination_class = StandardPagination
     queryset = warehouse_models.Warehouse.objects.all().order_by("id")
     serializer_class = warehouse_serializers.WarehouseSerializer
+    # Every stock write refreshes the availability, so its version follows
+    # the stock counts.
+    cache_models = ["warehouses.VariantAvailability", "warehouses.WarehouseUser"]
     permission_classes = [warehouse_permissions.IsWarehouseManagerOrReadOnly]
     authentication_classes = [
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
 
+    def get_queryset(self):
+        """
+        Annotate the stock count and load the users of the warehouses.
+
+        Returns
+        -------
+        QuerySet
+            The annotated queryset.
+        """
+        return (
+            super()
+            .get_queryset()
+            .annotate(stock_count=Count("stocks"))
+            .prefetch_related("users__user")
+        )
+
     def perform_create(self, serializer):
         """
         Set the current authenticated user as the owner when creating a warehouse.
@@ -50,8 +89,37 @@ class WarehouseViewSet(viewsets.ModelViewSet):
                 )
             raise ValidationError({"error": "An unexpected database error occurred."})
 
+    @action(detail=True, methods=["get"])
+    def valuation(self, request, pk=None):
+        """
+        Custom action to retrieve the value of the stock held in the warehouse.
 
-class StockViewSet(viewsets.ModelViewSet):
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        pk : str
+            The primary key of the warehouse.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        warehouse = self.get_object()
+        valuation = warehouse_models.WarehouseValuation.objects.filter(
+            warehouse=warehouse
+        ).first() or warehouse_models.WarehouseValuation(warehouse=warehouse)
+
+        return Response(
+            warehouse_serializers.WarehouseValuationSerializer(valuation).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class StockViewSet(
+    ExportMixin, ValuesListMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for the Stock model.
     """
@@ -64,18 +132,45 @@ class StockViewSet(viewsets.ModelViewSet):
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
+    export_fields = [
+        "id",
+        "warehouse",
+        "warehouse__name",
+        "product_variant",
+        "product_variant__sku",
+        "product_variant__display_name",
+        "quantity",
+        "reserved_quantity",
+        "low_stock_threshold",
+    ]
+    values_expressions = {
+        "available_quantity": ExpressionWrapper(
+            F("quantity") - F("reserved_quantity"),
+            output_field=IntegerField(),
+        ),
+    }
 
     def perform_create(self, serializer):
         """
         Handle unique constraint violations properly when creating stock records.
 
+        The opening quantity is recorded as a receipt in the movement ledger,
+        and the low stock alerts of the record are swept once it is saved.
+
         Parameters
         ----------
         serializer : StockSerializer
             The serializer instance.
         """
         try:
-            serializer.save()
+            with transaction.atomic():
+                stock = serializer.save()
+                warehouse_services.record_movement(
+                    stock,
+                    stock.quantity,
+                    warehouse_models.StockMovement.MovementTypes.RECEIPT,
+                )
+                warehouse_services.schedule_low_stock_sweep([stock.id])
         except IntegrityError as e:
             if "warehouses_stock_unique_constraint" in str(e):
                 raise ValidationError(
@@ -85,8 +180,95 @@ class StockViewSet(viewsets.ModelViewSet):
                 )
             raise ValidationError({"error": "An unexpected database error occurred."})
 
+    def perform_update(self, serializer):
+        """
+        Record any direct change to the stock quantity in the movement ledger.
+
+        The stock record is locked and the change is computed from its
+        locked quantity, so that concurrent stock changes are not recorded
+        twice or lost. The low stock alerts of the record are swept once it
+        is saved.
+
+        Parameters
+        ----------
+        serializer : StockSerializer
+            The serializer instance.
+
+        Raises
+        ------
+        ValidationError
+            If the quantity would fall below the reserved quantity.
+        """
+        with transaction.atomic():
+            locked = warehouse_models.Stock.objects.select_for_update().get(
+                pk=serializer.instance.pk
+            )
+            previous_quantity = locked.quantity
+            quantity = serializer.validated_data.get("quantity", previous_quantity)
+
+            if quantity < locked.reserved_quantity:
+                raise ValidationError(
+                    {
+                        "quantity": [
+                            "Quantity cannot be less than the reserved quantity.",
+                        ],
+                    }
+                )
+
+            serializer.instance = locked
+            stock = serializer.save()
+            warehouse_services.record_movement(
+                stock,
+                stock.quantity - previous_quantity,
+                warehouse_models.StockMovement.MovementTypes.ADJUSTMENT,
+                reference=f"stock-{stock.pk}",
+            )
+            warehouse_services.schedule_low_stock_sweep([stock.id])
+
+    @action(detail=True, methods=["get"])
+    def balance(self, request, pk=None):
+        """
+        Return the stock balance at the point in time given by `?at=`.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        pk : str
+            The primary key of the stock record.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        stock = self.get_object()
+        at = timezone.now()
+
+        if "at" in request.query_params:
+            at = parse_datetime(request.query_params["at"])
+
+            if at is None:
+                return Response(
+                    {"error": "Please provide `at` as an ISO 8601 datetime."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        return Response(
+            {
+                "stock": stock.pk,
+                "at": at,
+                "quantity": warehouse_services.get_stock_balance_at(
+                    stock.warehouse,
+                    stock.product_variant,
+                    at,
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
-class StockTransferViewSet(viewsets.ModelViewSet):
+class StockTransferViewSet(ExportMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for the StockTransfer model.
     """
@@ -99,10 +281,22 @@ class StockTransferViewSet(viewsets.ModelViewSet):
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
+    export_fields = [
+        "id",
+        "reference_code",
+        "product_variant",
+        "product_variant__sku",
+        "from_warehouse",
+        "to_warehouse",
+        "quantity",
+        "author",
+        "updated",
+        "created",
+    ]
 
     def perform_create(self, serializer):
         """
-        Set the current authenticated user as the initiator when creating a stock transfer.
+        Set the current authenticated user as the author when creating a stock transfer.
 
         Parameters
         ----------
@@ -111,7 +305,9 @@ class StockTransferViewSet(viewsets.ModelViewSet):
         """
 
         try:
-            serializer.save(initiated_by=self.request.user)
+            serializer.save(author=self.request.user)
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
         except IntegrityError as e:
             if "warehouses_stocktransfer_unique_constraint" in str(e):
                 raise ValidationError(
@@ -121,8 +317,41 @@ class StockTransferViewSet(viewsets.ModelViewSet):
                 )
             raise ValidationError({"error": "An unexpected database error occurred."})
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_transfer(self, request):
+        """
+        Custom action to transfer many product variants between two warehouses.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        serializer = warehouse_serializers.BulkStockTransferSerializer(
+            data=request.data
+        )
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            transfers = warehouse_services.bulk_transfer_stock(
+                author=request.user,
+                **serializer.validated_data,
+            )
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+        return Response(
+            warehouse_serializers.StockTransferSerializer(transfers, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
 
-class StockAuditViewSet(viewsets.ModelViewSet):
+class StockAuditViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     API endpoint for performing stock audits.
     """
@@ -136,8 +365,46 @@ class StockAuditViewSet(viewsets.ModelViewSet):
         JWTAuthentication,
     ]
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_count(self, request):
+        """
+        Custom action to record a whole stock count from a CSV or NDJSON file.
+
+        Each record holds a `product_variant` id and a `counted_quantity`.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        serializer = warehouse_serializers.StockAuditImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            result = warehouse_services.import_stock_audit(
+                author=request.user,
+                warehouse=data["warehouse"],
+                counts=read_stock_count(data["file"], data["file_format"]),
+                apply_adjustments=data["apply_adjustments"],
+            )
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
 
-class StockAlertViewSet(viewsets.ModelViewSet):
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class StockAlertViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     API endpoint for performing stock audits.
     """
@@ -151,8 +418,35 @@ class StockAlertViewSet(viewsets.ModelViewSet):
         JWTAuthentication,
     ]
 
+    @action(detail=False, methods=["post"])
+    def sweep(self, request):
+        """
+        Custom action to enqueue a low stock alert sweep on demand.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        serializer = warehouse_serializers.StockAlertSweepSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        warehouse_tasks.sweep_low_stock_alerts_task.delay(
+            stock_ids=serializer.validated_data.get("stock_ids")
+        )
 
-class StockAdjustmentViewSet(viewsets.ModelViewSet):
+        return Response(
+            {"message": "Low stock alert sweep scheduled."},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class StockAdjustmentViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     API endpoint for performing stock audits.
     """
@@ -165,3 +459,161 @@ class StockAdjustmentViewSet(viewsets.ModelViewSet):
         authentication.SessionAuthentication,
         JWTAuthentication,
     ]
+
+    def perform_create(self, serializer):
+        """
+        Apply the adjustment to the stock, rejecting the removal of more
+        stock than the warehouse holds.
+
+        Parameters
+        ----------
+        serializer : StockAdjustmentSerializer
+            The serializer instance.
+        """
+        try:
+            serializer.save()
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+
+class StockMovementViewSet(
+    ExportMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet
+):
+    """
+    API endpoint for reading the append-only stock movement ledger.
+    """
+
+    pagination_class = StandardPagination
+    queryset = warehouse_models.StockMovement.objects.all().order_by("id")
+    serializer_class = warehouse_serializers.StockMovementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [
+        authentication.SessionAuthentication,
+        JWTAuthentication,
+    ]
+
+    filter_backends = [DjangoFilterBackend]
+
+    filterset_fields = ["warehouse", "product_variant", "movement_type"]
+    export_fields = [
+        "id",
+        "warehouse",
+        "product_variant",
+        "product_variant__sku",
+        "movement_type",
+        "quantity",
+        "reference",
+        "created",
+    ]
+
+
+class StockReservationViewSet(
+    SparseFieldsetMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API endpoint for holding stock for in-flight orders.
+    """
+
+    pagination_class = StandardPagination
+    queryset = warehouse_models.StockReservation.objects.all().order_by("id")
+    serializer_class = warehouse_serializers.StockReservationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [
+        authentication.SessionAuthentication,
+        JWTAuthentication,
+    ]
+
+    filter_backends = [DjangoFilterBackend]
+
+    filterset_fields = ["warehouse", "product_variant", "status", "reference"]
+
+    def perform_create(self, serializer):
+        """
+        Reserve the stock for the current authenticated user.
+
+        Parameters
+        ----------
+        serializer : StockReservationSerializer
+            The serializer instance.
+        """
+        data = serializer.validated_data
+
+        try:
+            serializer.instance = warehouse_services.reserve_stock(
+                author=self.request.user,
+                warehouse=data["warehouse"],
+                product_variant=data["product_variant"],
+                quantity=data["quantity"],
+                expires_at=timezone.now() + timedelta(seconds=data["ttl"]),
+                reference=data.get("reference", ""),
+            )
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+    def close(self, close_reservation):
+        """
+        Close the requested reservation with the given service.
+
+        Parameters
+        ----------
+        close_reservation : callable
+            Either `release_reservation` or `consume_reservation`.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        reservation = self.get_object()
+
+        try:
+            close_reservation(reservation)
+        except DjangoValidationError as e:
+            raise ValidationError(e.message_dict)
+
+        return Response(
+            self.get_serializer(reservation).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"])
+    def release(self, request, pk=None):
+        """
+        Custom action to release a reservation back to available stock.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        pk : str
+            The primary key of the reservation.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        return self.close(warehouse_services.release_reservation)
+
+    @action(detail=True, methods=["post"])
+    def consume(self, request, pk=None):
+        """
+        Custom action to fulfil a reservation, removing its stock.
+
+        Parameters
+        ----------
+        request : Request
+            The request object.
+        pk : str
+            The primary key of the reservation.
+
+        Returns
+        -------
+        Response
+            The response object.
+        """
+        return self.close(warehouse_services.consume_reservation)